@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Create ordered children covering index."""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "1921fc59bd0f"
+down_revision = "d8ecd9091d26"
+branch_labels = ()
+depends_on = None
+
+
+def upgrade():
+    """Upgrade database."""
+    op.create_index(
+        "idx_pidrelations_parent_type_index",
+        "pidrelations_pidrelation",
+        ["parent_id", "relation_type", "index", "child_id"],
+    )
+
+
+def downgrade():
+    """Downgrade database."""
+    op.drop_index(
+        "idx_pidrelations_parent_type_index", table_name="pidrelations_pidrelation"
+    )
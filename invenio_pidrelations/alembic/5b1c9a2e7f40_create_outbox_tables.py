@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Create relation changes outbox tables."""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5b1c9a2e7f40"
+down_revision = "1921fc59bd0f"
+branch_labels = ()
+depends_on = None
+
+
+def upgrade():
+    """Upgrade database."""
+    op.create_table(
+        "pidrelations_change",
+        sa.Column(
+            "id",
+            sa.BigInteger().with_variant(sa.Integer(), "sqlite"),
+            autoincrement=True,
+            nullable=False,
+        ),
+        sa.Column("created", sa.DateTime(), nullable=False),
+        sa.Column("parent_id", sa.Integer(), nullable=False),
+        sa.Column("child_id", sa.Integer(), nullable=False),
+        sa.Column("relation_type", sa.SmallInteger(), nullable=False),
+        sa.Column("op", sa.String(length=6), nullable=False),
+        sa.Column("old_index", sa.Integer(), nullable=True),
+        sa.Column("new_index", sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_pidrelations_change")),
+    )
+    op.create_table(
+        "pidrelations_consumer",
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column(
+            "cursor",
+            sa.BigInteger().with_variant(sa.Integer(), "sqlite"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("name", name=op.f("pk_pidrelations_consumer")),
+    )
+
+
+def downgrade():
+    """Downgrade database."""
+    op.drop_table("pidrelations_consumer")
+    op.drop_table("pidrelations_change")
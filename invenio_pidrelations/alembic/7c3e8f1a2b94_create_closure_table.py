@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Create relations closure table."""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7c3e8f1a2b94"
+down_revision = "5b1c9a2e7f40"
+branch_labels = ()
+depends_on = None
+
+
+def upgrade():
+    """Upgrade database."""
+    op.create_table(
+        "pidrelations_closure",
+        sa.Column("relation_type", sa.SmallInteger(), nullable=False),
+        sa.Column("ancestor_id", sa.Integer(), nullable=False),
+        sa.Column("descendant_id", sa.Integer(), nullable=False),
+        sa.Column("depth", sa.Integer(), nullable=False),
+        sa.Column("paths", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["ancestor_id"],
+            ["pidstore_pid.id"],
+            name=op.f("fk_pidrelations_closure_ancestor_id_pidstore_pid"),
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["descendant_id"],
+            ["pidstore_pid.id"],
+            name=op.f("fk_pidrelations_closure_descendant_id_pidstore_pid"),
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "relation_type",
+            "ancestor_id",
+            "descendant_id",
+            "depth",
+            name=op.f("pk_pidrelations_closure"),
+        ),
+    )
+    op.create_index(
+        "idx_pidrelations_closure_descendant",
+        "pidrelations_closure",
+        ["relation_type", "descendant_id", "ancestor_id"],
+        unique=False,
+    )
+
+
+def downgrade():
+    """Downgrade database."""
+    op.drop_index(
+        "idx_pidrelations_closure_descendant", table_name="pidrelations_closure"
+    )
+    op.drop_table("pidrelations_closure")
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Create relations history table."""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9a4d2c6e8b13"
+down_revision = "7c3e8f1a2b94"
+branch_labels = ()
+depends_on = None
+
+
+def upgrade():
+    """Upgrade database."""
+    op.create_table(
+        "pidrelations_history",
+        sa.Column(
+            "id",
+            sa.BigInteger().with_variant(sa.Integer(), "sqlite"),
+            autoincrement=True,
+            nullable=False,
+        ),
+        sa.Column("parent_id", sa.Integer(), nullable=False),
+        sa.Column("child_id", sa.Integer(), nullable=False),
+        sa.Column("relation_type", sa.SmallInteger(), nullable=False),
+        sa.Column("index", sa.Integer(), nullable=True),
+        sa.Column("status", sa.String(length=1), nullable=False),
+        sa.Column("valid_from", sa.DateTime(), nullable=False),
+        sa.Column("valid_to", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_pidrelations_history")),
+    )
+    op.create_index(
+        "idx_pidrelations_history_parent",
+        "pidrelations_history",
+        ["parent_id", "relation_type", "valid_from"],
+        unique=False,
+    )
+    op.create_index(
+        "idx_pidrelations_history_child",
+        "pidrelations_history",
+        ["child_id", "valid_to"],
+        unique=False,
+    )
+
+
+def downgrade():
+    """Downgrade database."""
+    op.drop_index("idx_pidrelations_history_child", table_name="pidrelations_history")
+    op.drop_index("idx_pidrelations_history_parent", table_name="pidrelations_history")
+    op.drop_table("pidrelations_history")
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Create the optional relation type partial indexes."""
+
+from alembic import op
+from flask import current_app
+
+from invenio_pidrelations.models import (
+    create_relation_type_indexes,
+    drop_relation_type_indexes,
+)
+
+# revision identifiers, used by Alembic.
+revision = "d8ecd9091d26"
+down_revision = "1d4e361b7586"
+branch_labels = ()
+depends_on = None
+
+
+def upgrade():
+    """Upgrade database."""
+    if current_app.config["PIDRELATIONS_PARTIAL_INDEXES"]:
+        create_relation_type_indexes(op.get_bind())
+
+
+def downgrade():
+    """Downgrade database."""
+    drop_relation_type_indexes(op.get_bind())
@@ -10,15 +10,51 @@
 
 from __future__ import absolute_import, print_function
 
+import hashlib
+from collections import namedtuple
+
+from flask import current_app
 from invenio_db import db
 from invenio_pidstore.models import PersistentIdentifier, PIDStatus
-from sqlalchemy import and_, select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import DateTime, Integer, case, exists, func, literal, or_, select
+from sqlalchemy.exc import MultipleResultsFound, NoResultFound
 from sqlalchemy.orm import aliased
+from sqlalchemy.sql import column, table
 from werkzeug.utils import cached_property
 
-from .errors import PIDRelationConsistencyError
-from .models import PIDRelation
+from .cache import relations_changed
+from .closure import closure_relation_types
+from .errors import PIDRelationConsistencyError, PIDRelationError
+from .history import RelationsAsOf
+from .models import PIDRelation, PIDRelationChange, PIDRelationClosure
+from .replica import read_bind_arguments, relation_writes_started
+from .utils import resolve_relation_type_config
+
+PreloadedRelation = namedtuple("PreloadedRelation", ["pid", "index"])
+"""Relation to a PID as stored by :func:`preload_relations`."""
+
+_PRELOADED_ATTR = "_pidrelations_preloaded"
+
+
+# Aliases of the PID table shared by all the statements, so that the
+# statements built for different PIDs have the same structure and hit the
+# compiled statements cache of the engine.
+_TO_PID = aliased(PersistentIdentifier, name="to_pid")
+_FROM_PID = aliased(PersistentIdentifier, name="from_pid")
+
+# Lightweight view of the PID table for the aggregates on the update date:
+# the type of ``PersistentIdentifier.updated`` does not support the
+# statements cache.
+_PID_UPDATES = table(
+    PersistentIdentifier.__tablename__,
+    column("id", Integer),
+    column("updated", DateTime),
+)
+
+
+def _index_sort_key(relation):
+    """Sort preloaded relations on their index, ``None`` first."""
+    return (relation.index is not None, relation.index or 0, relation.pid.id)
 
 
 class PIDQuery:
@@ -32,17 +68,37 @@ class PIDQuery:
     modern `select()`-based statements in an interface similar to the legacy ORM style.
     """
 
-    def __init__(self, statement, session, _filtered_pid_class=PersistentIdentifier):
+    def __init__(
+        self,
+        statement,
+        session,
+        _filtered_pid_class=PersistentIdentifier,
+        _preloaded=None,
+    ):
         """Constructor.
 
         :param statement: An initial SQLAlchemy select() statement.
         :param session: The SQLAlchemy session.
         :param _filtered_pid_class: SQLAlchemy Model class which is used for
         status filtering.
+        :param _preloaded: list of :class:`PreloadedRelation` matching the
+        statement. When given, results are computed from it instead of
+        querying the database, until a filter which can only be evaluated by
+        the database is applied.
         """
         self._statement = statement
         self._session = session
         self._filtered_pid_class = _filtered_pid_class
+        self._preloaded = _preloaded
+
+    def _copy(self, statement, preloaded=None):
+        """Build a new query of the same class for a modified statement."""
+        return self.__class__(
+            statement,
+            self._session,
+            self._filtered_pid_class,
+            _preloaded=preloaded,
+        )
 
     def ordered(self, ord="desc"):
         """Order the query result on the relations' indexes."""
@@ -52,9 +108,10 @@ class PIDQuery:
         ):
             raise ValueError("Order must be 'asc' or 'desc'")
         ord_f = getattr(PIDRelation.index, ord)()
-        return PIDQuery(
-            self._statement.order_by(ord_f), self._session, self._filtered_pid_class
-        )
+        preloaded = self._preloaded
+        if preloaded is not None:
+            preloaded = sorted(preloaded, key=_index_sort_key, reverse=(ord == "desc"))
+        return self._copy(self._statement.order_by(ord_f), preloaded)
 
     def status(self, status_in):
         """Filter the PIDs based on their status."""
@@ -62,60 +119,94 @@ class PIDQuery:
             status_in = [
                 status_in,
             ]
-        return PIDQuery(
+        preloaded = self._preloaded
+        if preloaded is not None:
+            preloaded = [r for r in preloaded if r.pid.status in status_in]
+        return self._copy(
             self._statement.where(self._filtered_pid_class.status.in_(status_in)),
-            self._session,
-            self._filtered_pid_class,
+            preloaded,
+        )
+
+    def indexed(self):
+        """Filter out the PIDs whose relation has no index."""
+        preloaded = self._preloaded
+        if preloaded is not None:
+            preloaded = [r for r in preloaded if r.index is not None]
+        return self._copy(
+            self._statement.where(PIDRelation.index.isnot(None)), preloaded
         )
 
     def filter(self, *args):
         """Apply a filter to the statement."""
-        return PIDQuery(
-            self._statement.filter(*args), self._session, self._filtered_pid_class
-        )
+        return self._copy(self._statement.filter(*args))
 
     def filter_by(self, **kwargs):
         """Apply a filter by to the statement."""
-        return PIDQuery(
-            self._statement.filter_by(**kwargs),
-            self._session,
-            self._filtered_pid_class,
-        )
+        return self._copy(self._statement.filter_by(**kwargs))
 
     def join(self, *args, **kwargs):
         """Apply a join to the statement."""
-        return PIDQuery(
-            self._statement.join(*args, **kwargs),
-            self._session,
-            self._filtered_pid_class,
-        )
+        return self._copy(self._statement.join(*args, **kwargs))
+
+    def _bind_arguments(self):
+        """Route the query to the read replica, if any."""
+        return read_bind_arguments(self._session)
 
     def count(self):
         """Count the results of the query."""
+        if self._preloaded is not None:
+            return len(self._preloaded)
         return self._session.scalar(
-            select(db.func.count()).select_from(self._statement.subquery())
+            select(db.func.count()).select_from(self._statement.subquery()),
+            bind_arguments=self._bind_arguments(),
         )
 
     def first(self):
         """Get the first result."""
-        return self._session.scalars(self._statement.limit(1)).first()
+        if self._preloaded is not None:
+            return self._preloaded[0].pid if self._preloaded else None
+        return self._session.scalars(
+            self._statement.limit(1), bind_arguments=self._bind_arguments()
+        ).first()
 
     def one(self):
         """Get exactly one result."""
-        return self._session.scalars(self._statement).one()
+        if self._preloaded is not None:
+            result = self.one_or_none()
+            if result is None:
+                raise NoResultFound("No row was found when one was required")
+            return result
+        return self._session.scalars(
+            self._statement, bind_arguments=self._bind_arguments()
+        ).one()
 
     def one_or_none(self):
         """Get one result or None if no results."""
-        return self._session.scalars(self._statement).one_or_none()
+        if self._preloaded is not None:
+            if len(self._preloaded) > 1:
+                raise MultipleResultsFound(
+                    "Multiple rows were found when one or none was required"
+                )
+            return self.first()
+        return self._session.scalars(
+            self._statement, bind_arguments=self._bind_arguments()
+        ).one_or_none()
 
     def all(self):
         """Get all results."""
-        return self._session.scalars(self._statement).all()
+        if self._preloaded is not None:
+            return [r.pid for r in self._preloaded]
+        return self._session.scalars(
+            self._statement, bind_arguments=self._bind_arguments()
+        ).all()
 
     def exists(self):
         """Check if any results exist."""
+        if self._preloaded is not None:
+            return bool(self._preloaded)
         return self._session.scalar(
-            select(1).select_from(self._statement.subquery()).exists().select()
+            select(1).select_from(self._statement.subquery()).exists().select(),
+            bind_arguments=self._bind_arguments(),
         )
 
 
@@ -131,6 +222,290 @@ def resolve_pid(fetched_pid):
     )
 
 
+def relation_type_filter(relation_type_id):
+    """Filter the relations on a relation type.
+
+    The relation type is rendered inline in the SQL statement (while the
+    statement itself stays cacheable), so that the query planner can use the
+    partial indexes defined for specific relation types, also for prepared
+    statements.
+    """
+    return PIDRelation.relation_type == literal(
+        relation_type_id, PIDRelation.relation_type.type, literal_execute=True
+    )
+
+
+def connected_pids_statement(pid, relation_type_id, from_parent=True):
+    """Build the statement selecting the PIDs connected to a PID.
+
+    :param pid: a :class:`invenio_pidstore.models.PersistentIdentifier` or a
+        fetched PID.
+    :param relation_type_id: database value of the relation type.
+    :param from_parent: select the children of the PID if True, else its
+        parents.
+    :returns: the statement and the aliased PID class it selects.
+    """
+    to_pid = _TO_PID
+    if from_parent:
+        to_relation_id = PIDRelation.child_id
+        from_relation_id = PIDRelation.parent_id
+    else:
+        to_relation_id = PIDRelation.parent_id
+        from_relation_id = PIDRelation.child_id
+
+    # Select from the relations first, filtered on the relation type, so
+    # that the relation type specific indexes drive the query.
+    stmt = (
+        select(to_pid)
+        .select_from(PIDRelation)
+        .join(to_pid, to_pid.id == to_relation_id)
+        .where(relation_type_filter(relation_type_id))
+    )
+
+    # Accept both PersistentIdentifier models and fake PIDs with just
+    # pid_value, pid_type as they are fetched with the PID fetcher.
+    if isinstance(pid, PersistentIdentifier):
+        stmt = stmt.where(from_relation_id == pid.id)
+    else:
+        from_pid = _FROM_PID
+        stmt = stmt.join(from_pid, from_pid.id == from_relation_id).where(
+            from_pid.pid_value == pid.pid_value,
+            from_pid.pid_type == pid.pid_type,
+        )
+    return stmt, to_pid
+
+
+def _relation_type_id(relation_type):
+    """Get the database value of a relation type config, name or id."""
+    if hasattr(relation_type, "id"):
+        return relation_type.id
+    return resolve_relation_type_config(relation_type).id
+
+
+def preload_relations(pids, relation_types=None):
+    """Load the relations of a list of PIDs in bulk.
+
+    The relations in which the PIDs are parents or children, as well as
+    the siblings of the PIDs (i.e. the children of their parents), are
+    fetched with two queries and stored on the PID objects. The
+    :class:`PIDNode` instances built afterwards for any of these PIDs or for
+    their parents read their children and parents from this snapshot instead
+    of querying the database.
+
+    The snapshot is dropped by the :class:`PIDNode` methods modifying the
+    relations of a PID. Call :func:`clear_preloaded_relations` if the
+    relations are modified by other means.
+
+    :param pids: list of :class:`invenio_pidstore.models.PersistentIdentifier`.
+    :param relation_types: relation types (config, name or id) to preload.
+        All relation types are preloaded by default.
+    """
+    pids = [p for p in pids if p is not None]
+    if not pids:
+        return
+    pid_ids = set(p.id for p in pids)
+    type_ids = None
+    if relation_types is not None:
+        type_ids = [_relation_type_id(rt) for rt in relation_types]
+
+    parent_pid = aliased(PersistentIdentifier, name="parent_pid")
+    child_pid = aliased(PersistentIdentifier, name="child_pid")
+
+    def relations_stmt(*where):
+        stmt = (
+            select(PIDRelation.relation_type, PIDRelation.index, parent_pid, child_pid)
+            .join(parent_pid, parent_pid.id == PIDRelation.parent_id)
+            .join(child_pid, child_pid.id == PIDRelation.child_id)
+            .where(*where)
+        )
+        if type_ids is not None:
+            stmt = stmt.where(PIDRelation.relation_type.in_(type_ids))
+        return stmt
+
+    children = {}
+    parents = {}
+    # Relations of the PIDs themselves
+    rows = db.session.execute(
+        relations_stmt(
+            or_(PIDRelation.parent_id.in_(pid_ids), PIDRelation.child_id.in_(pid_ids))
+        ),
+        bind_arguments=read_bind_arguments(),
+    ).all()
+    # Siblings of the PIDs, i.e. children of the parents which are not
+    # part of the list of PIDs
+    sibling_parent_ids = set(
+        parent.id for _, _, parent, _ in rows if parent.id not in pid_ids
+    )
+    if sibling_parent_ids:
+        rows += db.session.execute(
+            relations_stmt(PIDRelation.parent_id.in_(sibling_parent_ids)),
+            bind_arguments=read_bind_arguments(),
+        ).all()
+
+    loaded_pids = {}
+    for relation_type, index, parent, child in rows:
+        loaded_pids[parent.id] = parent
+        loaded_pids[child.id] = child
+        children.setdefault((parent.id, relation_type), set()).add(
+            PreloadedRelation(child, index)
+        )
+        if child.id in pid_ids:
+            parents.setdefault((child.id, relation_type), set()).add(
+                PreloadedRelation(parent, index)
+            )
+
+    if type_ids is None:
+        type_ids = [rt.id for rt in current_app.config["PIDRELATIONS_RELATION_TYPES"]]
+
+    def store(pid, key, relations):
+        preloaded = pid.__dict__.setdefault(_PRELOADED_ATTR, {})
+        preloaded[key] = sorted(relations, key=_index_sort_key)
+
+    # Children of the listed PIDs and of their parents are complete, but
+    # only the parents of the listed PIDs are.
+    for pid in pids:
+        for type_id in type_ids:
+            store(pid, (type_id, True), children.get((pid.id, type_id), ()))
+            store(pid, (type_id, False), parents.get((pid.id, type_id), ()))
+    for parent_id in sibling_parent_ids:
+        for type_id in type_ids:
+            store(
+                loaded_pids[parent_id],
+                (type_id, True),
+                children.get((parent_id, type_id), ()),
+            )
+
+
+def clear_preloaded_relations(*pids):
+    """Drop the relations preloaded with :func:`preload_relations`."""
+    for pid in pids:
+        if isinstance(pid, PersistentIdentifier):
+            pid.__dict__.pop(_PRELOADED_ATTR, None)
+
+
+def _relations_version(*where):
+    """Compute a version token of the relations matching a filter.
+
+    The token changes when a relation is inserted, removed or updated (e.g.
+    its index) and when a child PID is updated (e.g. its status), and is
+    computed with a single aggregate query.
+    """
+    stmt = (
+        select(
+            func.count(),
+            func.max(PIDRelation.updated),
+            func.max(_PID_UPDATES.c.updated),
+        )
+        .select_from(PIDRelation)
+        .join(_PID_UPDATES, _PID_UPDATES.c.id == PIDRelation.child_id)
+        .where(*where)
+    )
+    row = db.session.execute(stmt, bind_arguments=read_bind_arguments()).one()
+    return hashlib.sha1("{0}:{1}:{2}".format(*row).encode()).hexdigest()
+
+
+def relations_version(pid):
+    """Get a version token of all the relations serialized for a PID.
+
+    These are the relations to the children of the PID and to the children
+    of its parents, i.e. the relations dumped by
+    :func:`invenio_pidrelations.serializers.utils.serialize_relations`. The
+    token can be used as the ETag of the serialized relations.
+
+    :param pid: a :class:`invenio_pidstore.models.PersistentIdentifier`.
+    """
+    parents = select(PIDRelation.parent_id).where(PIDRelation.child_id == pid.id)
+    return _relations_version(
+        or_(PIDRelation.parent_id == pid.id, PIDRelation.parent_id.in_(parents))
+    )
+
+
+def _relation_changed(session, relation, op, old_index=None):
+    """Hook called on each change of a relation, in the transaction of the change.
+
+    :param session: session of the change.
+    :param relation: the changed :class:`invenio_pidrelations.models.PIDRelation`.
+    :param op: ``"insert"``, ``"remove"``, ``"move"`` (change of index) or
+        ``"status"`` (change of the status of the child, e.g. a published
+        draft).
+    :param old_index: index of the relation before the change.
+    """
+    relations_changed(session, relation.parent_id)
+    if current_app.config["PIDRELATIONS_OUTBOX_ENABLED"]:
+        session.add(
+            PIDRelationChange(
+                parent_id=relation.parent_id,
+                child_id=relation.child_id,
+                relation_type=relation.relation_type,
+                op=op,
+                old_index=old_index,
+                new_index=None if op == "remove" else relation.index,
+            )
+        )
+
+
+def _renumber(session, relations, inserted=None, gap=1):
+    """Set the index of ordered relations to their position.
+
+    :param relations: the relations to the children of a parent, in order.
+    :param inserted: the newly inserted relation, if any.
+    :param gap: difference between two consecutive indexes.
+    """
+    for idx, relation in enumerate(relations):
+        old_index, relation.index = relation.index, idx * gap
+        if relation is inserted:
+            _relation_changed(session, relation, "insert")
+        elif old_index != relation.index:
+            _relation_changed(session, relation, "move", old_index)
+
+
+def positions_subquery(parent_id, relation_type_id):
+    """Build a subquery of the positions of the children of a parent.
+
+    The position of a child is the rank of its relation index, starting at
+    0, i.e. the dense index of the child even if the indexes have gaps. The
+    children without index have no position.
+
+    :param parent_id: id of the parent PID.
+    :param relation_type_id: id of the relation type.
+    :returns: a subquery with the ``child_id`` and ``position`` columns.
+    """
+    not_indexed = PIDRelation.index.is_(None)
+    rank = func.row_number().over(
+        partition_by=not_indexed, order_by=(PIDRelation.index, PIDRelation.child_id)
+    )
+    return (
+        select(
+            PIDRelation.child_id,
+            case((not_indexed, None), else_=rank - 1).label("position"),
+        )
+        .where(
+            PIDRelation.parent_id == parent_id,
+            relation_type_filter(relation_type_id),
+        )
+        .subquery()
+    )
+
+
+def _gapped_index(before, after, gap):
+    """Pick the index of a child inserted between two indexes.
+
+    :param before: index of the previous child, or ``None`` if first.
+    :param after: index of the next child, or ``None`` if last.
+    :returns: the index, or ``None`` if there is no free index between the
+        two children.
+    """
+    if before is None and after is None:
+        return 0
+    elif after is None:
+        return before + gap
+    elif before is None:
+        return after - gap
+    elif after - before > 1:
+        return (before + after) // 2
+    return None
+
+
 class PIDNode(object):
     """PID Node API.
 
@@ -179,13 +554,26 @@ class PIDNode(object):
             stmt = (
                 select(db.func.count())
                 .select_from(PIDRelation)
-                .filter_by(child=child_pid, relation_type=self.relation_type.id)
+                .filter_by(child=child_pid)
+                .where(relation_type_filter(self.relation_type.id))
             )
             if db.session.execute(stmt).scalar() >= self.max_parents:
                 raise PIDRelationConsistencyError(
                     "This pid already has the maximum number of parents."
                 )
 
+    def _preloaded(self, from_parent=True):
+        """Get the preloaded relations of the node, if any.
+
+        :param from_parent: get the children if True, else the parents.
+        :returns: a list of :class:`PreloadedRelation` ordered by index, or
+            ``None`` if the relations were not preloaded.
+        """
+        preloaded = getattr(self.pid, _PRELOADED_ATTR, None)
+        if preloaded is None:
+            return None
+        return preloaded.get((self.relation_type.id, from_parent))
+
     def _connected_pids(self, from_parent=True):
         """Follow a relationship to find connected PIDs.
 
@@ -193,38 +581,15 @@ class PIDNode(object):
         search for its parents.
         :type from_parent: bool
         """
-        to_pid = aliased(PersistentIdentifier, name="to_pid")
-        if from_parent:
-            to_relation_id = PIDRelation.child_id
-            from_relation_id = PIDRelation.parent_id
-        else:
-            to_relation_id = PIDRelation.parent_id
-            from_relation_id = PIDRelation.child_id
-
-        initial_stmt = select(to_pid).join(
-            PIDRelation,
-            and_(
-                to_pid.id == to_relation_id,
-                PIDRelation.relation_type == self.relation_type.id,
-            ),
+        stmt, to_pid = connected_pids_statement(
+            self.pid, self.relation_type.id, from_parent=from_parent
+        )
+        return PIDQuery(
+            stmt,
+            db.session(),
+            _filtered_pid_class=to_pid,
+            _preloaded=self._preloaded(from_parent=from_parent),
         )
-
-        query_builder = PIDQuery(initial_stmt, db.session(), _filtered_pid_class=to_pid)
-
-        # Accept both PersistentIdentifier models and fake PIDs with just
-        # pid_value, pid_type as they are fetched with the PID fetcher.
-        if isinstance(self.pid, PersistentIdentifier):
-            query_builder = query_builder.filter(from_relation_id == self.pid.id)
-        else:
-            from_pid = aliased(PersistentIdentifier, name="from_pid")
-            query_builder = query_builder.join(
-                from_pid, from_pid.id == from_relation_id
-            ).filter(
-                from_pid.pid_value == self.pid.pid_value,
-                from_pid.pid_type == self.pid.pid_type,
-            )
-
-        return query_builder
 
     @property
     def parents(self):
@@ -241,36 +606,97 @@ class PIDNode(object):
         """Test if the given PID has any children."""
         return self.children.exists()
 
+    @property
+    def relations_version(self):
+        """Version token of the relations to the children of the node.
+
+        The token changes whenever a child is inserted, removed, reordered
+        or updated (e.g. its status), so it can be used as the ETag of the
+        listing of the children.
+        """
+        return _relations_version(
+            PIDRelation.parent_id == self._resolved_pid.id,
+            relation_type_filter(self.relation_type.id),
+        )
+
     @property
     def is_child(self):
         """Test if the given PID has any parents."""
         return self.parents.exists()
 
+    def _closure_filter(self, column):
+        """Filter the closure table on the relation type and the node PID."""
+        if self.relation_type.id not in closure_relation_types():
+            raise PIDRelationError(
+                "Relation type '{0}' has no closure table, see "
+                "PIDRELATIONS_CLOSURE_RELATION_TYPES.".format(self.relation_type.name)
+            )
+        return (
+            PIDRelationClosure.relation_type == self.relation_type.id,
+            column == self._resolved_pid.id,
+        )
+
+    @property
+    def ancestors(self):
+        """Retrieves all the ancestor PIDs, read from the closure table."""
+        ids = select(PIDRelationClosure.ancestor_id).where(
+            *self._closure_filter(PIDRelationClosure.descendant_id)
+        )
+        return PIDQuery(
+            select(PersistentIdentifier).where(PersistentIdentifier.id.in_(ids)),
+            db.session(),
+        )
+
+    @property
+    def descendants(self):
+        """Retrieves all the descendant PIDs, read from the closure table."""
+        ids = select(PIDRelationClosure.descendant_id).where(
+            *self._closure_filter(PIDRelationClosure.ancestor_id)
+        )
+        return PIDQuery(
+            select(PersistentIdentifier).where(PersistentIdentifier.id.in_(ids)),
+            db.session(),
+        )
+
+    def has_descendant(self, pid):
+        """Test if a PID is a descendant of the node, from the closure table."""
+        if not isinstance(pid, PersistentIdentifier):
+            pid = resolve_pid(pid)
+        stmt = select(
+            exists().where(
+                *self._closure_filter(PIDRelationClosure.ancestor_id),
+                PIDRelationClosure.descendant_id == pid.id,
+            )
+        )
+        return db.session.scalar(stmt, bind_arguments=read_bind_arguments())
+
     def insert_child(self, child_pid):
         """Add the given PID to the list of children PIDs."""
+        relation_writes_started(db.session)
+        # TODO: Here add the check for the max parents and the max children
         self._check_child_limits(child_pid)
-        try:
-            # TODO: Here add the check for the max parents and the max children
-            with db.session.begin_nested():
-                if not isinstance(child_pid, PersistentIdentifier):
-                    child_pid = resolve_pid(child_pid)
-                return PIDRelation.create(
-                    self._resolved_pid, child_pid, self.relation_type.id, None
-                )
-        except IntegrityError:
-            raise PIDRelationConsistencyError("PID Relation already exists.")
+        if not isinstance(child_pid, PersistentIdentifier):
+            child_pid = resolve_pid(child_pid)
+        clear_preloaded_relations(self.pid, self._resolved_pid, child_pid)
+        relation = PIDRelation.insert(
+            self._resolved_pid, child_pid, self.relation_type.id, None
+        )
+        _relation_changed(db.session, relation, "insert")
+        return relation
 
     def remove_child(self, child_pid):
         """Remove a child from a PID concept."""
         with db.session.begin_nested():
             if not isinstance(child_pid, PersistentIdentifier):
                 child_pid = resolve_pid(child_pid)
+            clear_preloaded_relations(self.pid, self._resolved_pid, child_pid)
             stmt = select(PIDRelation).filter_by(
                 parent=self._resolved_pid,
                 child=child_pid,
                 relation_type=self.relation_type.id,
             )
             relation = db.session.execute(stmt).scalar_one()
+            _relation_changed(db.session, relation, "remove", relation.index)
             db.session.delete(relation)
 
 
@@ -281,17 +707,54 @@ class PIDNodeOrdered(PIDNode):
     relation_type.
     """
 
+    index_gap = None
+    """Gap between the indexes of consecutive children.
+
+    By default the indexes are dense (0, 1, 2...), so that inserting a child
+    rewrites the index of all the following children. When set (see
+    :class:`PIDNodeGappedOrdered`), a child is inserted at the middle of the
+    gap between its neighbours and the children are only renumbered when the
+    gap is exhausted. :meth:`index` still returns the dense position.
+    """
+
+    def _preloaded_child(self, child_pid):
+        """Get the preloaded relation to a child, if the node was preloaded.
+
+        :returns: a :class:`PreloadedRelation`, or ``None`` if the relations
+            of the node were not preloaded.
+        """
+        preloaded = self._preloaded()
+        if preloaded is None or not isinstance(child_pid, PersistentIdentifier):
+            return None
+        for relation in preloaded:
+            if relation.pid.id == child_pid.id:
+                return relation
+        raise NoResultFound("No row was found when one was required")
+
     def index(self, child_pid):
         """Index of the child in the relation."""
+        relation = self._preloaded_child(child_pid)
+        if relation is not None:
+            if self.index_gap and relation.index is not None:
+                indexed = self.children.indexed().ordered("asc")._preloaded
+                return [r.pid.id for r in indexed].index(child_pid.id)
+            return relation.index
         if not isinstance(child_pid, PersistentIdentifier):
             child_pid = resolve_pid(child_pid)
-        stmt = select(PIDRelation).filter_by(
-            parent=self._resolved_pid,
-            child=child_pid,
-            relation_type=self.relation_type.id,
-        )
-        relation = db.session.execute(stmt).scalar_one()
-        return relation.index
+        if self.index_gap:
+            positions = positions_subquery(self._resolved_pid.id, self.relation_type.id)
+            stmt = select(positions.c.position).where(
+                positions.c.child_id == child_pid.id
+            )
+        else:
+            stmt = select(PIDRelation.index).where(
+                PIDRelation.parent_id == self._resolved_pid.id,
+                PIDRelation.child_id == child_pid.id,
+                relation_type_filter(self.relation_type.id),
+            )
+        return db.session.execute(
+            stmt, bind_arguments=read_bind_arguments()
+        ).scalar_one()
 
     def is_last_child(self, child_pid):
         """
@@ -314,10 +777,33 @@ class PIDNodeOrdered(PIDNode):
         If the 'pid' is a Version PID, return the latest of its siblings.
         Return None for the non-versioned PIDs.
         """
-        return self.children.filter(PIDRelation.index.isnot(None)).ordered().first()
+        return self.children.indexed().ordered().first()
+
+    def as_of(self, timestamp):
+        """Get the children of the node at a point in time.
+
+        The relation type must keep its history, see
+        ``PIDRELATIONS_HISTORY_RELATION_TYPES``.
+
+        :param timestamp: the point in time, as a naive UTC datetime.
+        :returns: a :class:`invenio_pidrelations.history.RelationsAsOf`
+            answering ``children``, ``last_child`` and ``index()`` at this
+            point in time.
+        """
+        return RelationsAsOf(self, timestamp)
 
     def next_child(self, child_pid):
         """Get the next child PID in the PID relation."""
+        relation = self._preloaded_child(child_pid)
+        if relation is not None:
+            if relation.index is None:
+                return None
+            following = [
+                r
+                for r in self.children.indexed().ordered(ord="asc")._preloaded
+                if r.index > relation.index
+            ]
+            return following[0].pid if following else None
         relation = self._get_child_relation(child_pid)
         if relation.index is not None:
             return (
@@ -330,6 +816,16 @@ class PIDNodeOrdered(PIDNode):
 
     def previous_child(self, child_pid):
         """Get the previous child PID in the PID relation."""
+        relation = self._preloaded_child(child_pid)
+        if relation is not None:
+            if relation.index is None:
+                return None
+            preceding = [
+                r
+                for r in self.children.indexed().ordered(ord="desc")._preloaded
+                if r.index < relation.index
+            ]
+            return preceding[0].pid if preceding else None
         relation = self._get_child_relation(child_pid)
         if relation.index is not None:
             return (
@@ -352,52 +848,113 @@ class PIDNodeOrdered(PIDNode):
                   have PIDRelation.index information.
 
         """
+        relation_writes_started(db.session)
         self._check_child_limits(child_pid)
         if index is None:
             index = -1
-        try:
-            with db.session.begin_nested():
-                if not isinstance(child_pid, PersistentIdentifier):
-                    child_pid = resolve_pid(child_pid)
-                stmt = (
-                    select(PIDRelation)
-                    .filter(
-                        PIDRelation.parent_id == self._resolved_pid.id,
-                        PIDRelation.relation_type == self.relation_type.id,
-                    )
-                    .order_by(PIDRelation.index)
-                )
-                child_relations = db.session.execute(stmt).scalars().all()
-                relation_obj = PIDRelation.create(
-                    self._resolved_pid, child_pid, self.relation_type.id, None
-                )
-                if index == -1:
-                    child_relations.append(relation_obj)
-                else:
-                    child_relations.insert(index, relation_obj)
-                for idx, c in enumerate(child_relations):
-                    c.index = idx
-        except IntegrityError:
-            raise PIDRelationConsistencyError("PID Relation already exists.")
+        if not isinstance(child_pid, PersistentIdentifier):
+            child_pid = resolve_pid(child_pid)
+        clear_preloaded_relations(self.pid, self._resolved_pid, child_pid)
+        if self.index_gap:
+            return self._insert_gapped(child_pid, index)
+        stmt = (
+            select(PIDRelation)
+            .filter(
+                PIDRelation.parent_id == self._resolved_pid.id,
+                relation_type_filter(self.relation_type.id),
+            )
+            .order_by(PIDRelation.index)
+        )
+        child_relations = db.session.execute(stmt).scalars().all()
+        relation_obj = PIDRelation.insert(
+            self._resolved_pid, child_pid, self.relation_type.id, None
+        )
+        if index == -1:
+            child_relations.append(relation_obj)
+        else:
+            child_relations.insert(index, relation_obj)
+        _renumber(db.session, child_relations, inserted=relation_obj)
+
+    def _insert_gapped(self, child_pid, index):
+        """Insert a child in the gap between the indexes of its neighbours."""
+        indexed = (
+            PIDRelation.parent_id == self._resolved_pid.id,
+            relation_type_filter(self.relation_type.id),
+            PIDRelation.index.isnot(None),
+        )
+        keys = select(PIDRelation.index).where(*indexed)
+        neighbours = []
+        if index == 0:
+            neighbours = [None] + db.session.scalars(
+                keys.order_by(PIDRelation.index).limit(1)
+            ).all()
+        elif index != -1:
+            neighbours = db.session.scalars(
+                keys.order_by(PIDRelation.index).offset(index - 1).limit(2)
+            ).all()
+        if len(neighbours) < 2:
+            # Inserted after the last child
+            last = db.session.scalar(keys.order_by(PIDRelation.index.desc()).limit(1))
+            neighbours = [last, None]
+
+        new_index = _gapped_index(*neighbours, gap=self.index_gap)
+        relation = PIDRelation.insert(
+            self._resolved_pid, child_pid, self.relation_type.id, new_index
+        )
+        if new_index is not None:
+            _relation_changed(db.session, relation, "insert")
+        else:
+            # The gap is exhausted, renumber all the children at once
+            stmt = (
+                select(PIDRelation)
+                .where(*indexed, PIDRelation.child_id != child_pid.id)
+                .order_by(PIDRelation.index)
+            )
+            child_relations = db.session.scalars(stmt).all()
+            child_relations.insert(index, relation)
+            _renumber(
+                db.session, child_relations, inserted=relation, gap=self.index_gap
+            )
 
     def remove_child(self, child_pid, reorder=False):
-        """Remove a child from a PID concept."""
+        """Remove a child from a PID concept.
+
+        :param reorder: renumber the following children. Ignored if the
+            indexes have gaps, as the positions of the children stay dense.
+        """
         super(PIDNodeOrdered, self).remove_child(child_pid)
+        if self.index_gap:
+            return
         stmt = (
             select(PIDRelation)
             .filter(
                 PIDRelation.parent_id == self._resolved_pid.id,
-                PIDRelation.relation_type == self.relation_type.id,
+                relation_type_filter(self.relation_type.id),
             )
             .order_by(PIDRelation.index)
         )
         child_relations = db.session.execute(stmt).scalars().all()
         if reorder:
-            for idx, c in enumerate(child_relations):
-                c.index = idx
+            _renumber(db.session, child_relations)
+
+
+class PIDNodeGappedOrdered(PIDNodeOrdered):
+    """Ordered PID Node API with gaps between the indexes of the children.
+
+    Inserting a child among many others only writes its own relation, as
+    long as there is a free index between its neighbours.
+    """
+
+    index_gap = 1024
 
 
 __all__ = (
     "PIDNode",
+    "PIDNodeGappedOrdered",
     "PIDNodeOrdered",
+    "clear_preloaded_relations",
+    "positions_subquery",
+    "preload_relations",
+    "relation_type_filter",
+    "relations_version",
 )
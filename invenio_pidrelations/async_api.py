@@ -0,0 +1,589 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Asynchronous API for PID relations concepts.
+
+The classes of this module have the same semantics as their synchronous
+counterparts (:class:`invenio_pidrelations.api.PIDNode`,
+:class:`invenio_pidrelations.api.PIDNodeOrdered`,
+:class:`invenio_pidrelations.contrib.versioning.PIDNodeVersioning` and
+:class:`invenio_pidrelations.contrib.draft.PIDNodeDraft`), but issue their
+queries on a :class:`sqlalchemy.ext.asyncio.AsyncSession`. Methods and
+properties which query the database return awaitables.
+
+An ``AsyncSession`` cannot be used concurrently, thus nodes whose lookups are
+awaited together (e.g. with :func:`asyncio.gather`) need their own session.
+"""
+
+import uuid
+
+from invenio_pidstore.errors import PIDDoesNotExistError, PIDInvalidAction
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus, Redirect
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError, NoResultFound
+
+from .api import (
+    PIDNodeGappedOrdered,
+    PIDQuery,
+    _gapped_index,
+    _relation_changed,
+    _renumber,
+    connected_pids_statement,
+    positions_subquery,
+    relation_type_filter,
+)
+from .cache import relations_changed
+from .contrib.versioning import (
+    DraftState,
+    _check_redirect_state,
+    draft_state_statement,
+    redirect_state_statement,
+)
+from .errors import PIDRelationConsistencyError
+from .models import PIDRelation
+from .utils import resolve_relation_type_config
+
+
+class AsyncPIDQuery(PIDQuery):
+    """Query wrapper executing its statement on an ``AsyncSession``.
+
+    The statement is built with the same chainable methods as
+    :class:`invenio_pidrelations.api.PIDQuery`, while the methods fetching
+    the results are coroutines.
+    """
+
+    async def count(self):
+        """Count the results of the query."""
+        return await self._session.scalar(
+            select(func.count()).select_from(self._statement.subquery())
+        )
+
+    async def first(self):
+        """Get the first result."""
+        return (await self._session.scalars(self._statement.limit(1))).first()
+
+    async def one(self):
+        """Get exactly one result."""
+        return (await self._session.scalars(self._statement)).one()
+
+    async def one_or_none(self):
+        """Get one result or None if no results."""
+        return (await self._session.scalars(self._statement)).one_or_none()
+
+    async def all(self):
+        """Get all results."""
+        return (await self._session.scalars(self._statement)).all()
+
+    async def exists(self):
+        """Check if any results exist."""
+        return await self._session.scalar(
+            select(1).select_from(self._statement.subquery()).exists().select()
+        )
+
+
+async def resolve_pid(session, fetched_pid):
+    """Retrieve the real PID given a fetched PID.
+
+    :param session: the ``AsyncSession``.
+    :param fetched_pid: fetched PID to resolve.
+    """
+    if isinstance(fetched_pid, PersistentIdentifier):
+        return fetched_pid
+    args = dict(pid_type=fetched_pid.pid_type, pid_value=str(fetched_pid.pid_value))
+    if fetched_pid.provider.pid_provider:
+        args["pid_provider"] = fetched_pid.provider.pid_provider
+    try:
+        return (
+            await session.execute(select(PersistentIdentifier).filter_by(**args))
+        ).scalar_one()
+    except NoResultFound:
+        raise PIDDoesNotExistError(fetched_pid.pid_type, fetched_pid.pid_value)
+
+
+async def redirect(session, pid, to_pid):
+    """Redirect a PID to another one.
+
+    Equivalent of :meth:`invenio_pidstore.models.PersistentIdentifier.redirect`.
+    """
+    if not (pid.is_registered() or pid.is_redirected()):
+        raise PIDInvalidAction("Persistent identifier is not registered.")
+    try:
+        async with session.begin_nested():
+            if pid.is_redirected():
+                r = await session.get(Redirect, pid.object_uuid)
+                r.pid_id = to_pid.id
+            else:
+                r = Redirect(id=uuid.uuid4(), pid_id=to_pid.id)
+                session.add(r)
+            pid.status = PIDStatus.REDIRECTED
+            pid.object_type = None
+            pid.object_uuid = r.id
+    except IntegrityError:
+        raise PIDDoesNotExistError(to_pid.pid_type, to_pid.pid_value)
+
+
+class AsyncPIDNode(object):
+    """Asynchronous PID Node API.
+
+    A node can have multiple parents and multiple children for a given
+    relation_type.
+    """
+
+    def __init__(
+        self, session, pid, relation_type, max_children=None, max_parents=None
+    ):
+        """Constructor.
+
+        :param session: the ``AsyncSession`` used for the queries.
+        :param pid: the central PID of the node.
+        :param relation_type: one of the declared relation types from config.
+        :param max_children: maximum number of children allowed.
+        :param max_parents: maximum number of parents
+            for each child of the node.
+        """
+        self.session = session
+        self.relation_type = relation_type
+        self.pid = pid
+        self.max_children = max_children
+        self.max_parents = max_parents
+        self._resolved = None
+
+    async def _resolved_pid(self):
+        """Resolve self.pid if it is a fetched pid."""
+        if self._resolved is None:
+            self._resolved = await resolve_pid(self.session, self.pid)
+        return self._resolved
+
+    async def _get_child_relation(self, child_pid):
+        """Retrieve the relation between this node and a child PID."""
+        parent = await self._resolved_pid()
+        child_pid = await resolve_pid(self.session, child_pid)
+        stmt = select(PIDRelation).where(
+            PIDRelation.parent_id == parent.id,
+            PIDRelation.child_id == child_pid.id,
+            relation_type_filter(self.relation_type.id),
+        )
+        return (await self.session.execute(stmt)).scalar_one()
+
+    async def _check_child_limits(self, child_pid):
+        """Check that inserting a child is within the limits."""
+        if (
+            self.max_children is not None
+            and await self.children.count() >= self.max_children
+        ):
+            raise PIDRelationConsistencyError(
+                "Max number of children is set to {}.".format(self.max_children)
+            )
+        if self.max_parents is not None:
+            stmt = (
+                select(func.count())
+                .select_from(PIDRelation)
+                .where(
+                    PIDRelation.child_id == child_pid.id,
+                    relation_type_filter(self.relation_type.id),
+                )
+            )
+            if await self.session.scalar(stmt) >= self.max_parents:
+                raise PIDRelationConsistencyError(
+                    "This pid already has the maximum number of parents."
+                )
+
+    def _connected_pids(self, from_parent=True):
+        """Follow a relationship to find connected PIDs.
+
+        :param from_parent: search children from the current pid if True, else
+        search for its parents.
+        :type from_parent: bool
+        """
+        stmt, to_pid = connected_pids_statement(
+            self.pid, self.relation_type.id, from_parent=from_parent
+        )
+        return AsyncPIDQuery(stmt, self.session, _filtered_pid_class=to_pid)
+
+    @property
+    def parents(self):
+        """Retrieves all parent PIDs."""
+        return self._connected_pids(from_parent=False)
+
+    @property
+    def children(self):
+        """Retrieves all child PIDs."""
+        return self._connected_pids(from_parent=True)
+
+    @property
+    def is_parent(self):
+        """Test if the given PID has any children."""
+        return self.children.exists()
+
+    @property
+    def is_child(self):
+        """Test if the given PID has any parents."""
+        return self.parents.exists()
+
+    async def _create_relation(self, child_pid, index=None):
+        """Create a relation to a child, in the current transaction.
+
+        :raises PIDRelationConsistencyError: if the relation already exists.
+        """
+        parent = await self._resolved_pid()
+        key = (parent.id, child_pid.id, self.relation_type.id)
+        # Checked before adding the relation, which would otherwise conflict
+        # with the existing one in the identity map.
+        if await self.session.get(PIDRelation, key) is not None:
+            raise PIDRelationConsistencyError("PID Relation already exists.")
+        relation = PIDRelation(
+            parent_id=parent.id,
+            child_id=child_pid.id,
+            relation_type=self.relation_type.id,
+            index=index,
+        )
+        self.session.add(relation)
+        return relation
+
+    async def insert_child(self, child_pid):
+        """Add the given PID to the list of children PIDs."""
+        child_pid = await resolve_pid(self.session, child_pid)
+        await self._check_child_limits(child_pid)
+        try:
+            async with self.session.begin_nested():
+                relation = await self._create_relation(child_pid)
+                _relation_changed(self.session, relation, "insert")
+        except IntegrityError:
+            raise PIDRelationConsistencyError("PID Relation already exists.")
+        return relation
+
+    async def remove_child(self, child_pid):
+        """Remove a child from a PID concept."""
+        async with self.session.begin_nested():
+            relation = await self._get_child_relation(child_pid)
+            _relation_changed(self.session, relation, "remove", relation.index)
+            await self.session.delete(relation)
+
+
+class AsyncPIDNodeOrdered(AsyncPIDNode):
+    """Asynchronous ordered PID Node API."""
+
+    index_gap = None
+    """See :attr:`invenio_pidrelations.api.PIDNodeOrdered.index_gap`."""
+
+    async def index(self, child_pid):
+        """Index of the child in the relation."""
+        if self.index_gap:
+            child_pid = await resolve_pid(self.session, child_pid)
+            positions = positions_subquery(
+                (await self._resolved_pid()).id, self.relation_type.id
+            )
+            return (
+                await self.session.execute(
+                    select(positions.c.position).where(
+                        positions.c.child_id == child_pid.id
+                    )
+                )
+            ).scalar_one()
+        return (await self._get_child_relation(child_pid)).index
+
+    async def is_last_child(self, child_pid):
+        """Determine if 'pid' is the latest version of a resource."""
+        last_child = await self.last_child
+        if last_child is None:
+            return False
+        return last_child == child_pid
+
+    @property
+    def last_child(self):
+        """Get the latest PID as pointed by the Head PID."""
+        return self.children.indexed().ordered().first()
+
+    async def next_child(self, child_pid):
+        """Get the next child PID in the PID relation."""
+        relation = await self._get_child_relation(child_pid)
+        if relation.index is None:
+            return None
+        return (
+            await self.children.filter(PIDRelation.index > relation.index)
+            .ordered(ord="asc")
+            .first()
+        )
+
+    async def previous_child(self, child_pid):
+        """Get the previous child PID in the PID relation."""
+        relation = await self._get_child_relation(child_pid)
+        if relation.index is None:
+            return None
+        return (
+            await self.children.filter(PIDRelation.index < relation.index)
+            .ordered(ord="desc")
+            .first()
+        )
+
+    async def _child_relations(self):
+        """Get the relations to all the children, ordered by index."""
+        parent = await self._resolved_pid()
+        stmt = (
+            select(PIDRelation)
+            .where(
+                PIDRelation.parent_id == parent.id,
+                relation_type_filter(self.relation_type.id),
+            )
+            .order_by(PIDRelation.index)
+        )
+        return list((await self.session.scalars(stmt)).all())
+
+    async def insert_child(self, child_pid, index=-1):
+        """Insert a new child into a PID concept.
+
+        See :meth:`invenio_pidrelations.api.PIDNodeOrdered.insert_child`.
+        """
+        child_pid = await resolve_pid(self.session, child_pid)
+        await self._check_child_limits(child_pid)
+        if index is None:
+            index = -1
+        try:
+            async with self.session.begin_nested():
+                if self.index_gap:
+                    return await self._insert_gapped(child_pid, index)
+                child_relations = await self._child_relations()
+                relation = await self._create_relation(child_pid)
+                if index == -1:
+                    child_relations.append(relation)
+                else:
+                    child_relations.insert(index, relation)
+                _renumber(self.session, child_relations, inserted=relation)
+        except IntegrityError:
+            raise PIDRelationConsistencyError("PID Relation already exists.")
+        return relation
+
+    async def _insert_gapped(self, child_pid, index):
+        """Insert a child in the gap between the indexes of its neighbours."""
+        keys = (
+            select(PIDRelation.index)
+            .where(
+                PIDRelation.parent_id == (await self._resolved_pid()).id,
+                relation_type_filter(self.relation_type.id),
+                PIDRelation.index.isnot(None),
+            )
+            .order_by(PIDRelation.index)
+        )
+        neighbours = []
+        if index == 0:
+            neighbours = [None] + list(await self.session.scalars(keys.limit(1)))
+        elif index != -1:
+            neighbours = list(
+                await self.session.scalars(keys.offset(index - 1).limit(2))
+            )
+        if len(neighbours) < 2:
+            # Inserted after the last child
+            last = await self.session.scalar(
+                keys.order_by(None).order_by(PIDRelation.index.desc()).limit(1)
+            )
+            neighbours = [last, None]
+
+        relation = await self._create_relation(
+            child_pid, _gapped_index(*neighbours, gap=self.index_gap)
+        )
+        if relation.index is not None:
+            _relation_changed(self.session, relation, "insert")
+        else:
+            # The gap is exhausted, renumber all the children at once
+            child_relations = [
+                r for r in await self._child_relations() if r.index is not None
+            ]
+            child_relations.insert(index, relation)
+            _renumber(
+                self.session, child_relations, inserted=relation, gap=self.index_gap
+            )
+        return relation
+
+    async def remove_child(self, child_pid, reorder=False):
+        """Remove a child from a PID concept.
+
+        See :meth:`invenio_pidrelations.api.PIDNodeOrdered.remove_child`.
+        """
+        await super(AsyncPIDNodeOrdered, self).remove_child(child_pid)
+        if reorder and not self.index_gap:
+            _renumber(self.session, await self._child_relations())
+            await self.session.flush()
+
+
+class AsyncPIDNodeGappedOrdered(AsyncPIDNodeOrdered):
+    """Asynchronous ordered PID Node API with gaps between the indexes."""
+
+    index_gap = PIDNodeGappedOrdered.index_gap
+
+
+class AsyncPIDNodeDraft(AsyncPIDNode):
+    """Asynchronous API for PID draft relations."""
+
+    def __init__(self, session, pid):
+        """Create a record draft API.
+
+        :param session: the ``AsyncSession`` used for the queries.
+        :param pid: either the published record PID or the deposit PID.
+        """
+        super(AsyncPIDNodeDraft, self).__init__(
+            session,
+            pid=pid,
+            relation_type=resolve_relation_type_config("record_draft"),
+            max_parents=1,
+            max_children=1,
+        )
+
+
+class AsyncPIDNodeVersioning(AsyncPIDNodeOrdered):
+    """Asynchronous API for PID versioning relations."""
+
+    def __init__(self, session, pid):
+        """Create a PID versioning API.
+
+        :param session: the ``AsyncSession`` used for the queries.
+        :param pid: either the parent PID or a specific record version PID.
+        """
+        super(AsyncPIDNodeVersioning, self).__init__(
+            session,
+            pid=pid,
+            relation_type=resolve_relation_type_config("version"),
+            max_parents=1,
+            max_children=None,
+        )
+
+    @property
+    def children(self):
+        """Children of the parent."""
+        return super(AsyncPIDNodeVersioning, self).children.status(PIDStatus.REGISTERED)
+
+    @property
+    def draft_child(self):
+        """Get the draft (RESERVED) child."""
+        return (
+            super(AsyncPIDNodeVersioning, self)
+            .children.status(PIDStatus.RESERVED)
+            .one_or_none()
+        )
+
+    @property
+    def draft_state(self):
+        """Get the draft (RESERVED) child and its deposit PID, with one query.
+
+        :returns: an awaitable of a
+            :class:`invenio_pidrelations.contrib.versioning.DraftState`.
+        """
+        return self._draft_state()
+
+    async def _draft_state(self):
+        result = await self.session.execute(draft_state_statement(self.pid))
+        row = result.one_or_none()
+        return DraftState(*row) if row else DraftState(None, None)
+
+    @property
+    def draft_child_deposit(self):
+        """Get the deposit PID of the draft child."""
+        return self._draft_child_deposit()
+
+    async def _draft_child_deposit(self):
+        return (await self._draft_state()).deposit
+
+    async def insert_child(self, child_pid, index=-1):
+        """Insert a Version child PID."""
+        child_pid = await resolve_pid(self.session, child_pid)
+        if child_pid.status != PIDStatus.REGISTERED:
+            raise PIDRelationConsistencyError(
+                "Version PIDs should have status 'REGISTERED'. Use "
+                "insert_draft_child to insert 'RESERVED' draft PID."
+            )
+        async with self.session.begin_nested():
+            # if there is a draft and "child" is inserted as the last version,
+            # it should be inserted before the draft.
+            draft = await self.draft_child
+            if draft and index == -1:
+                index = await self.index(draft)
+            await super(AsyncPIDNodeVersioning, self).insert_child(
+                child_pid, index=index
+            )
+            await self.update_redirect()
+
+    async def remove_child(self, child_pid):
+        """Remove a Version child PID."""
+        child_pid = await resolve_pid(self.session, child_pid)
+        if child_pid.status == PIDStatus.RESERVED:
+            raise PIDRelationConsistencyError(
+                "Version PIDs should not have status 'RESERVED'. Use "
+                "remove_draft_child to remove a draft PID."
+            )
+        async with self.session.begin_nested():
+            await super(AsyncPIDNodeVersioning, self).remove_child(
+                child_pid, reorder=True
+            )
+            await self.update_redirect()
+
+    async def insert_draft_child(self, child_pid):
+        """Insert a draft child to versioning."""
+        child_pid = await resolve_pid(self.session, child_pid)
+        if child_pid.status != PIDStatus.RESERVED:
+            raise PIDRelationConsistencyError(
+                "Draft child should have status 'RESERVED'"
+            )
+        draft_child = await self.draft_child
+        if draft_child:
+            raise PIDRelationConsistencyError(
+                "Draft child already exists for this relation: {0}".format(draft_child)
+            )
+        async with self.session.begin_nested():
+            await super(AsyncPIDNodeVersioning, self).insert_child(child_pid, index=-1)
+
+    async def remove_draft_child(self):
+        """Remove the draft child from versioning."""
+        draft_child = await self.draft_child
+        if draft_child:
+            async with self.session.begin_nested():
+                await super(AsyncPIDNodeVersioning, self).remove_child(
+                    draft_child, reorder=True
+                )
+
+    async def publish_draft(self):
+        """Publish the draft child in place, as the last version.
+
+        See
+        :meth:`invenio_pidrelations.contrib.versioning.PIDNodeVersioning.publish_draft`.
+        """
+        draft = await self.draft_child
+        if draft is None:
+            raise PIDRelationConsistencyError("No draft child to publish.")
+        async with self.session.begin_nested():
+            draft.status = PIDStatus.REGISTERED
+            relation = await self._get_child_relation(draft)
+            _relation_changed(self.session, relation, "status", relation.index)
+            parent = await self._resolved_pid()
+            if parent.status == PIDStatus.RESERVED:
+                parent.status = PIDStatus.REGISTERED
+            await self.update_redirect()
+        return draft
+
+    async def update_redirect(self):
+        """Update the parent redirect to the current last child.
+
+        See
+        :meth:`invenio_pidrelations.contrib.versioning.PIDNodeVersioning.update_redirect`.
+        """
+        parent = await self._resolved_pid()
+        relations_changed(self.session, parent.id)
+        result = await self.session.execute(redirect_state_statement(parent.id))
+        invalid, last_child = result.one()
+        if last_child:
+            await redirect(self.session, parent, last_child)
+        else:
+            _check_redirect_state(invalid)
+
+
+__all__ = (
+    "AsyncPIDNode",
+    "AsyncPIDNodeDraft",
+    "AsyncPIDNodeGappedOrdered",
+    "AsyncPIDNodeOrdered",
+    "AsyncPIDNodeVersioning",
+    "AsyncPIDQuery",
+)
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Streaming export and import of PID relation graphs.
+
+Relations are exchanged keyed by ``(pid_type, pid_value)`` of both ends and
+by the relation type name, so that a dump can be loaded in an instance where
+the internal PID ids differ.
+"""
+
+import csv
+import json
+import os
+from itertools import islice
+
+from invenio_db import db
+from invenio_pidstore.models import PersistentIdentifier
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.orm import aliased
+
+from .models import PIDRelation
+from .utils import resolve_relation_type_config
+
+FIELDS = (
+    "parent_pid_type",
+    "parent_pid_value",
+    "child_pid_type",
+    "child_pid_value",
+    "relation_type",
+    "index",
+)
+"""Fields of an exported relation, in CSV column order."""
+
+FORMATS = ("ndjson", "csv")
+"""Supported serialization formats."""
+
+
+def export_relations(relation_types=None, batch_size=10000):
+    """Stream all the PID relations as dictionaries.
+
+    :param relation_types: names of the relation types to export, or ``None``
+        to export all of them.
+    :param batch_size: number of rows fetched from the database at a time.
+    """
+    parent = aliased(PersistentIdentifier, name="parent_pid")
+    child = aliased(PersistentIdentifier, name="child_pid")
+    stmt = (
+        select(
+            parent.pid_type,
+            parent.pid_value,
+            child.pid_type,
+            child.pid_value,
+            PIDRelation.relation_type,
+            PIDRelation.index,
+        )
+        .join(parent, parent.id == PIDRelation.parent_id)
+        .join(child, child.id == PIDRelation.child_id)
+        .order_by(PIDRelation.parent_id, PIDRelation.relation_type, PIDRelation.index)
+        .execution_options(yield_per=batch_size)
+    )
+    if relation_types:
+        stmt = stmt.where(
+            PIDRelation.relation_type.in_(
+                [resolve_relation_type_config(name).id for name in relation_types]
+            )
+        )
+
+    names = {}
+    for row in db.session.execute(stmt):
+        relation_type = row[4]
+        if relation_type not in names:
+            names[relation_type] = resolve_relation_type_config(relation_type).name
+        yield dict(zip(FIELDS, row[:4] + (names[relation_type], row[5])))
+
+
+def dump_relations(relations, stream, fmt="ndjson"):
+    """Write exported relations to a text stream.
+
+    :param relations: iterable of relation dictionaries.
+    :param stream: writable text stream.
+    :param fmt: one of :data:`FORMATS`.
+    :returns: the number of written relations.
+    """
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(stream, fieldnames=FIELDS)
+        writer.writeheader()
+        for count, relation in enumerate(relations, 1):
+            writer.writerow(relation)
+    elif fmt == "ndjson":
+        for count, relation in enumerate(relations, 1):
+            stream.write(json.dumps(relation))
+            stream.write("\n")
+    else:
+        raise ValueError("Format must be one of {0}.".format(", ".join(FORMATS)))
+    return count
+
+
+def load_relations(stream, fmt="ndjson"):
+    """Read exported relations from a text stream.
+
+    :param stream: readable text stream.
+    :param fmt: one of :data:`FORMATS`.
+    """
+    if fmt == "csv":
+        for row in csv.DictReader(stream):
+            row["index"] = int(row["index"]) if row["index"] else None
+            yield row
+    elif fmt == "ndjson":
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError("Format must be one of {0}.".format(", ".join(FORMATS)))
+
+
+def read_checkpoint(path):
+    """Read the number of already imported rows from a checkpoint file."""
+    if path is None or not os.path.exists(path):
+        return 0
+    with open(path) as fp:
+        return json.load(fp)["offset"]
+
+
+def write_checkpoint(path, offset):
+    """Atomically store the number of imported rows in a checkpoint file."""
+    tmp_path = "{0}.tmp".format(path)
+    with open(tmp_path, "w") as fp:
+        json.dump({"offset": offset}, fp)
+    os.replace(tmp_path, path)
+
+
+def _resolve_pids(keys):
+    """Map ``(pid_type, pid_value)`` keys to PID ids with a single query."""
+    if not keys:
+        return {}
+    stmt = select(
+        PersistentIdentifier.pid_type,
+        PersistentIdentifier.pid_value,
+        PersistentIdentifier.id,
+    ).where(
+        tuple_(PersistentIdentifier.pid_type, PersistentIdentifier.pid_value).in_(
+            list(keys)
+        )
+    )
+    return {(t, v): id_ for t, v, id_ in db.session.execute(stmt)}
+
+
+def import_relations(relations, batch_size=1000, checkpoint=None):
+    """Insert exported relations in batches.
+
+    Each batch resolves all its PIDs with one query and is inserted with a
+    multi-row ``INSERT``, then committed. Relations which already exist are
+    skipped, so that an interrupted import can safely be run again.
+
+    :param relations: iterable of relation dictionaries.
+    :param batch_size: number of relations inserted per transaction.
+    :param checkpoint: path of a file recording the number of processed
+        relations. When given, the import resumes after the last committed
+        batch.
+    :returns: dictionary with the ``read``, ``inserted``, ``existing`` and
+        ``missing`` (unknown PIDs) counts.
+    """
+    offset = read_checkpoint(checkpoint)
+    relations = iter(relations)
+    # Skip the already imported relations
+    for _ in islice(relations, offset):
+        pass
+
+    stats = dict(read=offset, inserted=0, existing=0, missing=0)
+    type_ids = {}
+    while True:
+        batch = list(islice(relations, batch_size))
+        if not batch:
+            break
+        pids = _resolve_pids(
+            set((r["parent_pid_type"], r["parent_pid_value"]) for r in batch)
+            | set((r["child_pid_type"], r["child_pid_value"]) for r in batch)
+        )
+        rows = {}
+        for r in batch:
+            parent_id = pids.get((r["parent_pid_type"], r["parent_pid_value"]))
+            child_id = pids.get((r["child_pid_type"], r["child_pid_value"]))
+            if parent_id is None or child_id is None:
+                stats["missing"] += 1
+                continue
+            if r["relation_type"] not in type_ids:
+                type_ids[r["relation_type"]] = resolve_relation_type_config(
+                    r["relation_type"]
+                ).id
+            key = (parent_id, child_id, type_ids[r["relation_type"]])
+            rows[key] = dict(
+                parent_id=key[0],
+                child_id=key[1],
+                relation_type=key[2],
+                index=r["index"],
+            )
+        existing = PIDRelation.relations_exist(rows.keys())
+        values = [row for key, row in rows.items() if key not in existing]
+        if values:
+            db.session.execute(insert(PIDRelation.__table__), values)
+        db.session.commit()
+
+        stats["read"] += len(batch)
+        stats["inserted"] += len(values)
+        stats["existing"] += len(rows) - len(values)
+        if checkpoint:
+            write_checkpoint(checkpoint, stats["read"])
+    return stats
+
+
+__all__ = (
+    "dump_relations",
+    "export_relations",
+    "import_relations",
+    "load_relations",
+)
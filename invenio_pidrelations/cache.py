@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Shared cache of serialized relations.
+
+The cache backend is configured with ``PIDRELATIONS_CACHE`` and must provide
+the ``get(key)`` and ``set(key, value)`` methods of a Flask-Caching cache,
+e.g. ``"invenio_cache.proxies:current_cache"`` to share the cache between the
+processes through Redis, or a :class:`DictCache` for a single process.
+
+Cached values are keyed by the id of the parent PID of the relation and a
+version stamp of this parent. Mutations of the relations of a parent (and
+``PIDNodeVersioning.update_redirect()``,
+which must be called when the status of a child changes) replace its stamp
+once the transaction is committed, so that the values cached with the
+previous stamp are not used anymore. Parents changed in the current,
+uncommitted transaction bypass the cache.
+"""
+
+import uuid
+
+from flask import current_app
+from invenio_db import db
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .proxies import current_pidrelations
+from .replica import read_bind_arguments
+
+_CHANGED_PARENTS = "pidrelations_changed_parents"
+
+
+class DictCache(object):
+    """In-process cache backend, e.g. for tests or single process deployments."""
+
+    def __init__(self):
+        """Constructor."""
+        self.data = {}
+
+    def get(self, key):
+        """Get a value, or ``None`` if the key is not cached."""
+        return self.data.get(key)
+
+    def set(self, key, value, timeout=None):
+        """Set a value."""
+        self.data[key] = value
+        return True
+
+    def clear(self):
+        """Delete all the values."""
+        self.data.clear()
+        return True
+
+
+def relations_stamp(parent_id):
+    """Get the version stamp of the relations of a parent.
+
+    :param parent_id: id of the parent PID.
+    """
+    cache = current_pidrelations.cache
+    key = "pidrelations:stamp:{0}".format(parent_id)
+    stamp = cache.get(key)
+    if stamp is None:
+        stamp = bump_relations_stamp(parent_id)[0]
+    return stamp
+
+
+def bump_relations_stamp(*parent_ids):
+    """Replace the version stamps of the relations of parents.
+
+    :returns: the new stamps.
+    """
+    cache = current_pidrelations.cache
+    stamps = []
+    if cache is None:
+        return stamps
+    for parent_id in parent_ids:
+        stamp = uuid.uuid4().hex
+        cache.set("pidrelations:stamp:{0}".format(parent_id), stamp)
+        stamps.append(stamp)
+    return stamps
+
+
+def cached_relation(parent_id, key, compute, session=None):
+    """Get a value computed from the relations of a parent, through the cache.
+
+    :param parent_id: id of the parent PID whose relations the value depends
+        on.
+    :param key: key of the value, unique for this parent.
+    :param compute: function computing the value on cache misses. The value
+        must be picklable.
+    :param session: session whose uncommitted changes are checked.
+
+    Values computed from a read replica (see
+    :mod:`invenio_pidrelations.replica`) are not cached, as the replica may
+    not have the changes which replaced the stamp yet.
+    """
+    cache = current_pidrelations.cache
+    if cache is None or parent_id in _changed_parents(session, create=False):
+        return compute()
+    cache_key = "pidrelations:{0}:{1}:{2}".format(
+        parent_id, relations_stamp(parent_id), key
+    )
+    value = cache.get(cache_key)
+    if value is None:
+        value = compute()
+        if read_bind_arguments(session) is None:
+            cache.set(cache_key, value)
+    return value
+
+
+def _changed_parents(session=None, create=True):
+    """Get the set of parents changed in the transaction of a session."""
+    info = (db.session if session is None else session).info
+    if create:
+        return info.setdefault(_CHANGED_PARENTS, set())
+    return info.get(_CHANGED_PARENTS, ())
+
+
+def relations_changed(session, parent_id):
+    """Mark the relations of a parent as changed in a transaction.
+
+    Its version stamp is replaced when the transaction is committed.
+    """
+    if current_app.config["PIDRELATIONS_CACHE"] is not None:
+        _changed_parents(session).add(parent_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_changed_parents(session):
+    """Replace the stamps of the parents changed in a committed transaction."""
+    if session.in_nested_transaction():
+        return
+    parent_ids = session.info.pop(_CHANGED_PARENTS, None)
+    if parent_ids:
+        bump_relations_stamp(*parent_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_parents(session):
+    """Forget the parents changed in a rolled back transaction."""
+    if session.in_nested_transaction():
+        # The parents changed before the savepoint are still changed
+        return
+    session.info.pop(_CHANGED_PARENTS, None)
+
+
+__all__ = (
+    "DictCache",
+    "bump_relations_stamp",
+    "cached_relation",
+    "relations_changed",
+    "relations_stamp",
+)
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Click command-line interface for PID relations management."""
+
+import json
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from invenio_db import db
+
+from .bulk import (
+    FORMATS,
+    dump_relations,
+    export_relations,
+    import_relations,
+    load_relations,
+)
+from .closure import build_closure
+from .history import build_history
+from .indexers import count_relation_partitions, reindex_relations
+from .stats import relation_stats
+
+
+@click.group()
+def pidrelations():
+    """PID relations management commands."""
+
+
+@pidrelations.command("export")
+@click.argument("output", type=click.File("w"), default="-")
+@click.option("-f", "--format", "fmt", type=click.Choice(FORMATS), default="ndjson")
+@click.option(
+    "-t",
+    "--relation-type",
+    "relation_types",
+    multiple=True,
+    help="Name of a relation type to export (default: all).",
+)
+@click.option("--batch-size", type=int, default=10000)
+@with_appcontext
+def export_(output, fmt, relation_types, batch_size):
+    """Export PID relations keyed by PID type and value."""
+    count = dump_relations(
+        export_relations(relation_types=relation_types, batch_size=batch_size),
+        output,
+        fmt=fmt,
+    )
+    click.echo("Exported {0} relations.".format(count), err=True)
+
+
+@pidrelations.command("import")
+@click.argument("source", type=click.File("r"), default="-")
+@click.option("-f", "--format", "fmt", type=click.Choice(FORMATS), default="ndjson")
+@click.option("--batch-size", type=int, default=1000)
+@click.option(
+    "--checkpoint",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="File used to resume an interrupted import.",
+)
+@with_appcontext
+def import_(source, fmt, batch_size, checkpoint):
+    """Import PID relations exported with the export command."""
+    stats = import_relations(
+        load_relations(source, fmt=fmt),
+        batch_size=batch_size,
+        checkpoint=checkpoint,
+    )
+    click.echo(
+        "Read {read} relations: {inserted} inserted, {existing} already "
+        "existing, {missing} with unknown PIDs.".format(**stats),
+        err=True,
+    )
+
+
+@pidrelations.command("reindex")
+@click.option(
+    "-t",
+    "--relation-type",
+    default="version",
+    show_default=True,
+    help="Name of the relation type whose records are reindexed.",
+)
+@click.option(
+    "--processes",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes (default: number of CPUs).",
+)
+@click.option("--partition-size", type=click.IntRange(min=1), default=1000)
+@click.option(
+    "--index",
+    default=None,
+    help="Index of the records (default: the index of the first record of "
+    "each partition).",
+)
+@with_appcontext
+def reindex(relation_type, processes, partition_size, index):
+    """Update the relations of all the indexed records having relations."""
+    total = count_relation_partitions(relation_type, partition_size)
+    start = time.monotonic()
+    count = 0
+
+    def show_rate(_):
+        elapsed = time.monotonic() - start
+        return "{0} records ({1:.0f}/s)".format(
+            count, count / elapsed if elapsed else 0
+        )
+
+    with click.progressbar(
+        length=total,
+        label="Updating records",
+        item_show_func=show_rate,
+        file=click.get_text_stream("stderr"),
+    ) as bar:
+        for updated in reindex_relations(
+            relation_type,
+            partition_size=partition_size,
+            processes=processes,
+            index=index,
+        ):
+            count += updated
+            bar.update(1, count)
+    click.echo(
+        "Updated {0} records from {1} partitions in {2:.1f}s.".format(
+            count, total, time.monotonic() - start
+        ),
+        err=True,
+    )
+
+
+@pidrelations.command("build-closure")
+@click.option(
+    "-t",
+    "--relation-type",
+    "relation_types",
+    multiple=True,
+    help="Name of a relation type (default: PIDRELATIONS_CLOSURE_RELATION_TYPES).",
+)
+@with_appcontext
+def build_closure_(relation_types):
+    """Build the closure table of nested relations from the relations."""
+    if not relation_types:
+        relation_types = current_app.config["PIDRELATIONS_CLOSURE_RELATION_TYPES"]
+    for relation_type in relation_types:
+        count = build_closure(relation_type)
+        db.session.commit()
+        click.echo(
+            "Built {0} closure rows for '{1}'.".format(count, relation_type), err=True
+        )
+
+
+@pidrelations.command("build-history")
+@click.option(
+    "-t",
+    "--relation-type",
+    "relation_types",
+    multiple=True,
+    help="Name of a relation type (default: PIDRELATIONS_HISTORY_RELATION_TYPES).",
+)
+@with_appcontext
+def build_history_(relation_types):
+    """Add the history of the relations created before it was enabled."""
+    if not relation_types:
+        relation_types = current_app.config["PIDRELATIONS_HISTORY_RELATION_TYPES"]
+    for relation_type in relation_types:
+        count = build_history(relation_type)
+        db.session.commit()
+        click.echo(
+            "Added {0} history rows for '{1}'.".format(count, relation_type), err=True
+        )
+
+
+@pidrelations.command("stats")
+@click.option(
+    "-t",
+    "--relation-type",
+    "relation_types",
+    multiple=True,
+    help="Name of a relation type (default: all).",
+)
+@click.option(
+    "--top",
+    type=click.IntRange(min=0),
+    default=10,
+    show_default=True,
+    help="Number of parents with the most children to list.",
+)
+@click.option("--depth-limit", type=click.IntRange(min=1), default=100)
+@with_appcontext
+def stats(relation_types, top, depth_limit):
+    """Print statistics on the shape of the relations as JSON."""
+    if not relation_types:
+        relation_types = [
+            rt.name for rt in current_app.config["PIDRELATIONS_RELATION_TYPES"]
+        ]
+    click.echo(
+        json.dumps(
+            dict(
+                (rt, relation_stats(rt, top=top, depth_limit=depth_limit))
+                for rt in relation_types
+            ),
+            indent=2,
+        )
+    )
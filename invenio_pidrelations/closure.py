@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Closure table of the nested relations.
+
+For the relation types listed in ``PIDRELATIONS_CLOSURE_RELATION_TYPES``, the
+``pidrelations_closure`` table stores a row for each ancestor, descendant and
+distance (depth) between them, with the number of paths of this length. It is
+updated in the flush of each inserted or deleted
+:class:`invenio_pidrelations.models.PIDRelation` (e.g. by the
+``insert_child()`` and ``remove_child()`` methods of the node APIs, also
+asynchronous), so that the ancestors and descendants of a PID are found with
+a single indexed lookup, see the ``ancestors`` and ``descendants`` properties
+of ``invenio_pidrelations.api.PIDNode``.
+
+Relations written without the ORM (e.g. by
+``invenio_pidrelations.bulk.import_relations()``) are not added to the
+closure table: rebuild it afterwards with :func:`build_closure` or the
+``pidrelations build-closure`` command.
+"""
+
+from collections import Counter
+
+from flask import current_app
+from invenio_db import db
+from sqlalchemy import bindparam, delete, event, func, insert, literal, select, update
+
+from .errors import PIDRelationConsistencyError
+from .models import PIDRelation, PIDRelationClosure
+from .utils import resolve_relation_type_config
+
+_closure = PIDRelationClosure.__table__
+
+
+def closure_relation_types():
+    """Get the ids of the relation types having a closure table."""
+    return set(
+        resolve_relation_type_config(name).id
+        for name in current_app.config["PIDRELATIONS_CLOSURE_RELATION_TYPES"]
+    )
+
+
+def _paths(connection, relation_type, node_id, to_descendants):
+    """Get the paths from a node to its descendants or ancestors, itself included.
+
+    :returns: dict ``(node id, depth) -> number of paths``.
+    """
+    if to_descendants:
+        from_col, to_col = _closure.c.ancestor_id, _closure.c.descendant_id
+    else:
+        from_col, to_col = _closure.c.descendant_id, _closure.c.ancestor_id
+    stmt = select(to_col, _closure.c.depth, _closure.c.paths).where(
+        _closure.c.relation_type == relation_type, from_col == node_id
+    )
+    paths = {(node_id, 0): 1}
+    paths.update(
+        ((node, depth), count) for node, depth, count in connection.execute(stmt)
+    )
+    return paths
+
+
+def _link(connection, relation_type, parent_id, child_id, sign=1):
+    """Add (or remove) the paths through a relation to the closure table.
+
+    Each path from an ancestor of the parent to a descendant of the child
+    goes through the relation.
+
+    :param sign: ``1`` when the relation is inserted, ``-1`` when it is
+        deleted.
+    """
+    ancestors = _paths(connection, relation_type, parent_id, False)
+    descendants = _paths(connection, relation_type, child_id, True)
+    if sign > 0 and any(ancestor == child_id for ancestor, _ in ancestors):
+        raise PIDRelationConsistencyError(
+            "PID relation would create a cycle in the closure table."
+        )
+    delta = Counter()
+    for (ancestor, ancestor_depth), ancestor_paths in ancestors.items():
+        for (descendant, descendant_depth), descendant_paths in descendants.items():
+            depth = ancestor_depth + 1 + descendant_depth
+            delta[(ancestor, descendant, depth)] += ancestor_paths * descendant_paths
+
+    existing = dict(
+        ((ancestor, descendant, depth), paths)
+        for ancestor, descendant, depth, paths in connection.execute(
+            select(
+                _closure.c.ancestor_id,
+                _closure.c.descendant_id,
+                _closure.c.depth,
+                _closure.c.paths,
+            ).where(
+                _closure.c.relation_type == relation_type,
+                _closure.c.ancestor_id.in_(set(a for a, _ in ancestors)),
+                _closure.c.descendant_id.in_(set(d for d, _ in descendants)),
+            )
+        )
+    )
+    inserted, updated, deleted = [], [], []
+    for (ancestor, descendant, depth), paths in delta.items():
+        row = dict(
+            b_relation_type=relation_type,
+            b_ancestor_id=ancestor,
+            b_descendant_id=descendant,
+            b_depth=depth,
+        )
+        paths = existing.get((ancestor, descendant, depth), 0) + sign * paths
+        if (ancestor, descendant, depth) not in existing:
+            inserted.append(
+                dict(
+                    relation_type=relation_type,
+                    ancestor_id=ancestor,
+                    descendant_id=descendant,
+                    depth=depth,
+                    paths=paths,
+                )
+            )
+        elif paths > 0:
+            updated.append(dict(row, b_paths=paths))
+        else:
+            deleted.append(row)
+
+    pk = (
+        _closure.c.relation_type == bindparam("b_relation_type"),
+        _closure.c.ancestor_id == bindparam("b_ancestor_id"),
+        _closure.c.descendant_id == bindparam("b_descendant_id"),
+        _closure.c.depth == bindparam("b_depth"),
+    )
+    if inserted:
+        connection.execute(insert(_closure), inserted)
+    if updated:
+        connection.execute(
+            update(_closure).where(*pk).values(paths=bindparam("b_paths")), updated
+        )
+    if deleted:
+        connection.execute(delete(_closure).where(*pk), deleted)
+
+
+@event.listens_for(PIDRelation, "after_insert")
+def _relation_inserted(mapper, connection, target):
+    """Add the paths through an inserted relation to the closure table."""
+    if target.relation_type in closure_relation_types():
+        _link(connection, target.relation_type, target.parent_id, target.child_id)
+
+
+@event.listens_for(PIDRelation, "after_delete")
+def _relation_deleted(mapper, connection, target):
+    """Remove the paths through a deleted relation from the closure table."""
+    if target.relation_type in closure_relation_types():
+        _link(
+            connection,
+            target.relation_type,
+            target.parent_id,
+            target.child_id,
+            sign=-1,
+        )
+
+
+def build_closure(relation_type):
+    """Rebuild the closure table of a relation type from its relations.
+
+    The paths are computed one depth at a time, with one query per depth.
+
+    :param relation_type: relation type (config, name or id).
+    :returns: the number of rows of the closure table.
+    """
+    if not hasattr(relation_type, "id"):
+        relation_type = resolve_relation_type_config(relation_type)
+    type_id = relation_type.id
+    columns = ["relation_type", "ancestor_id", "descendant_id", "depth", "paths"]
+    db.session.execute(delete(_closure).where(_closure.c.relation_type == type_id))
+    db.session.execute(
+        insert(_closure).from_select(
+            columns,
+            select(
+                literal(type_id),
+                PIDRelation.parent_id,
+                PIDRelation.child_id,
+                literal(1),
+                func.count(),
+            )
+            .where(PIDRelation.relation_type == type_id)
+            .group_by(PIDRelation.parent_id, PIDRelation.child_id),
+        )
+    )
+    relations_count = db.session.scalar(
+        select(func.count())
+        .select_from(PIDRelation)
+        .where(PIDRelation.relation_type == type_id)
+    )
+    total = depth = 0
+    while True:
+        count = db.session.scalar(
+            select(func.count()).where(
+                _closure.c.relation_type == type_id, _closure.c.depth == depth + 1
+            )
+        )
+        if not count:
+            return total
+        total += count
+        depth += 1
+        if depth > relations_count:
+            raise PIDRelationConsistencyError(
+                "The relations of type '{0}' contain a cycle.".format(
+                    relation_type.name
+                )
+            )
+        # Extend the paths of this depth with the relations of their
+        # descendants.
+        db.session.execute(
+            insert(_closure).from_select(
+                columns,
+                select(
+                    literal(type_id),
+                    _closure.c.ancestor_id,
+                    PIDRelation.child_id,
+                    literal(depth + 1),
+                    func.sum(_closure.c.paths),
+                )
+                .join(PIDRelation, PIDRelation.parent_id == _closure.c.descendant_id)
+                .where(
+                    _closure.c.relation_type == type_id,
+                    _closure.c.depth == depth,
+                    PIDRelation.relation_type == type_id,
+                )
+                .group_by(_closure.c.ancestor_id, PIDRelation.child_id),
+            )
+        )
+
+
+__all__ = ("build_closure", "closure_relation_types")
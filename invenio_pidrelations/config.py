@@ -28,3 +28,59 @@ PIDRELATIONS_RELATION_TYPES = [
         "invenio_pidrelations.serializers.schemas.RelationSchema",
     ),
 ]
+
+PIDRELATIONS_OUTBOX_ENABLED = False
+"""Record the changes of the relations in the outbox table.
+
+When enabled, each insertion, removal or index change of a relation made
+with the node APIs appends a row to the ``pidrelations_change`` table, in the
+same transaction. See :mod:`invenio_pidrelations.outbox`.
+"""
+
+PIDRELATIONS_PARTIAL_INDEXES = False
+"""Create the partial indexes of the version and draft relations.
+
+They are created by the database migrations, on PostgreSQL and SQLite only.
+Once the migrations are applied, create them with
+:func:`invenio_pidrelations.models.create_relation_type_indexes`.
+"""
+
+PIDRELATIONS_CLOSURE_RELATION_TYPES = []
+"""Names of the relation types maintained in the closure table.
+
+Enable it for the relation types used to nest PIDs (e.g. collections of
+collections), to look up all the ancestors or descendants of a PID at once.
+See :mod:`invenio_pidrelations.closure`.
+"""
+
+PIDRELATIONS_HISTORY_RELATION_TYPES = []
+"""Names of the relation types whose history is kept.
+
+Enable it to query the relations at a point in time, e.g. the last version of
+a record at a given date. After enabling it, add the history of the existing
+relations with ``invenio pidrelations build-history``. See
+:mod:`invenio_pidrelations.history`.
+"""
+
+PIDRELATIONS_SIBLINGS_QUEUE = "pidrelations-siblings"
+"""Name of the message queue of the sibling reindexing requests.
+
+See :func:`invenio_pidrelations.tasks.request_siblings_reindex`.
+"""
+
+PIDRELATIONS_SIBLINGS_REINDEX_WINDOW = 5
+"""Seconds during which the sibling reindexing requests are coalesced."""
+
+PIDRELATIONS_READ_REPLICA_BIND = None
+"""Name of the ``SQLALCHEMY_BINDS`` bind of a read replica of the database.
+
+The read-only relation queries are executed on it, except in the
+transactions changing relations or PIDs. See :mod:`invenio_pidrelations.replica`.
+"""
+
+PIDRELATIONS_CACHE = None
+"""Cache backend of the serialized relations, or its import path.
+
+For instance ``"invenio_cache.proxies:current_cache"`` to share the cache
+between processes. See :mod:`invenio_pidrelations.cache`.
+"""
@@ -10,16 +10,113 @@
 
 from __future__ import absolute_import, print_function
 
+from collections import namedtuple
+
 from flask import Blueprint
 from invenio_db import db
-from invenio_pidstore.models import PIDStatus
-
-from invenio_pidrelations.contrib.draft import PIDNodeDraft
-
-from ..api import PIDNodeOrdered
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import aliased
+
+from ..api import (
+    PIDNodeOrdered,
+    _relation_changed,
+    connected_pids_statement,
+    relation_type_filter,
+)
+from ..cache import relations_changed
 from ..errors import PIDRelationConsistencyError
+from ..history import RelationsAsOf
+from ..models import PIDRelation
+from ..replica import read_bind_arguments
 from ..utils import resolve_relation_type_config
 
+DraftState = namedtuple("DraftState", ["draft", "deposit"])
+"""Draft (RESERVED) child of a versioning parent and the deposit PID of the
+draft, each ``None`` if it does not exist."""
+
+_DEPOSIT_RELATION = aliased(PIDRelation, name="deposit_relation")
+_DEPOSIT_PID = aliased(PersistentIdentifier, name="deposit_pid")
+_LAST_RELATION = aliased(PIDRelation, name="last_relation")
+_LAST_PID = aliased(PersistentIdentifier, name="last_pid")
+
+_SUPPORTED_STATUSES = [PIDStatus.DELETED, PIDStatus.REGISTERED, PIDStatus.RESERVED]
+
+
+def draft_state_statement(pid):
+    """Build the statement selecting the draft child and its deposit PID.
+
+    The version relations of the parent are joined to the draft relation of
+    the RESERVED child, so that both PIDs are read with one query.
+
+    :param pid: the parent PID, or a fetched parent PID.
+    """
+    stmt, draft = connected_pids_statement(
+        pid, resolve_relation_type_config("version").id
+    )
+    return (
+        stmt.where(draft.status == PIDStatus.RESERVED)
+        .outerjoin(
+            _DEPOSIT_RELATION,
+            and_(
+                _DEPOSIT_RELATION.parent_id == draft.id,
+                _DEPOSIT_RELATION.relation_type
+                == resolve_relation_type_config("record_draft").id,
+            ),
+        )
+        .outerjoin(_DEPOSIT_PID, _DEPOSIT_PID.id == _DEPOSIT_RELATION.child_id)
+        .add_columns(_DEPOSIT_PID)
+    )
+
+
+def redirect_state_statement(parent_id):
+    """Build the statement selecting the redirect target of a parent.
+
+    The statement selects one row with the number of children whose status
+    is not supported by the versioning and the last REGISTERED child (or
+    ``None``), aggregated in the database instead of loading all the
+    children.
+
+    :param parent_id: id of the parent PID.
+    """
+    type_id = resolve_relation_type_config("version").id
+    status = PersistentIdentifier.status
+    children = (
+        select(
+            func.count(case((status.notin_(_SUPPORTED_STATUSES), 1))).label("invalid"),
+            func.max(case((status == PIDStatus.REGISTERED, PIDRelation.index))).label(
+                "last_index"
+            ),
+        )
+        .select_from(PIDRelation)
+        .join(PersistentIdentifier, PersistentIdentifier.id == PIDRelation.child_id)
+        .where(PIDRelation.parent_id == parent_id, relation_type_filter(type_id))
+        .subquery("children")
+    )
+    return (
+        select(children.c.invalid, _LAST_PID)
+        .select_from(children)
+        .outerjoin(
+            _LAST_RELATION,
+            and_(
+                _LAST_RELATION.parent_id == parent_id,
+                _LAST_RELATION.relation_type == type_id,
+                _LAST_RELATION.index == children.c.last_index,
+            ),
+        )
+        .outerjoin(_LAST_PID, _LAST_PID.id == _LAST_RELATION.child_id)
+        .limit(1)
+    )
+
+
+def _check_redirect_state(invalid):
+    """Check the number of children with an unsupported status."""
+    if invalid:
+        raise PIDRelationConsistencyError(
+            "Invalid relation state. Only REGISTERED, RESERVED "
+            "and DELETED PIDs are supported."
+        )
+
 
 class PIDNodeVersioning(PIDNodeOrdered):
     """API for PID versioning relations.
@@ -89,6 +186,15 @@ class PIDNodeVersioning(PIDNodeOrdered):
             super(PIDNodeVersioning, self).remove_child(child_pid, reorder=True)
             self.update_redirect()
 
+    def as_of(self, timestamp):
+        """Get the versions at a point in time.
+
+        As :attr:`children`, only the children which were REGISTERED at this
+        point in time are listed, e.g. ``as_of(date).last_child`` is the
+        last version published at that date.
+        """
+        return RelationsAsOf(self, timestamp, status=[PIDStatus.REGISTERED])
+
     @property
     def draft_child(self):
         """Get the draft (RESERVED) child."""
@@ -98,16 +204,24 @@ class PIDNodeVersioning(PIDNodeOrdered):
             .one_or_none()
         )
 
+    @property
+    def draft_state(self):
+        """Get the draft (RESERVED) child and its deposit PID, with one query.
+
+        :returns: a :class:`DraftState`.
+        """
+        row = db.session.execute(
+            draft_state_statement(self.pid), bind_arguments=read_bind_arguments()
+        ).one_or_none()
+        return DraftState(*row) if row else DraftState(None, None)
+
     @property
     def draft_child_deposit(self):
         """Get the deposit PID of the draft child.
 
         Return `None` if no draft child PID exists.
         """
-        if self.draft_child:
-            return PIDNodeDraft(self.draft_child).children.one_or_none()
-        else:
-            return None
+        return self.draft_state.deposit
 
     def insert_draft_child(self, child_pid):
         """Insert a draft child to versioning."""
@@ -116,23 +230,46 @@ class PIDNodeVersioning(PIDNodeOrdered):
                 "Draft child should have status 'RESERVED'"
             )
 
-        if not self.draft_child:
-            with db.session.begin_nested():
-                super(PIDNodeVersioning, self).insert_child(child_pid, index=-1)
-        else:
-            raise PIDRelationConsistencyError(
-                "Draft child already exists for this relation: {0}".format(
-                    self.draft_child
+        with db.session.begin_nested():
+            draft_child = self.draft_child
+            if draft_child:
+                raise PIDRelationConsistencyError(
+                    "Draft child already exists for this relation: {0}".format(
+                        draft_child
+                    )
                 )
-            )
+            super(PIDNodeVersioning, self).insert_child(child_pid, index=-1)
 
     def remove_draft_child(self):
         """Remove the draft child from versioning."""
-        if self.draft_child:
-            with db.session.begin_nested():
-                super(PIDNodeVersioning, self).remove_child(
-                    self.draft_child, reorder=True
-                )
+        with db.session.begin_nested():
+            draft_child = self.draft_child
+            if draft_child:
+                super(PIDNodeVersioning, self).remove_child(draft_child, reorder=True)
+
+    def publish_draft(self):
+        """Publish the draft child in place, as the last version.
+
+        The RESERVED draft child is registered without being removed and
+        inserted again, thus it keeps its index (the draft is always after
+        the versions), and the parent is redirected to it. The parent is
+        registered first if no version was published yet. Unlike
+        :meth:`remove_draft_child`, registering the PID and
+        :meth:`insert_child`, this takes a constant number of statements.
+
+        :returns: the published PID.
+        """
+        with db.session.begin_nested():
+            draft = self.draft_child
+            if draft is None:
+                raise PIDRelationConsistencyError("No draft child to publish.")
+            draft.status = PIDStatus.REGISTERED
+            relation = self._get_child_relation(draft)
+            _relation_changed(db.session, relation, "status", relation.index)
+            if self._resolved_pid.status == PIDStatus.RESERVED:
+                self._resolved_pid.status = PIDStatus.REGISTERED
+            self.update_redirect()
+        return draft
 
     def update_redirect(self):
         """Update the parent redirect to the current last child.
@@ -142,19 +279,15 @@ class PIDNodeVersioning(PIDNodeOrdered):
         Use this method when the status of a PID changed (ex: draft changed
         from RESERVED to REGISTERED)
         """
-        if self.last_child:
-            self._resolved_pid.redirect(self.last_child)
-        elif any(
-            map(
-                lambda pid: pid.status
-                not in [PIDStatus.DELETED, PIDStatus.REGISTERED, PIDStatus.RESERVED],
-                super(PIDNodeVersioning, self).children.all(),
-            )
-        ):
-            raise PIDRelationConsistencyError(
-                "Invalid relation state. Only REGISTERED, RESERVED "
-                "and DELETED PIDs are supported."
-            )
+        parent = self._resolved_pid
+        relations_changed(db.session, parent.id)
+        invalid, last_child = db.session.execute(
+            redirect_state_statement(parent.id)
+        ).one()
+        if last_child:
+            parent.redirect(last_child)
+        else:
+            _check_redirect_state(invalid)
 
 
 versioning_blueprint = Blueprint(
@@ -168,4 +301,10 @@ def to_versioning_api(pid):
     return PIDNodeVersioning(pid=pid)
 
 
-__all__ = ("PIDNodeVersioning", "versioning_blueprint")
+__all__ = (
+    "DraftState",
+    "PIDNodeVersioning",
+    "draft_state_statement",
+    "redirect_state_statement",
+    "versioning_blueprint",
+)
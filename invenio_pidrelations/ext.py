@@ -10,7 +10,7 @@
 
 from __future__ import absolute_import, print_function
 
-from werkzeug.utils import cached_property
+from werkzeug.utils import cached_property, import_string
 
 from invenio_pidrelations import config
 
@@ -26,6 +26,14 @@ class _InvenioPIDRelationsState(object):
     def relation_types(self):
         return self.app.config.get("PIDRELATIONS_RELATION_TYPES", {})
 
+    @cached_property
+    def cache(self):
+        """Cache backend of the serialized relations, if any."""
+        cache = self.app.config.get("PIDRELATIONS_CACHE")
+        if isinstance(cache, str):
+            cache = import_string(cache)
+        return cache
+
 
 class InvenioPIDRelations(object):
     """Invenio-PIDRelations extension."""
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""History of the relations, for queries at a point in time.
+
+For the relation types listed in ``PIDRELATIONS_HISTORY_RELATION_TYPES``, the
+``pidrelations_history`` table keeps a row for each state of a relation: its
+index and the status of its child, valid from a time until the next change
+(the end of validity of the row is the only value ever updated). The rows are
+written in the flush of the inserted, updated and deleted
+:class:`invenio_pidrelations.models.PIDRelation` and of the status changes of
+the children, so that the relations can be queried at any later point in
+time with ``PIDNodeOrdered.as_of()``.
+
+The relations existing when the history of their type is enabled have no
+history yet: add it with :func:`build_history` (``invenio pidrelations
+build-history``). Until then, the first change of such a relation adds its
+state since its creation.
+
+Times are naive UTC datetimes, as the timestamps of the relations.
+"""
+
+from datetime import datetime
+
+from flask import current_app
+from invenio_db import db
+from invenio_pidstore.models import PersistentIdentifier
+from sqlalchemy import and_, case, event, func, insert, inspect, or_, select, update
+
+from .errors import PIDRelationError
+from .models import PIDRelation, PIDRelationHistory
+from .utils import resolve_relation_type_config
+
+_history = PIDRelationHistory.__table__
+_pids = PersistentIdentifier.__table__
+_relations = PIDRelation.__table__
+
+
+def history_relation_types():
+    """Get the ids of the relation types whose history is kept."""
+    return set(
+        resolve_relation_type_config(name).id
+        for name in current_app.config["PIDRELATIONS_HISTORY_RELATION_TYPES"]
+    )
+
+
+def _open_rows(*where):
+    """Build the condition matching the current rows of relations."""
+    return and_(_history.c.valid_to.is_(None), *where)
+
+
+def _close(connection, now, *where):
+    """End the validity of the current rows of relations."""
+    connection.execute(update(_history).where(_open_rows(*where)).values(valid_to=now))
+
+
+def _open(connection, now, rows):
+    """Add the rows of new states of relations."""
+    if rows:
+        connection.execute(
+            insert(_history), [dict(row, valid_from=now) for row in rows]
+        )
+
+
+def _add_missing(connection, *where):
+    """Add the states of the relations without history, since their creation.
+
+    The states are read from the relations and the PIDs, before their change.
+    """
+    no_current_state = ~(
+        select(_history.c.id)
+        .where(
+            _open_rows(
+                _history.c.parent_id == _relations.c.parent_id,
+                _history.c.child_id == _relations.c.child_id,
+                _history.c.relation_type == _relations.c.relation_type,
+            )
+        )
+        .exists()
+    )
+    return connection.execute(
+        insert(_history).from_select(
+            ["parent_id", "child_id", "relation_type", "index", "status", "valid_from"],
+            select(
+                _relations.c.parent_id,
+                _relations.c.child_id,
+                _relations.c.relation_type,
+                _relations.c.index,
+                _pids.c.status,
+                _relations.c.created,
+            )
+            .join(_pids, _pids.c.id == _relations.c.child_id)
+            .where(no_current_state, *where),
+        )
+    ).rowcount
+
+
+def _relation_filter(target):
+    """Filter the history rows of a relation."""
+    return (
+        _history.c.parent_id == target.parent_id,
+        _history.c.child_id == target.child_id,
+        _history.c.relation_type == target.relation_type,
+    )
+
+
+@event.listens_for(PIDRelation, "after_insert")
+def _relation_inserted(mapper, connection, target):
+    """Add the first state of an inserted relation."""
+    if target.relation_type not in history_relation_types():
+        return
+    status = connection.scalar(
+        select(_pids.c.status).where(_pids.c.id == target.child_id)
+    )
+    _open(
+        connection,
+        datetime.utcnow(),
+        [
+            dict(
+                parent_id=target.parent_id,
+                child_id=target.child_id,
+                relation_type=target.relation_type,
+                index=target.index,
+                status=status.value,
+            )
+        ],
+    )
+
+
+@event.listens_for(PIDRelation, "before_update")
+def _relation_updating(mapper, connection, target):
+    """Add the history of a relation created before it was enabled."""
+    if target.relation_type in history_relation_types() and (
+        inspect(target).attrs.index.history.has_changes()
+    ):
+        _add_missing(
+            connection,
+            _relations.c.parent_id == target.parent_id,
+            _relations.c.child_id == target.child_id,
+            _relations.c.relation_type == target.relation_type,
+        )
+
+
+@event.listens_for(PIDRelation, "after_update")
+def _relation_updated(mapper, connection, target):
+    """Add the new state of a relation whose index changed."""
+    if target.relation_type not in history_relation_types() or not (
+        inspect(target).attrs.index.history.has_changes()
+    ):
+        return
+    now = datetime.utcnow()
+    status = connection.scalar(
+        select(_history.c.status).where(_open_rows(*_relation_filter(target)))
+    )
+    if status is None:
+        status = connection.scalar(
+            select(_pids.c.status).where(_pids.c.id == target.child_id)
+        ).value
+    _close(connection, now, *_relation_filter(target))
+    _open(
+        connection,
+        now,
+        [
+            dict(
+                parent_id=target.parent_id,
+                child_id=target.child_id,
+                relation_type=target.relation_type,
+                index=target.index,
+                status=status,
+            )
+        ],
+    )
+
+
+@event.listens_for(PIDRelation, "after_delete")
+def _relation_deleted(mapper, connection, target):
+    """End the validity of the state of a deleted relation."""
+    if target.relation_type in history_relation_types():
+        _close(connection, datetime.utcnow(), *_relation_filter(target))
+
+
+@event.listens_for(PersistentIdentifier, "before_update")
+def _pid_updating(mapper, connection, target):
+    """Add the history of the relations of a child created before it was enabled."""
+    type_ids = history_relation_types()
+    if type_ids and inspect(target).attrs.status.history.has_changes():
+        _add_missing(
+            connection,
+            _relations.c.child_id == target.id,
+            _relations.c.relation_type.in_(type_ids),
+        )
+
+
+@event.listens_for(PersistentIdentifier, "after_update")
+def _pid_updated(mapper, connection, target):
+    """Add the new states of the relations of a child whose status changed."""
+    type_ids = history_relation_types()
+    if not type_ids or not inspect(target).attrs.status.history.has_changes():
+        return
+    now = datetime.utcnow()
+    where = (
+        _history.c.child_id == target.id,
+        _history.c.relation_type.in_(type_ids),
+    )
+    rows = connection.execute(
+        select(
+            _history.c.parent_id,
+            _history.c.child_id,
+            _history.c.relation_type,
+            _history.c.index,
+        ).where(_open_rows(*where))
+    ).all()
+    _close(connection, now, *where)
+    _open(
+        connection,
+        now,
+        [dict(row._mapping, status=target.status.value) for row in rows],
+    )
+
+
+def build_history(relation_type):
+    """Add the history of the relations existing before it was enabled.
+
+    The relations without a current state get one, valid from their creation,
+    with their current index and child status.
+
+    :param relation_type: relation type (config, name or id).
+    :returns: the number of added rows.
+    """
+    if not hasattr(relation_type, "id"):
+        relation_type = resolve_relation_type_config(relation_type)
+    return _add_missing(db.session, _relations.c.relation_type == relation_type.id)
+
+
+class RelationsAsOf(object):
+    """Children of an ordered node at a point in time, read from the history.
+
+    Each lookup is a single query on the history of the relations of the
+    node, see ``PIDNodeOrdered.as_of()``.
+    """
+
+    def __init__(self, node, timestamp, status=None):
+        """Constructor.
+
+        :param node: a ``invenio_pidrelations.api.PIDNodeOrdered``.
+        :param timestamp: the point in time, as a naive UTC datetime.
+        :param status: if given, list of the statuses (at this point in time)
+            of the children listed by :attr:`children` and
+            :attr:`last_child`.
+        """
+        self.node = node
+        self.timestamp = timestamp
+        self.status = status
+
+    def _filter(self, with_status=True):
+        """Filter the history rows valid at the point in time."""
+        relation_type = self.node.relation_type
+        if relation_type.id not in history_relation_types():
+            raise PIDRelationError(
+                "Relation type '{0}' has no history, see "
+                "PIDRELATIONS_HISTORY_RELATION_TYPES.".format(relation_type.name)
+            )
+        where = [
+            PIDRelationHistory.parent_id == self.node._resolved_pid.id,
+            PIDRelationHistory.relation_type == relation_type.id,
+            PIDRelationHistory.valid_from <= self.timestamp,
+            or_(
+                PIDRelationHistory.valid_to.is_(None),
+                PIDRelationHistory.valid_to > self.timestamp,
+            ),
+        ]
+        if with_status and self.status is not None:
+            where.append(PIDRelationHistory.status.in_([s.value for s in self.status]))
+        return where
+
+    def _children_statement(self):
+        """Build the statement selecting the children PIDs."""
+        return (
+            select(PersistentIdentifier)
+            .join(
+                PIDRelationHistory,
+                PIDRelationHistory.child_id == PersistentIdentifier.id,
+            )
+            .where(*self._filter())
+        )
+
+    @property
+    def children(self):
+        """Get the children, ordered by index."""
+        stmt = self._children_statement().order_by(
+            PIDRelationHistory.index, PersistentIdentifier.id
+        )
+        return db.session.scalars(stmt).all()
+
+    @property
+    def last_child(self):
+        """Get the last child, or ``None``."""
+        stmt = (
+            self._children_statement()
+            .where(PIDRelationHistory.index.isnot(None))
+            .order_by(PIDRelationHistory.index.desc())
+            .limit(1)
+        )
+        return db.session.scalars(stmt).first()
+
+    def index(self, child_pid):
+        """Get the index of a child.
+
+        As ``PIDNodeOrdered.index()``, this is the
+        dense position of the child for the nodes with gaps between the
+        indexes.
+        """
+        if not isinstance(child_pid, PersistentIdentifier):
+            child_pid = PersistentIdentifier.get(
+                pid_type=child_pid.pid_type,
+                pid_value=child_pid.pid_value,
+                pid_provider=child_pid.provider.pid_provider,
+            )
+        if not self.node.index_gap:
+            stmt = select(PIDRelationHistory.index).where(
+                *self._filter(with_status=False),
+                PIDRelationHistory.child_id == child_pid.id,
+            )
+            return db.session.execute(stmt).scalar_one()
+        not_indexed = PIDRelationHistory.index.is_(None)
+        rank = func.row_number().over(
+            partition_by=not_indexed,
+            order_by=(PIDRelationHistory.index, PIDRelationHistory.child_id),
+        )
+        positions = (
+            select(
+                PIDRelationHistory.child_id,
+                case((not_indexed, None), else_=rank - 1).label("position"),
+            )
+            .where(*self._filter(with_status=False))
+            .subquery()
+        )
+        stmt = select(positions.c.position).where(positions.c.child_id == child_pid.id)
+        return db.session.execute(stmt).scalar_one()
+
+
+__all__ = ("RelationsAsOf", "build_history", "history_relation_types")
@@ -10,11 +10,20 @@
 
 from __future__ import absolute_import, print_function
 
-from invenio_indexer.api import RecordIndexer
+import os
+
+from flask import current_app
+from invenio_db import db
 from invenio_pidstore.models import PersistentIdentifier
-from invenio_records.api import Record
+from sqlalchemy import and_, func, select, union
 
-from .contrib.versioning import PIDNodeVersioning
+from .api import (
+    _relation_type_id,
+    positions_subquery,
+    preload_relations,
+    relation_type_filter,
+)
+from .models import PIDRelation
 from .serializers.utils import serialize_relations
 
 
@@ -34,6 +43,150 @@ def index_relations(sender, pid_type, json=None, record=None, index=None, **kwar
     return json
 
 
+def sibling_relations(node):
+    """Take a snapshot of the serialized relations of the children of a node.
+
+    The snapshot is taken with a single query and contains, for each child,
+    the relation fields which depend on its siblings: its index, its previous
+    and next siblings and whether it is the last child.
+
+    :param node: :class:`invenio_pidrelations.api.PIDNodeOrdered` of the
+        parent PID.
+    :returns: ordered dictionary mapping the children PID ids to a
+        ``(pid, (index, previous_id, next_id, is_last))`` tuple.
+    """
+    rows = db.session.execute(
+        node.children.ordered("asc")._statement.add_columns(PIDRelation.index)
+    ).all()
+    if node.index_gap:
+        # The serialized index is the position of the child
+        positions = positions_subquery(node._resolved_pid.id, node.relation_type.id)
+        positions = dict(db.session.execute(select(positions)).all())
+        rows = [(pid, positions[pid.id]) for pid, _ in rows]
+    indexed = [pid for pid, index in rows if index is not None]
+    positions = {pid.id: i for i, pid in enumerate(indexed)}
+    snapshot = {}
+    for pid, index in rows:
+        previous_id = next_id = None
+        if pid.id in positions:
+            i = positions[pid.id]
+            previous_id = indexed[i - 1].id if i > 0 else None
+            next_id = indexed[i + 1].id if i + 1 < len(indexed) else None
+        snapshot[pid.id] = (
+            pid,
+            (index, previous_id, next_id, pid.id == rows[-1][0].id),
+        )
+    return snapshot
+
+
+def changed_siblings(before, after, with_children=False):
+    """Get the children whose serialized relations differ between snapshots.
+
+    :param before: :func:`sibling_relations` snapshot taken before a change.
+    :param after: :func:`sibling_relations` snapshot taken after the change.
+    :param with_children: whether the serialized relations include the list
+        of children, in which case any change of this list changes all the
+        siblings.
+    :returns: list of the changed PIDs, in the order of ``after`` followed by
+        the removed children.
+    """
+    if with_children and list(before) != list(after):
+        changed = [pid for pid, _ in after.values()]
+    else:
+        changed = [
+            pid
+            for id_, (pid, fields) in after.items()
+            if id_ not in before or before[id_][1] != fields
+        ]
+    return changed + [pid for id_, (pid, _) in before.items() if id_ not in after]
+
+
+def serializes_children(relation_type):
+    """Check if the relations of a type are serialized with their children.
+
+    :param relation_type: relation type config.
+    """
+    schema = relation_type.schema
+    if schema is None:
+        return False
+    elif not isinstance(schema, type):
+        # Serializer function, e.g. the plain serializer
+        return True
+    return "children" in schema().dump_fields
+
+
+def deposit_uuids(rec_uuids):
+    """Get corresponding deposit UUIDs from record's UUIDs."""
+    from invenio_records.api import Record
+
+    return [
+        str(
+            PersistentIdentifier.get(
+                "depid", Record.get_record(id_)["_deposit"]["id"]
+            ).object_uuid
+        )
+        for id_ in rec_uuids
+    ]
+
+
+RELATIONS_UPDATE_SCRIPT = (
+    "if (params.relations.isEmpty()) { ctx._source.remove('relations') } "
+    "else { ctx._source.relations = params.relations }"
+)
+"""Script of the partial updates replacing the relations of a document."""
+
+
+def relations_update_actions(pids, index):
+    """Build the bulk actions updating only the relations of indexed records.
+
+    Each action replaces the ``relations`` field of the document of a record
+    with the relations serialized as by :func:`index_relations`, without
+    loading nor sending the rest of the record.
+
+    :param pids: PIDs of the records.
+    :param index: name of the index (or alias) of the documents.
+    """
+    for pid in pids:
+        yield {
+            "_op_type": "update",
+            "_index": index,
+            "_id": str(pid.object_uuid),
+            "script": {
+                "source": RELATIONS_UPDATE_SCRIPT,
+                "lang": "painless",
+                "params": {"relations": serialize_relations(pid) or {}},
+            },
+        }
+
+
+def update_relations(pids, index=None):
+    """Update the relations of the indexed records, without reindexing them.
+
+    :param pids: PIDs of the records, all in the same index.
+    :param index: name of the index of the documents. By default, the index
+        is resolved from the record of the first PID.
+    :returns: the number of updated documents.
+    """
+    from invenio_indexer.api import RecordIndexer
+    from invenio_records.api import Record
+    from invenio_search import current_search_client
+    from invenio_search.engine import search
+    from invenio_search.utils import build_alias_name
+
+    pids = list(pids)
+    if not pids:
+        return 0
+    if index is None:
+        index = RecordIndexer().record_to_index(Record.get_record(pids[0].object_uuid))
+    success, _ = search.helpers.bulk(
+        current_search_client,
+        relations_update_actions(pids, build_alias_name(index)),
+        stats_only=True,
+        request_timeout=current_app.config["INDEXER_BULK_REQUEST_TIMEOUT"],
+    )
+    return success
+
+
 def index_siblings(
     pid,
     include_pid=False,
@@ -41,6 +194,10 @@ def index_siblings(
     neighbors_eager=False,
     eager=False,
     with_deposits=True,
+    since=None,
+    relations_only=False,
+    index=None,
+    parent=None,
 ):
     """Send sibling records of the passed pid for indexing.
 
@@ -57,14 +214,49 @@ def index_siblings(
     :param neighbors_eager: Index the neighboring PIDs w.r.t. 'pid'
         immediately, and the rest with a bulk_index (default: False)
     :param with_deposits: Reindex also corresponding record's deposits.
+    :param since: :func:`sibling_relations` snapshot of the parent taken
+        before inserting or removing a child. When given, only the siblings
+        whose serialized relations changed since the snapshot are indexed.
+        Without a parent (e.g. after removing 'pid'), all the children are
+        indexed.
+    :param relations_only: Only update the relations of the indexed siblings
+        immediately, with :func:`update_relations`, instead of reindexing
+        them. The deposits are still sent for reindexing.
+    :param index: Index of the siblings, for ``relations_only``.
+    :param parent: Parent PID of the siblings (default: the parent of 'pid').
+        Required to compare with ``since`` after removing 'pid'.
     """
+    # Imported here, so that importing the signal receivers does not load the
+    # indexing and records stack.
+    from invenio_indexer.api import RecordIndexer
+
+    from .contrib.versioning import PIDNodeVersioning
+
     assert not (
         neighbors_eager and eager
     ), """Only one of the 'eager' and 'neighbors_eager' flags
         can be set to True, not both"""
+    if parent is None:
+        parent = PIDNodeVersioning(pid=pid).parents.first()
     if children is None:
-        parent_pid = PIDNodeVersioning(pid=pid).parents.first()
-        children = PIDNodeVersioning(pid=parent_pid).children.all()
+        children = PIDNodeVersioning(pid=parent).children.all()
+    if since is not None and parent is not None:
+        node = PIDNodeVersioning(pid=parent)
+        changed = changed_siblings(
+            since,
+            sibling_relations(node),
+            with_children=serializes_children(node.relation_type),
+        )
+        changed_ids = set(p.id for p in changed)
+        children = [p for p in children if p.id == pid.id or p.id in changed_ids]
+    if relations_only:
+        siblings = [p for p in children if include_pid or p.id != pid.id]
+        update_relations(siblings, index=index)
+        if with_deposits:
+            RecordIndexer().bulk_index(
+                deposit_uuids([str(p.object_uuid) for p in siblings])
+            )
+        return
     objid = str(pid.object_uuid)
     children = [str(p.object_uuid) for p in children]
 
@@ -97,22 +289,166 @@ def index_siblings(
         eager_uuids = []
         bulk_uuids = left + right
 
-    def get_dep_uuids(rec_uuids):
-        """Get corresponding deposit UUIDs from record's UUIDs."""
-        return [
-            str(
-                PersistentIdentifier.get(
-                    "depid", Record.get_record(id_)["_deposit"]["id"]
-                ).object_uuid
-            )
-            for id_ in rec_uuids
-        ]
-
     if with_deposits:
-        eager_uuids += get_dep_uuids(eager_uuids)
-        bulk_uuids += get_dep_uuids(bulk_uuids)
+        eager_uuids += deposit_uuids(eager_uuids)
+        bulk_uuids += deposit_uuids(bulk_uuids)
 
     for id_ in eager_uuids:
         RecordIndexer().index_by_id(id_)
     if bulk_uuids:
         RecordIndexer().bulk_index(bulk_uuids)
+
+
+def count_relation_partitions(relation_type, partition_size=1000):
+    """Count the partitions of :func:`relation_partitions`, with one query.
+
+    :param relation_type: relation type config, name or id.
+    :param partition_size: number of parents per partition.
+    """
+    parents = db.session.scalar(
+        select(func.count(PIDRelation.parent_id.distinct())).where(
+            relation_type_filter(_relation_type_id(relation_type))
+        )
+    )
+    return -(-parents // partition_size)
+
+
+def relation_partitions(relation_type, partition_size=1000):
+    """Split the parents of a relation type in ranges of parent ids.
+
+    The ranges are computed in the database, one query per range, by keyset
+    pagination on the parent ids.
+
+    :param relation_type: relation type config, name or id.
+    :param partition_size: number of parents per partition.
+    :returns: an iterator of inclusive ``(min_parent_id, max_parent_id)``
+        ranges.
+    """
+    type_filter = relation_type_filter(_relation_type_id(relation_type))
+    last = None
+    while True:
+        page = select(PIDRelation.parent_id).where(type_filter)
+        if last is not None:
+            page = page.where(PIDRelation.parent_id > last)
+        page = (
+            page.distinct()
+            .order_by(PIDRelation.parent_id)
+            .limit(partition_size)
+            .subquery()
+        )
+        bounds = db.session.execute(
+            select(func.min(page.c.parent_id), func.max(page.c.parent_id))
+        ).one()
+        if bounds[0] is None:
+            return
+        yield tuple(bounds)
+        last = bounds[1]
+
+
+def partition_pids(relation_type, bounds):
+    """Get the record PIDs related through a range of parents.
+
+    :param relation_type: relation type config, name or id.
+    :param bounds: inclusive ``(min_parent_id, max_parent_id)`` range.
+    :returns: the parent and children PIDs of the relations whose parent id
+        is in the range, which have a record, ordered by id.
+    """
+    relation_filter = and_(
+        relation_type_filter(_relation_type_id(relation_type)),
+        PIDRelation.parent_id.between(*bounds),
+    )
+    related_ids = union(
+        select(PIDRelation.parent_id).where(relation_filter),
+        select(PIDRelation.child_id).where(relation_filter),
+    ).subquery()
+    stmt = (
+        select(PersistentIdentifier)
+        .where(
+            PersistentIdentifier.id.in_(select(related_ids.c[0])),
+            PersistentIdentifier.object_type == "rec",
+            PersistentIdentifier.object_uuid.isnot(None),
+        )
+        .order_by(PersistentIdentifier.id)
+    )
+    return db.session.scalars(stmt).all()
+
+
+def update_relations_partition(relation_type, bounds, index=None):
+    """Update the relations of the records related through a range of parents.
+
+    The relations of the partition are preloaded, then serialized and sent
+    as partial updates of the indexed records with :func:`update_relations`.
+
+    :param relation_type: relation type config, name or id.
+    :param bounds: inclusive ``(min_parent_id, max_parent_id)`` range.
+    :param index: index of the records, see :func:`update_relations`.
+    :returns: the number of updated records.
+    """
+    pids = partition_pids(relation_type, bounds)
+    preload_relations(pids)
+    return update_relations(pids, index=index)
+
+
+def _init_reindex_worker(app):
+    """Give a forked reindexing worker its own app context and connections."""
+    db.engine.dispose(close=False)
+    app.app_context().push()
+
+
+def _update_partition_worker(relation_type_id, bounds, index):
+    """Update the relations of a partition in a worker process."""
+    try:
+        return update_relations_partition(relation_type_id, bounds, index=index)
+    finally:
+        db.session.remove()
+
+
+def reindex_relations(
+    relation_type="version", partition_size=1000, processes=None, index=None
+):
+    """Update the indexed relations of all the records of a relation type.
+
+    The parents are partitioned by id ranges, whose relations are serialized
+    and sent to the indexed records by a pool of worker processes, each with
+    its own database connection. The workers do not see the uncommitted
+    changes of the current session.
+
+    :param relation_type: relation type config, name or id.
+    :param partition_size: number of parents per partition.
+    :param processes: number of worker processes (default: number of CPUs).
+        With ``1``, the partitions are processed in the current process.
+    :param index: index of the records, see :func:`update_relations`.
+    :returns: an iterator yielding the number of updated records for each
+        processed partition, in completion order.
+    """
+    relation_type_id = _relation_type_id(relation_type)
+    partitions = relation_partitions(relation_type_id, partition_size)
+    processes = processes or os.cpu_count() or 1
+    if processes > 1:
+        partitions = list(partitions)
+        if len(partitions) > 1:
+            return _reindex_in_pool(relation_type_id, partitions, processes, index)
+    return (
+        update_relations_partition(relation_type_id, p, index=index) for p in partitions
+    )
+
+
+def _reindex_in_pool(relation_type_id, partitions, processes, index):
+    """Process the partitions in a pool of forked worker processes."""
+    # Imported here, so that importing the signal receivers does not load the
+    # process pool machinery.
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(
+        max_workers=min(processes, len(partitions)),
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_init_reindex_worker,
+        initargs=(current_app._get_current_object(),),
+    ) as executor:
+        futures = [
+            executor.submit(_update_partition_worker, relation_type_id, p, index)
+            for p in partitions
+        ]
+        for future in as_completed(futures):
+            yield future.result()
@@ -9,11 +9,24 @@
 """Persistent identifier's relations models."""
 
 import logging
+from datetime import datetime
 
 from invenio_db import db
 from invenio_i18n import gettext
 from invenio_pidstore.models import PersistentIdentifier
 from speaklater import make_lazy_gettext
+from sqlalchemy import (
+    MetaData,
+    and_,
+    column,
+    exists,
+    inspect,
+    select,
+    text,
+    tuple_,
+    values,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import backref
 from sqlalchemy_utils.models import Timestamp
@@ -24,11 +37,30 @@ _ = make_lazy_gettext(lambda: gettext)
 
 logger = logging.getLogger("invenio-pidrelations")
 
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+"""Insert constructs supporting ``ON CONFLICT DO NOTHING``, per dialect."""
+
+_PARTIAL_INDEX_DIALECTS = ("postgresql", "sqlite")
+"""Dialects supporting partial indexes."""
+
 
 class PIDRelation(db.Model, Timestamp):
     """Model persistent identifier relations."""
 
     __tablename__ = "pidrelations_pidrelation"
+    __table_args__ = (
+        # Covering index for the ordered scans of the children of a parent
+        # (e.g. last, next or previous child), which can then be answered by
+        # reading the first matching index entries, without a sort.
+        db.Index(
+            "idx_pidrelations_parent_type_index",
+            "parent_id",
+            "relation_type",
+            "index",
+            "child_id",
+        ),
+        # See also the optional partial indexes of relation_type_indexes()
+    )
 
     parent_id = db.Column(
         db.Integer,
@@ -107,16 +139,344 @@ class PIDRelation(db.Model, Timestamp):
         return obj
 
     @classmethod
-    def relation_exists(self, parent, child, relation_type):
+    def insert(cls, parent, child, relation_type, index=None):
+        """Insert a PID relation for given parent and child, without savepoint.
+
+        The relation is inserted with ``INSERT ... ON CONFLICT DO NOTHING
+        RETURNING``: an existing relation is detected because no row is
+        returned, and the transaction stays usable without the savepoint
+        which :meth:`create` opens to recover from the ``IntegrityError``.
+        The ``after_insert`` listeners of the model are run as for a flushed
+        relation, thus they must not reject it.
+
+        Falls back to :meth:`create` on the databases without this construct
+        and for the relation types having a closure table or a history, whose
+        listeners can reject the relation (e.g. a cycle): the savepoint of
+        :meth:`create` then discards the inserted row.
+        """
+        from .closure import closure_relation_types
+        from .history import history_relation_types
+
+        mapper = inspect(cls)
+        dialect = db.session.get_bind(mapper=mapper).dialect
+        dialect_insert = _UPSERT_INSERTS.get(dialect.name)
+        if (
+            dialect_insert is None
+            or not dialect.insert_returning
+            or relation_type in closure_relation_types()
+            or relation_type in history_relation_types()
+        ):
+            return cls.create(parent, child, relation_type, index=index)
+        stmt = (
+            dialect_insert(cls)
+            .values(
+                parent_id=parent.id,
+                child_id=child.id,
+                relation_type=relation_type,
+                index=index,
+            )
+            .on_conflict_do_nothing(
+                index_elements=[cls.parent_id, cls.child_id, cls.relation_type]
+            )
+            .returning(cls)
+        )
+        obj = db.session.scalars(stmt).one_or_none()
+        if obj is None:
+            raise PIDRelationConsistencyError("PID Relation already exists.")
+        mapper.dispatch.after_insert(mapper, db.session.connection(), inspect(obj))
+        return obj
+
+    @classmethod
+    def relation_exists(cls, parent, child, relation_type):
         """Determine if given relation already exists."""
+        stmt = select(
+            exists().where(
+                cls.parent_id == parent.id,
+                cls.child_id == child.id,
+                cls.relation_type == relation_type,
+            )
+        )
+        return db.session.scalar(stmt)
+
+    @classmethod
+    def _existing_statement(cls, triples, use_values=True):
+        """Build the statement selecting which of some relations exist.
+
+        :param use_values: join the triples against a ``VALUES`` list (in a
+            common table expression), else filter with a tuple ``IN``.
+        """
+        if not use_values:
+            return select(cls.parent_id, cls.child_id, cls.relation_type).where(
+                tuple_(cls.parent_id, cls.child_id, cls.relation_type).in_(triples)
+            )
+        candidates = (
+            values(
+                column("parent_id", db.Integer),
+                column("child_id", db.Integer),
+                column("relation_type", db.SmallInteger),
+                name="candidates",
+            )
+            .data(triples)
+            .cte()
+        )
+        return select(cls.parent_id, cls.child_id, cls.relation_type).join(
+            candidates,
+            and_(
+                cls.parent_id == candidates.c.parent_id,
+                cls.child_id == candidates.c.child_id,
+                cls.relation_type == candidates.c.relation_type,
+            ),
+        )
+
+    @classmethod
+    def relations_exist(cls, triples, chunk_size=1000):
+        """Determine which of many relations already exist.
+
+        The triples are joined against a ``VALUES`` list, in one query per
+        chunk of triples. MySQL does not support the ``VALUES`` lists without
+        ``ROW()`` constructors, so a tuple ``IN`` filter is used instead.
+
+        :param triples: iterable of ``(parent, child, relation_type)``, where
+            the parent and the child are PIDs or PID ids.
+        :param chunk_size: maximum number of triples per query.
+        :returns: the set of the existing ``(parent_id, child_id,
+            relation_type)``.
+        """
+        triples = list(
+            set(
+                (getattr(parent, "id", parent), getattr(child, "id", child), type_)
+                for parent, child, type_ in triples
+            )
+        )
+        dialect = db.session.get_bind(mapper=inspect(cls)).dialect
+        use_values = dialect.name not in ("mysql", "mariadb")
+        existing = set()
+        for i in range(0, len(triples), chunk_size):
+            stmt = cls._existing_statement(triples[i : i + chunk_size], use_values)
+            existing.update(tuple(row) for row in db.session.execute(stmt))
+        return existing
+
+
+def relation_type_indexes():
+    """Build the optional partial indexes of the version and draft relations.
+
+    They serve the lookups of the parent of a version and of the (short-lived)
+    draft relations of a child, and are built with the ids of the ``version``
+    and ``record_draft`` relation types of ``PIDRELATIONS_RELATION_TYPES``.
+    They are not part of the model, see ``PIDRELATIONS_PARTIAL_INDEXES``.
+
+    :returns: list of SQLAlchemy indexes, on a copy of the relations table.
+    """
+    from .utils import resolve_relation_type_config
+
+    table = PIDRelation.__table__.to_metadata(MetaData())
+    indexes = []
+    for name, relation_type in (("version", "version"), ("draft", "record_draft")):
+        where = text(
+            "relation_type = {0:d}".format(
+                resolve_relation_type_config(relation_type).id
+            )
+        )
+        indexes.append(
+            db.Index(
+                "idx_pidrelations_{0}_child".format(name),
+                table.c.child_id,
+                postgresql_where=where,
+                sqlite_where=where,
+            )
+        )
+    return indexes
+
+
+def create_relation_type_indexes(bind):
+    """Create the partial indexes of :func:`relation_type_indexes`.
+
+    Databases without partial indexes (e.g. MySQL) are left unchanged.
+
+    :param bind: engine or connection of the database.
+    :returns: the list of the created indexes.
+    """
+    if bind.dialect.name not in _PARTIAL_INDEX_DIALECTS:
+        return []
+    indexes = relation_type_indexes()
+    for index in indexes:
+        index.create(bind, checkfirst=True)
+    return indexes
+
+
+def drop_relation_type_indexes(bind):
+    """Drop the partial indexes of :func:`relation_type_indexes`, if any.
+
+    :param bind: engine or connection of the database.
+    """
+    if bind.dialect.name in _PARTIAL_INDEX_DIALECTS:
+        for index in relation_type_indexes():
+            index.drop(bind, checkfirst=True)
+
+
+class PIDRelationClosure(db.Model):
+    """Paths between the PIDs nested with a relation type.
+
+    A row counts the paths of a given length (depth) from an ancestor to a
+    descendant. See :mod:`invenio_pidrelations.closure`.
+    """
+
+    __tablename__ = "pidrelations_closure"
+    __table_args__ = (
+        # The primary key serves the lookups of the descendants, this index
+        # the lookups of the ancestors.
+        db.Index(
+            "idx_pidrelations_closure_descendant",
+            "relation_type",
+            "descendant_id",
+            "ancestor_id",
+        ),
+    )
+
+    relation_type = db.Column(db.SmallInteger(), nullable=False, primary_key=True)
+    """Type of relation between the PIDs."""
+
+    ancestor_id = db.Column(
+        db.Integer,
+        db.ForeignKey(PersistentIdentifier.id, onupdate="CASCADE", ondelete="CASCADE"),
+        nullable=False,
+        primary_key=True,
+    )
+    """Ancestor PID."""
+
+    descendant_id = db.Column(
+        db.Integer,
+        db.ForeignKey(PersistentIdentifier.id, onupdate="CASCADE", ondelete="CASCADE"),
+        nullable=False,
+        primary_key=True,
+    )
+    """Descendant PID."""
+
+    depth = db.Column(db.Integer, nullable=False, primary_key=True)
+    """Number of relations between the ancestor and the descendant."""
+
+    paths = db.Column(db.Integer, nullable=False, default=1)
+    """Number of paths of this depth between the ancestor and the descendant."""
+
+
+class PIDRelationHistory(db.Model):
+    """State of a PID relation during a period of time.
+
+    The PIDs are not foreign keys, so that the history outlives the PIDs.
+    See :mod:`invenio_pidrelations.history`.
+    """
+
+    __tablename__ = "pidrelations_history"
+    __table_args__ = (
+        # Lookups of the children of a parent at a point in time
+        db.Index(
+            "idx_pidrelations_history_parent",
+            "parent_id",
+            "relation_type",
+            "valid_from",
+        ),
+        # Lookups of the current states of the relations of a child
+        db.Index("idx_pidrelations_history_child", "child_id", "valid_to"),
+    )
+
+    id = db.Column(
+        db.BigInteger().with_variant(db.Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    """Id of the state."""
+
+    parent_id = db.Column(db.Integer, nullable=False)
+    """Parent PID of the relation."""
+
+    child_id = db.Column(db.Integer, nullable=False)
+    """Child PID of the relation."""
+
+    relation_type = db.Column(db.SmallInteger(), nullable=False)
+    """Type of relation between the parent and child PIDs."""
+
+    index = db.Column(db.Integer, nullable=True)
+    """Index of the relation."""
+
+    status = db.Column(db.String(1), nullable=False)
+    """Status of the child PID."""
+
+    valid_from = db.Column(db.DateTime, nullable=False)
+    """Start of the validity of the state."""
+
+    valid_to = db.Column(db.DateTime, nullable=True)
+    """End of the validity of the state, ``None`` for the current state."""
+
+
+class PIDRelationChange(db.Model):
+    """Change of a PID relation, appended to the outbox of relation changes.
+
+    The PIDs are not foreign keys, so that the changes outlive the PIDs.
+    """
+
+    __tablename__ = "pidrelations_change"
+
+    id = db.Column(
+        db.BigInteger().with_variant(db.Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    """Sequential id of the change, used as cursor by the consumers."""
+
+    created = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    """Time of the change."""
+
+    parent_id = db.Column(db.Integer, nullable=False)
+    """Parent PID of the relation."""
+
+    child_id = db.Column(db.Integer, nullable=False)
+    """Child PID of the relation."""
+
+    relation_type = db.Column(db.SmallInteger(), nullable=False)
+    """Type of relation between the parent and child PIDs."""
+
+    op = db.Column(db.String(6), nullable=False)
+    """Operation: ``insert``, ``remove``, ``move`` (change of index) or
+    ``status`` (change of the status of the child, e.g. a published draft)."""
+
+    old_index = db.Column(db.Integer, nullable=True)
+    """Index of the relation before the change."""
+
+    new_index = db.Column(db.Integer, nullable=True)
+    """Index of the relation after the change."""
+
+    def __repr__(self):
+        """Text representation of a PID relation change."""
         return (
-            PIDRelation.query.filter_by(
-                child_pid_id=child.id,
-                parent_pid_id=parent.id,
-                relation_type=relation_type,
-            ).count()
-            > 0
+            "<PIDRelationChange {c.id}: {c.op} {c.parent_id} -> {c.child_id} "
+            "(Type: {c.relation_type}, Idx: {c.old_index} -> "
+            "{c.new_index})>".format(c=self)
         )
 
 
-__all__ = ("PIDRelation",)
+class PIDRelationConsumer(db.Model):
+    """Position of a consumer in the outbox of relation changes."""
+
+    __tablename__ = "pidrelations_consumer"
+
+    name = db.Column(db.String(255), primary_key=True)
+    """Name of the consumer."""
+
+    cursor = db.Column(
+        db.BigInteger().with_variant(db.Integer, "sqlite"),
+        nullable=False,
+        default=0,
+    )
+    """Id of the last change acknowledged by the consumer."""
+
+
+__all__ = (
+    "PIDRelation",
+    "PIDRelationChange",
+    "PIDRelationClosure",
+    "PIDRelationConsumer",
+    "PIDRelationHistory",
+    "create_relation_type_indexes",
+    "drop_relation_type_indexes",
+    "relation_type_indexes",
+)
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Outbox of the relation changes, for incremental consumers.
+
+When ``PIDRELATIONS_OUTBOX_ENABLED`` is set, the node APIs append a
+:class:`invenio_pidrelations.models.PIDRelationChange` for each relation they
+insert, remove or move, and for each published draft, in the transaction of
+the change. Consumers (e.g. an
+incremental indexer) read the changes in batches and acknowledge them by
+cursor:
+
+.. code-block:: python
+
+    changes = fetch_changes("indexer")
+    reindex(set(c.child_id for c in changes))
+    acknowledge_changes("indexer", changes[-1].id)
+    db.session.commit()
+
+Change ids are allocated when the changes are written, so with concurrent
+writers a change can be committed after a change with a higher id. Consumers
+which must not miss such changes should only read changes older than the
+longest transaction, using ``max_age``.
+"""
+
+from datetime import datetime, timedelta
+
+from invenio_db import db
+from sqlalchemy import delete, func, select
+
+from .models import PIDRelationChange, PIDRelationConsumer
+
+
+def get_cursor(consumer):
+    """Get the id of the last change acknowledged by a consumer.
+
+    :param consumer: name of the consumer.
+    """
+    cursor = db.session.scalar(
+        select(PIDRelationConsumer.cursor).where(PIDRelationConsumer.name == consumer)
+    )
+    return cursor or 0
+
+
+def fetch_changes(consumer, limit=1000, max_age=None):
+    """Get the next changes not acknowledged by a consumer, in order.
+
+    :param consumer: name of the consumer.
+    :param limit: maximum number of changes.
+    :param max_age: if given, only return changes made more than this
+        :class:`datetime.timedelta` ago.
+    :returns: list of :class:`invenio_pidrelations.models.PIDRelationChange`.
+    """
+    stmt = (
+        select(PIDRelationChange)
+        .where(PIDRelationChange.id > get_cursor(consumer))
+        .order_by(PIDRelationChange.id)
+        .limit(limit)
+    )
+    if max_age is not None:
+        stmt = stmt.where(PIDRelationChange.created <= datetime.utcnow() - max_age)
+    return db.session.scalars(stmt).all()
+
+
+def acknowledge_changes(consumer, cursor):
+    """Acknowledge the changes of a consumer, up to a change id included.
+
+    The acknowledgement is part of the current transaction, so that it can be
+    committed together with the side effects of the consumer.
+
+    :param consumer: name of the consumer.
+    :param cursor: id of the last processed change.
+    """
+    obj = db.session.get(PIDRelationConsumer, consumer)
+    if obj is None:
+        db.session.add(PIDRelationConsumer(name=consumer, cursor=cursor))
+    else:
+        obj.cursor = max(obj.cursor, cursor)
+
+
+def purge_changes(older_than=timedelta(0)):
+    """Delete the changes acknowledged by all the consumers.
+
+    :param older_than: only delete the changes older than this
+        :class:`datetime.timedelta`.
+    :returns: the number of deleted changes.
+    """
+    cursor = db.session.scalar(select(func.min(PIDRelationConsumer.cursor)))
+    if cursor is None:
+        return 0
+    result = db.session.execute(
+        delete(PIDRelationChange).where(
+            PIDRelationChange.id <= cursor,
+            PIDRelationChange.created <= datetime.utcnow() - older_than,
+        )
+    )
+    return result.rowcount
+
+
+__all__ = (
+    "acknowledge_changes",
+    "fetch_changes",
+    "get_cursor",
+    "purge_changes",
+)
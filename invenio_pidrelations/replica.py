@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Routing of the read-only relation queries to a read replica.
+
+When ``PIDRELATIONS_READ_REPLICA_BIND`` names a bind of ``SQLALCHEMY_BINDS``,
+the queries of the node APIs which only read the relations (``children``,
+``parents``, ``last_child``, ``index()``... and thus the serialization of the
+relations) are executed on the engine of this bind instead of the primary
+database. The PIDs read are still added to the session, as for the primary
+database.
+
+Sessions with uncommitted changes of the relations or of the PIDs, flushed
+or not, read from the primary database, so that they see their own changes.
+So do the reads in a savepoint and the reads of the methods changing the
+relations (see :func:`relation_writes_started`). The replication lag is not
+accounted for: right after a commit, the replica may still return the
+previous state of the relations.
+"""
+
+from flask import current_app
+from invenio_db import db
+from invenio_pidstore.models import PersistentIdentifier
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .models import PIDRelation
+
+_WRITES = "pidrelations_writes"
+
+_WRITTEN_CLASSES = (PIDRelation, PersistentIdentifier)
+
+
+def _has_changed_objects(session):
+    """Check if a session has unflushed changes of relations or PIDs."""
+    return any(
+        isinstance(obj, _WRITTEN_CLASSES)
+        for objects in (session.new, session.dirty, session.deleted)
+        for obj in objects
+    )
+
+
+def has_pending_writes(session):
+    """Check if the relation reads of a session must use the primary database.
+
+    That is if it has uncommitted changes of relations or PIDs, or is in a
+    savepoint.
+    """
+    return (
+        bool(session.info.get(_WRITES))
+        or session.in_nested_transaction()
+        or _has_changed_objects(session)
+    )
+
+
+def relation_writes_started(session):
+    """Mark a session as changing relations, before its first read.
+
+    Its reads use the primary database until the transaction ends, e.g. the
+    checks made before inserting a relation.
+    """
+    session.info[_WRITES] = True
+
+
+def read_bind_arguments(session=None):
+    """Get the bind arguments of a read-only relation query.
+
+    :param session: session executing the query (default: ``db.session``).
+    :returns: the bind arguments routing the query to the read replica, or
+        ``None`` to execute it on the primary database.
+    """
+    bind = current_app.config["PIDRELATIONS_READ_REPLICA_BIND"]
+    if bind is None:
+        return None
+    if has_pending_writes(db.session() if session is None else session):
+        return None
+    return {"bind": db.engines[bind]}
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_writes(session, flush_context):
+    """Remember the relations and PIDs flushed in the transaction."""
+    if _has_changed_objects(session):
+        session.info[_WRITES] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_executed_writes(orm_execute_state):
+    """Remember the insert, update and delete statements of the transaction."""
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info[_WRITES] = True
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _forget_writes(session):
+    """Forget the writes of a committed or rolled back transaction."""
+    if session.in_nested_transaction():
+        # The writes before the savepoint are still pending
+        return
+    session.info.pop(_WRITES, None)
+
+
+__all__ = ("has_pending_writes", "read_bind_arguments", "relation_writes_started")
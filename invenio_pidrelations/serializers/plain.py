@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""PID relation serializer without marshmallow.
+
+:func:`serialize_relation` produces the same output as
+:class:`invenio_pidrelations.serializers.schemas.RelationSchema`, with less
+overhead, e.g. for bulk indexing. Select it for a relation type by setting it
+in place of the schema in ``PIDRELATIONS_RELATION_TYPES``:
+
+.. code-block:: python
+
+    RelationType(
+        0,
+        "version",
+        "Version",
+        "invenio_pidrelations.contrib.versioning:PIDNodeVersioning",
+        "invenio_pidrelations.serializers.plain:serialize_relation",
+    )
+"""
+
+from ..api import PIDNodeOrdered
+from ..config import RelationType
+from ..utils import resolve_relation_type_config
+
+
+def _dump_pid(pid):
+    """Dump a PID like :class:`~.schemas.PIDSchema`."""
+    if not pid:
+        return None
+    return {"pid_type": pid.pid_type, "pid_value": pid.pid_value}
+
+
+def serialize_relation(node, pid):
+    """Serialize a relation from the point of view of a PID.
+
+    :param node: the PID node API of the relation.
+    :param pid: the serialized PID, either the parent or one of the children.
+    """
+    relation_type = node.relation_type
+    if not isinstance(relation_type, RelationType):
+        relation_type = resolve_relation_type_config(relation_type)
+    children = node.children.ordered("asc").all()
+    is_parent = pid == node.pid
+    is_child = pid in children
+
+    is_last = index = next_child = previous_child = None
+    if is_child and isinstance(node, PIDNodeOrdered):
+        is_last = children[-1] == pid
+        index = node.index(pid)
+        if not node.is_last_child(pid):
+            next_child = _dump_pid(node.next_child(pid))
+        if index > 0:
+            previous_child = _dump_pid(node.previous_child(pid))
+
+    return {
+        "parent": None if is_parent else _dump_pid(node.pid),
+        "children": [_dump_pid(child) for child in children],
+        "type": relation_type.name,
+        "is_parent": is_parent,
+        "is_child": is_child,
+        "is_last": is_last,
+        "index": index,
+        "next": next_child,
+        "previous": previous_child,
+    }
+
+
+__all__ = ("serialize_relation",)
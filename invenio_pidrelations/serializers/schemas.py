@@ -46,12 +46,20 @@ class RelationSchema(Schema):
 
     def dump_next(self, obj):
         """Dump the parent of a PID."""
-        if self._is_child(obj) and not obj.is_last_child(self.context["pid"]):
+        if (
+            isinstance(obj, PIDNodeOrdered)
+            and self._is_child(obj)
+            and not obj.is_last_child(self.context["pid"])
+        ):
             return self._dump_relative(obj.next_child(self.context["pid"]))
 
     def dump_previous(self, obj):
         """Dump the parent of a PID."""
-        if self._is_child(obj) and obj.index(self.context["pid"]) > 0:
+        if (
+            isinstance(obj, PIDNodeOrdered)
+            and self._is_child(obj)
+            and obj.index(self.context["pid"]) > 0
+        ):
             return self._dump_relative(obj.previous_child(self.context["pid"]))
 
     def dump_index(self, obj):
@@ -100,3 +108,18 @@ class RelationSchema(Schema):
     def dump_children(self, obj):
         """Dump the siblings of a PID."""
         return PIDSchema(many=True).dump(obj.children.ordered("asc").all())
+
+
+class CompactRelationSchema(RelationSchema):
+    """PID relation schema without the list of children.
+
+    Serializing the full list of children in every sibling means that all of
+    them must be reindexed whenever a child is inserted or removed. Use this
+    schema in ``PIDRELATIONS_RELATION_TYPES`` to only reindex the siblings
+    whose position in the relation changed.
+    """
+
+    class Meta:
+        """Meta fields of the schema."""
+
+        exclude = ("children",)
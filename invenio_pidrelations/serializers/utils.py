@@ -9,30 +9,84 @@
 
 """PIDRelation serialization utilities."""
 
-from invenio_pidrelations.api import PIDRelation
+from invenio_pidrelations.api import (
+    _PRELOADED_ATTR,
+    PIDRelation,
+    clear_preloaded_relations,
+    preload_relations,
+)
 
+from ..cache import cached_relation
 from ..utils import resolve_relation_type_config
 
 
 def serialize_relations(pid):
-    """Serialize the relations for given PID."""
+    """Serialize the relations for given PID.
+
+    Before dumping the first relation which is not cached, the relations of
+    the PID and of its parents are preloaded (unless the caller already did
+    so), so that the fields are not queried one by one.
+    """
     data = {}
-    relations = PIDRelation.get_child_relations(pid).all()
-    for relation in relations:
-        rel_cfg = resolve_relation_type_config(relation.relation_type)
-        dump_relation(rel_cfg.api(relation.parent), rel_cfg, pid, data)
-    parent_relations = PIDRelation.get_parent_relations(pid).all()
-    rel_cfgs = set([resolve_relation_type_config(p) for p in parent_relations])
-    for rel_cfg in rel_cfgs:
-        dump_relation(rel_cfg.api(pid), rel_cfg, pid, data)
+    relations = []
+    preloaded = False
+
+    def preload():
+        nonlocal preloaded
+        if not preloaded and _PRELOADED_ATTR not in vars(pid):
+            preload_relations([pid])
+            preloaded = True
+
+    try:
+        relations = PIDRelation.get_child_relations(pid).all()
+        for relation in relations:
+            rel_cfg = resolve_relation_type_config(relation.relation_type)
+            dump_relation(
+                rel_cfg.api(relation.parent), rel_cfg, pid, data, prepare=preload
+            )
+        parent_relations = PIDRelation.get_parent_relations(pid).all()
+        rel_cfgs = sorted(
+            set(
+                resolve_relation_type_config(p.relation_type) for p in parent_relations
+            ),
+            key=lambda rel_cfg: rel_cfg.id,
+        )
+        for rel_cfg in rel_cfgs:
+            dump_relation(rel_cfg.api(pid), rel_cfg, pid, data, prepare=preload)
+    finally:
+        if preloaded:
+            clear_preloaded_relations(pid, *[r.parent for r in relations])
     return data
 
 
-def dump_relation(api, rel_cfg, pid, data):
-    """Dump a specific relation to a data dict."""
+def dump_relation(api, rel_cfg, pid, data, prepare=None):
+    """Dump a specific relation to a data dict.
+
+    The relation is dumped with the schema of the relation type, which is
+    either a marshmallow schema class or a function called with the node API
+    and the PID (e.g.
+    :func:`invenio_pidrelations.serializers.plain.serialize_relation`).
+
+    The dump is cached if ``PIDRELATIONS_CACHE`` is set.
+
+    :param prepare: function called before dumping a relation which is not
+        cached.
+    """
     schema_class = rel_cfg.schema
     if schema_class is not None:
-        schema = schema_class()
-        schema.context["pid"] = pid
-        result = schema.dump(api)
+
+        def dump():
+            if prepare is not None:
+                prepare()
+            if not isinstance(schema_class, type):
+                return schema_class(api, pid)
+            schema = schema_class()
+            schema.context["pid"] = pid
+            return schema.dump(api)
+
+        result = cached_relation(
+            api._resolved_pid.id,
+            "dump:{0}:{1}:{2}".format(rel_cfg.id, schema_class.__name__, pid.id),
+            dump,
+        )
         data.setdefault(rel_cfg.name, []).append(result)
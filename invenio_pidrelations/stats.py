@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Statistics on the shape of the relations, e.g. for capacity planning.
+
+The statistics are computed with aggregate queries: the distributions are
+read as the frequency of each value (e.g. how many parents have 3 children),
+so that only one row per distinct value is transferred, whatever the number
+of relations.
+"""
+
+from invenio_db import db
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from sqlalchemy import case, func, literal, select
+
+from .closure import closure_relation_types
+from .models import PIDRelation, PIDRelationClosure
+from .utils import resolve_relation_type_config
+
+PERCENTILES = (50, 90, 99)
+"""Percentiles of the distributions."""
+
+
+def _bucket(value):
+    """Get the power of two histogram bucket of a positive value."""
+    if value < 1:
+        return str(value)
+    low = 1 << (value.bit_length() - 1)
+    high = (low << 1) - 1
+    return str(low) if low == high else "{0}-{1}".format(low, high)
+
+
+def distribution(frequencies):
+    """Summarize a distribution given as the frequencies of its values.
+
+    :param frequencies: iterable of ``(value, count)`` ordered by value.
+    :returns: a dict with the ``count``, ``min``, ``max``, ``mean``, the
+        nearest-rank percentiles (``p50``, ...) and a ``histogram`` of the
+        values in power of two buckets.
+    """
+    frequencies = [(value, count) for value, count in frequencies if count]
+    total = sum(count for _, count in frequencies)
+    result = dict(
+        count=total,
+        min=frequencies[0][0] if frequencies else None,
+        max=frequencies[-1][0] if frequencies else None,
+        mean=(
+            round(sum(value * count for value, count in frequencies) / total, 2)
+            if total
+            else None
+        ),
+    )
+    for percentile in PERCENTILES:
+        rank, seen = -(-percentile * total // 100), 0
+        result["p{0}".format(percentile)] = None
+        for value, count in frequencies:
+            seen += count
+            if seen >= rank:
+                result["p{0}".format(percentile)] = value
+                break
+    histogram = {}
+    for value, count in frequencies:
+        bucket = _bucket(value)
+        histogram[bucket] = histogram.get(bucket, 0) + count
+    result["histogram"] = histogram
+    return result
+
+
+def _frequencies(per_parent):
+    """Count the parents per value of a per parent subquery."""
+    return db.session.execute(
+        select(per_parent.c.value, func.count())
+        .group_by(per_parent.c.value)
+        .order_by(per_parent.c.value)
+    ).all()
+
+
+def _max_depth(type_id, limit):
+    """Get the length of the longest chain of relations.
+
+    The closure table is used if it is enabled for the relation type, else a
+    recursive query follows the relations from the roots, up to ``limit``
+    relations.
+    """
+    if type_id in closure_relation_types():
+        return db.session.scalar(
+            select(func.coalesce(func.max(PIDRelationClosure.depth), 0)).where(
+                PIDRelationClosure.relation_type == type_id
+            )
+        )
+    children = select(PIDRelation.child_id).where(PIDRelation.relation_type == type_id)
+    chains = (
+        select(PIDRelation.parent_id.label("pid_id"), literal(0).label("depth"))
+        .where(
+            PIDRelation.relation_type == type_id,
+            PIDRelation.parent_id.notin_(children),
+        )
+        .distinct()
+        .cte("chains", recursive=True)
+    )
+    chains = chains.union_all(
+        select(PIDRelation.child_id, chains.c.depth + 1)
+        .join(chains, chains.c.pid_id == PIDRelation.parent_id)
+        .where(PIDRelation.relation_type == type_id, chains.c.depth < limit)
+    )
+    return db.session.scalar(select(func.coalesce(func.max(chains.c.depth), 0)))
+
+
+def relation_stats(relation_type, top=10, depth_limit=100):
+    """Compute statistics on the relations of a relation type.
+
+    :param relation_type: relation type (config, name or id).
+    :param top: number of parents with the most children to list.
+    :param depth_limit: maximum length of the chains of relations followed
+        to compute the ``max_depth``.
+    :returns: a JSON serializable dict.
+    """
+    if not hasattr(relation_type, "id"):
+        relation_type = resolve_relation_type_config(relation_type)
+    type_id = relation_type.id
+    of_type = PIDRelation.relation_type == type_id
+
+    relations, parents, children = db.session.execute(
+        select(
+            func.count(),
+            func.count(PIDRelation.parent_id.distinct()),
+            func.count(PIDRelation.child_id.distinct()),
+        ).where(of_type)
+    ).one()
+
+    children_per_parent = (
+        select(func.count().label("value"))
+        .where(of_type)
+        .group_by(PIDRelation.parent_id)
+        .subquery()
+    )
+    parents_per_child = (
+        select(func.count().label("value"))
+        .where(of_type)
+        .group_by(PIDRelation.child_id)
+        .subquery()
+    )
+    # Number of RESERVED children (e.g. drafts) per parent
+    reserved = func.count(case((PersistentIdentifier.status == PIDStatus.RESERVED, 1)))
+    reserved_per_parent = (
+        select(reserved.label("value"))
+        .select_from(PIDRelation)
+        .join(PersistentIdentifier, PersistentIdentifier.id == PIDRelation.child_id)
+        .where(of_type)
+        .group_by(PIDRelation.parent_id)
+        .subquery()
+    )
+    statuses = db.session.execute(
+        select(PersistentIdentifier.status, func.count())
+        .select_from(PIDRelation)
+        .join(PersistentIdentifier, PersistentIdentifier.id == PIDRelation.child_id)
+        .where(of_type)
+        .group_by(PersistentIdentifier.status)
+    ).all()
+
+    counts = (
+        select(PIDRelation.parent_id, func.count().label("children"))
+        .where(of_type)
+        .group_by(PIDRelation.parent_id)
+        .order_by(func.count().desc(), PIDRelation.parent_id)
+        .limit(top)
+        .subquery()
+    )
+    largest = db.session.execute(
+        select(
+            PersistentIdentifier.pid_type,
+            PersistentIdentifier.pid_value,
+            counts.c.children,
+        )
+        .join(counts, counts.c.parent_id == PersistentIdentifier.id)
+        .order_by(counts.c.children.desc(), counts.c.parent_id)
+    ).all()
+
+    return {
+        "relation_type": relation_type.name,
+        "relations": relations,
+        "parents": parents,
+        "children": children,
+        "children_per_parent": distribution(_frequencies(children_per_parent)),
+        "parents_per_child": distribution(_frequencies(parents_per_child)),
+        "reserved_children_per_parent": distribution(_frequencies(reserved_per_parent)),
+        "children_status": dict(
+            sorted((status.value, count) for status, count in statuses)
+        ),
+        "max_depth": _max_depth(type_id, depth_limit),
+        "largest_parents": [
+            {"pid_type": pid_type, "pid_value": pid_value, "children": count}
+            for pid_type, pid_value, count in largest
+        ],
+    }
+
+
+__all__ = ("distribution", "relation_stats")
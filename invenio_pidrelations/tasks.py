@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Celery tasks reindexing the siblings of versions, coalesced per parent.
+
+Instead of calling ``invenio_pidrelations.indexers.index_siblings()`` after
+each change of the versions of a record, call
+:func:`request_siblings_reindex`. The requests are published to a message
+queue (``PIDRELATIONS_SIBLINGS_QUEUE``) and processed together by the
+``process_siblings_queue`` task, which runs once the
+``PIDRELATIONS_SIBLINGS_REINDEX_WINDOW`` has elapsed after a request: the
+siblings of all the parents requested meanwhile are then sent with a single
+``RecordIndexer.bulk_index()`` call, each record once.
+"""
+
+from celery import current_app as current_celery_app
+from celery import shared_task
+from flask import current_app
+from invenio_db import db
+from invenio_pidstore.models import PersistentIdentifier
+from kombu import Exchange, Queue
+from kombu.compat import Consumer
+
+from .contrib.versioning import PIDNodeVersioning
+from .indexers import deposit_uuids
+
+
+def siblings_queue():
+    """Get the message queue of the sibling reindexing requests."""
+    name = current_app.config["PIDRELATIONS_SIBLINGS_QUEUE"]
+    return Queue(
+        name,
+        exchange=Exchange(name, type="direct"),
+        routing_key=name,
+    )
+
+
+def request_siblings_reindex(pid, include_pid=False, with_deposits=True):
+    """Request the reindexing of the siblings of a version.
+
+    :param pid: PID of the version.
+    :param include_pid: If True, index also the provided PID.
+    :param with_deposits: Reindex also the corresponding deposits.
+    """
+    parent = PIDNodeVersioning(pid=pid).parents.first()
+    if parent is None:
+        return
+    queue = siblings_queue()
+    with current_celery_app.pool.acquire(block=True) as conn:
+        producer = conn.Producer(exchange=queue.exchange, routing_key=queue.routing_key)
+        producer.publish(
+            dict(
+                parent_id=parent.id,
+                pid_id=None if include_pid else pid.id,
+                with_deposits=with_deposits,
+            ),
+            declare=[queue],
+        )
+    process_siblings_queue.apply_async(
+        countdown=current_app.config["PIDRELATIONS_SIBLINGS_REINDEX_WINDOW"]
+    )
+
+
+@shared_task(ignore_result=True)
+def process_siblings_queue(max_requests=10000):
+    """Reindex the siblings of the versions requested since the last run.
+
+    Runs triggered by requests already processed by a previous run do
+    nothing.
+
+    :param max_requests: maximum number of requests processed per run.
+    """
+    from invenio_indexer.api import RecordIndexer
+
+    queue = siblings_queue()
+    with current_celery_app.pool.acquire(block=True) as conn:
+        consumer = Consumer(
+            connection=conn,
+            queue=queue.name,
+            exchange=queue.exchange.name,
+            routing_key=queue.routing_key,
+        )
+        messages = list(consumer.iterqueue(limit=max_requests))
+        # Each parent is processed once, without the PIDs excluded by all
+        # its requests.
+        parents = {}
+        for message in messages:
+            request = message.decode()
+            excluded, with_deposits = parents.get(request["parent_id"], (None, False))
+            pid_ids = set() if request["pid_id"] is None else {request["pid_id"]}
+            parents[request["parent_id"]] = (
+                pid_ids if excluded is None else excluded & pid_ids,
+                with_deposits or request["with_deposits"],
+            )
+
+        uuids, deposit_records = set(), set()
+        for parent_id, (excluded, with_deposits) in parents.items():
+            parent = db.session.get(PersistentIdentifier, parent_id)
+            if parent is None:
+                continue
+            for child in PIDNodeVersioning(pid=parent).children.all():
+                if child.id not in excluded:
+                    uuids.add(str(child.object_uuid))
+                    if with_deposits:
+                        deposit_records.add(str(child.object_uuid))
+        uuids.update(deposit_uuids(sorted(deposit_records)))
+        if uuids:
+            RecordIndexer().bulk_index(sorted(uuids))
+        for message in messages:
+            message.ack()
+        consumer.close()
+    return len(uuids)
+
+
+__all__ = (
+    "process_siblings_queue",
+    "request_siblings_reindex",
+    "siblings_queue",
+)
@@ -9,10 +9,41 @@
 
 """PID relations utility functions."""
 
+from functools import lru_cache
+
 import six
 from flask import current_app
 from invenio_base.utils import obj_or_import_string
 
+from .config import RelationType
+
+
+@lru_cache(maxsize=None)
+def _import(value):
+    """Import an object from its import string, once."""
+    return obj_or_import_string(value)
+
+
+class ResolvedRelationType(RelationType):
+    """Relation type config importing its API and schema classes lazily.
+
+    The classes are imported on first access, so that resolving a relation
+    type does not load the serialization stack (e.g. marshmallow) in
+    processes which only use the PID node APIs.
+    """
+
+    __slots__ = ()
+
+    @property
+    def api(self):
+        """PID node API class of the relation type."""
+        return _import(tuple.__getitem__(self, 3))
+
+    @property
+    def schema(self):
+        """Serialization schema class of the relation type."""
+        return _import(tuple.__getitem__(self, 4))
+
 
 def resolve_relation_type_config(value):
     """Resolve the relation type to config object.
@@ -36,6 +67,4 @@ def resolve_relation_type_config(value):
         raise ValueError(
             "Type of value '{0}' is not supported for resolving.".format(value)
         )
-    api_class = obj_or_import_string(obj.api)
-    schema_class = obj_or_import_string(obj.schema)
-    return obj.__class__(obj.id, obj.name, obj.label, api_class, schema_class)
+    return ResolvedRelationType(*obj)
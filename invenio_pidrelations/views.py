@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Helpers for the views serving relation data."""
+
+from flask import current_app, jsonify, make_response, request
+
+from .api import relations_version
+from .serializers.utils import serialize_relations
+
+
+def conditional_response(etag, build_response):
+    """Answer a request with ETag support.
+
+    If the ``If-None-Match`` header of the request matches the ETag (with the
+    weak comparison, e.g. after a proxy compressed the response), a
+    ``304 Not Modified`` response is returned without building the response.
+
+    :param etag: the ETag of the data, e.g. a relations version token (see
+        :func:`invenio_pidrelations.api.relations_version` and
+        :attr:`invenio_pidrelations.api.PIDNode.relations_version`).
+    :param build_response: function returning the response (or anything
+        accepted by :func:`flask.make_response`).
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(build_response())
+    response.set_etag(etag)
+    return response
+
+
+def relations_response(pid):
+    """Serialize the relations of a PID to a JSON response, with ETag support.
+
+    :param pid: a :class:`invenio_pidstore.models.PersistentIdentifier`.
+    """
+    return conditional_response(
+        relations_version(pid), lambda: jsonify(serialize_relations(pid))
+    )
+
+
+__all__ = ("conditional_response", "relations_response")
@@ -10,10 +10,22 @@
 
 import pytest
 from invenio_pidstore.models import PersistentIdentifier, PIDStatus
-from test_helpers import create_pids, filter_pids, with_pid_and_fetched_pid
-
-from invenio_pidrelations.api import PIDNode, PIDNodeOrdered
+from test_helpers import (
+    QueryCounter,
+    create_pids,
+    filter_pids,
+    with_pid_and_fetched_pid,
+)
+
+from invenio_pidrelations.api import (
+    PIDNode,
+    PIDNodeGappedOrdered,
+    PIDNodeOrdered,
+    clear_preloaded_relations,
+    preload_relations,
+)
 from invenio_pidrelations.errors import PIDRelationConsistencyError
+from invenio_pidrelations.models import PIDRelation
 
 
 @with_pid_and_fetched_pid
@@ -186,6 +198,81 @@ def test_ordered_node_insert(db, version_relation, version_pids, build_pid, reci
     assert_children_indices(ordered_parent_node, version_pids[0]["children"])
 
 
+def test_insert_without_savepoint(db, version_relation, version_pids):
+    """Test that inserting children does not open savepoints."""
+    parent_pid = version_pids[0]["parent"]
+    child_pids = create_pids(3)
+    db.session.commit()
+    nodes = [
+        PIDNode(parent_pid, version_relation),
+        PIDNodeOrdered(parent_pid, version_relation),
+        PIDNodeGappedOrdered(parent_pid, version_relation),
+    ]
+    with QueryCounter(db.engine) as counter:
+        for node, child_pid in zip(nodes, child_pids):
+            node.insert_child(child_pid)
+            with pytest.raises(PIDRelationConsistencyError):
+                node.insert_child(child_pid)
+        db.session.commit()
+    assert not [s for s in counter.statements if "SAVEPOINT" in s.upper()]
+    assert PIDNode(parent_pid, version_relation).children.count() == 9
+
+
+@with_pid_and_fetched_pid
+def test_gapped_node_insert(db, version_relation, version_pids, build_pid, recids):
+    """Test inserting children in the gaps between indexes."""
+    parent_pid = build_pid(version_pids[0]["parent"])
+    node = PIDNodeGappedOrdered(parent_pid, version_relation)
+    children = version_pids[0]["children"]
+    child_pids = create_pids(4)
+
+    def stored_indexes():
+        return [
+            r.index
+            for r in PIDRelation.query.filter_by(
+                parent_id=version_pids[0]["parent"].id
+            ).order_by(PIDRelation.index)
+        ]
+
+    # Appending after the dense indexes leaves a gap
+    node.insert_child(child_pids[0])
+    children.append(child_pids[0])
+    assert_children_indices(node, children)
+    assert stored_indexes() == [0, 1, 2, 3, 4, 5, 1029]
+
+    # Without free index between the neighbours, all the children are
+    # renumbered with gaps
+    node.insert_child(child_pids[1], 2)
+    children.insert(2, child_pids[1])
+    assert_children_indices(node, children)
+    assert stored_indexes() == [i * 1024 for i in range(8)]
+
+    # Then only the inserted child is written
+    with QueryCounter(db.engine) as counter:
+        node.insert_child(child_pids[2], 3)
+    children.insert(3, child_pids[2])
+    assert not [s for s in counter.statements if s.startswith("UPDATE")]
+    assert_children_indices(node, children)
+    assert stored_indexes()[2:5] == [2048, 2560, 3072]
+
+    node.insert_child(child_pids[3], 0)
+    children.insert(0, child_pids[3])
+    assert_children_indices(node, children)
+    assert node.last_child == children[-1]
+    assert node.next_child(children[3]) == children[4]
+    assert node.previous_child(children[3]) == children[2]
+
+    # Removing a child does not renumber the next ones
+    node.remove_child(children[1], reorder=True)
+    del children[1]
+    assert_children_indices(node, children)
+    assert stored_indexes()[:2] == [-1024, 1024]
+
+    # Preloaded relations have the same positions
+    preload_relations([version_pids[0]["parent"]])
+    assert [node.index(c) for c in children] == list(range(len(children)))
+
+
 @with_pid_and_fetched_pid
 def test_ordered_node_remove_with_reorder(
     db, version_relation, version_pids, build_pid, recids
@@ -269,3 +356,50 @@ def test_node_max_children(db, version_relation, version_pids, build_pid, recids
 
     with pytest.raises(PIDRelationConsistencyError):
         ordered_parent_node.insert_child(child_pids[0])
+
+
+def test_preload_relations(db, version_relation, draft_relation, version_pids):
+    """Test that nodes read the preloaded relations without querying."""
+    parent = version_pids[0]["parent"]
+    children = version_pids[0]["children"]
+    pids = [children[0], children[2], version_pids[1]["children"][0]]
+    # make sure all the PIDs are loaded in the session
+    db.session.flush()
+
+    with QueryCounter(db.engine) as counter:
+        preload_relations(pids, relation_types=[version_relation])
+    assert counter.count == 2
+
+    with QueryCounter(db.engine) as counter:
+        child_node = PIDNodeOrdered(children[2], version_relation)
+        assert child_node.parents.all() == [parent]
+        assert child_node.children.all() == []
+        assert not child_node.is_parent
+        assert child_node.is_child
+
+        parent_node = PIDNodeOrdered(child_node.parents.one(), version_relation)
+        assert parent_node.children.ordered("asc").all() == children
+        assert parent_node.children.ordered("desc").all() == children[::-1]
+        assert parent_node.children.status(PIDStatus.REGISTERED).count() == 3
+        assert parent_node.last_child == children[-1]
+        assert parent_node.index(children[2]) == 2
+        assert parent_node.next_child(children[2]) == children[3]
+        assert parent_node.previous_child(children[2]) == children[1]
+        assert parent_node.previous_child(children[0]) is None
+        assert parent_node.next_child(children[-1]) is None
+    assert counter.count == 0
+
+    # Relation types which were not preloaded are queried
+    draft_node = PIDNode(children[-1], draft_relation)
+    with QueryCounter(db.engine) as counter:
+        assert draft_node.children.all() == [version_pids[0]["deposit"]]
+    assert counter.count == 1
+
+    # Modifying the relations drops the preloaded ones
+    new_pid = create_pids(1)[0]
+    parent_node.insert_child(new_pid)
+    assert parent_node.children.ordered("asc").all() == children + [new_pid]
+    clear_preloaded_relations(children[2])
+    with QueryCounter(db.engine) as counter:
+        assert child_node.parents.all() == [parent]
+    assert counter.count == 1
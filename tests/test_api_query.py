@@ -10,10 +10,12 @@
 
 import pytest
 from invenio_pidstore.models import PersistentIdentifier, PIDStatus
-from sqlalchemy import select
+from sqlalchemy import event, select
 from sqlalchemy.orm import aliased
+from test_helpers import best_time, pid_to_fetched_recid
 
-from invenio_pidrelations.api import PIDQuery
+from invenio_pidrelations.api import PIDQuery, relations_version
+from invenio_pidrelations.contrib.versioning import PIDNodeVersioning
 from invenio_pidrelations.models import PIDRelation
 
 
@@ -85,3 +87,64 @@ def test_query_status(db, version_pids, status, filt):
         .all()
     )
     assert result == filt(version_pids[0]["children"])
+
+
+def lookup_relations(parent, child):
+    """Run the usual lookups of the relations of a parent and of a child."""
+    node = PIDNodeVersioning(parent)
+    node.children.ordered("asc").all()
+    node.children.status([PIDStatus.REGISTERED]).count()
+    node.last_child
+    node.next_child(child)
+    node.previous_child(child)
+    node.index(child)
+    PIDNodeVersioning(child).parents.one_or_none()
+    PIDNodeVersioning(pid_to_fetched_recid(child)).parents.one_or_none()
+    relations_version(child)
+
+
+def test_query_statements_cache(db, version_pids):
+    """Test that the statements of the lookups hit the compiled cache."""
+    parent = version_pids[0]["parent"]
+    children = version_pids[0]["children"]
+    lookup_relations(parent, children[0])
+    cache_size = len(db.engine._compiled_cache)
+
+    cache_stats = []
+
+    def record_stats(conn, cursor, statement, params, context, executemany):
+        if not statement.startswith(("SAVEPOINT", "RELEASE SAVEPOINT")):
+            cache_stats.append((context.cache_hit, statement))
+
+    event.listen(db.engine, "after_cursor_execute", record_stats)
+    try:
+        # Other PIDs and relations reuse the statements compiled for the first
+        for child in children[1:]:
+            lookup_relations(parent, child)
+    finally:
+        event.remove(db.engine, "after_cursor_execute", record_stats)
+
+    assert cache_stats
+    misses = [
+        statement for stats, statement in cache_stats if stats.name != "CACHE_HIT"
+    ]
+    assert misses == []
+    assert len(db.engine._compiled_cache) == cache_size
+
+
+@pytest.mark.benchmark
+def test_query_statements_compile_benchmark(db, version_pids):
+    """Test that a lookup costs less than compiling its statement."""
+    parent = version_pids[0]["parent"]
+    dialect = db.engine.dialect
+
+    def build_statement():
+        return PIDNodeVersioning(parent).children.ordered("asc")._statement
+
+    # Building the statement and computing its cache key is all what is left
+    # per call once the statement is compiled.
+    compile_time = best_time(
+        lambda: build_statement().compile(dialect=dialect), number=200
+    )
+    cached_time = best_time(lambda: build_statement()._generate_cache_key(), number=200)
+    assert cached_time < compile_time
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Asynchronous API tests."""
+
+import asyncio
+import os
+import warnings
+
+import pytest
+from invenio_db import db as db_
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from sqlalchemy import select
+from sqlalchemy.exc import SAWarning
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from test_helpers import pid_to_fetched_recid
+
+from invenio_pidrelations.async_api import (
+    AsyncPIDNode,
+    AsyncPIDNodeGappedOrdered,
+    AsyncPIDNodeOrdered,
+    AsyncPIDNodeVersioning,
+)
+from invenio_pidrelations.errors import PIDRelationConsistencyError
+from invenio_pidrelations.models import PIDRelationChange, PIDRelationClosure
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest.fixture()
+def async_session(app, instance_path):
+    """Async session factory on a SQLite database."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///" + os.path.join(instance_path, "async.db")
+    )
+
+    async def create_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(db_.metadata.create_all)
+
+    asyncio.run(create_tables())
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+async def create_pid(session, pid_value, status=PIDStatus.REGISTERED):
+    """Create a PID."""
+    pid = PersistentIdentifier(
+        pid_type="recid", pid_value=pid_value, object_type="rec", status=status
+    )
+    session.add(pid)
+    await session.flush()
+    return pid
+
+
+def test_async_ordered_node(app, async_session, version_relation):
+    """Test the AsyncPIDNodeOrdered API."""
+
+    async def run():
+        async with async_session() as session:
+            parent = await create_pid(session, "parent")
+            children = [await create_pid(session, "v{0}".format(i)) for i in range(3)]
+            node = AsyncPIDNodeOrdered(session, parent, version_relation)
+            assert not await node.is_parent
+
+            await node.insert_child(children[0])
+            await node.insert_child(children[2])
+            await node.insert_child(pid_to_fetched_recid(children[1]), index=1)
+            with pytest.raises(PIDRelationConsistencyError):
+                with warnings.catch_warnings():
+                    warnings.simplefilter("error", SAWarning)
+                    await node.insert_child(children[0])
+            await session.commit()
+
+            assert await node.is_parent
+            assert await node.children.ordered("asc").all() == children
+            assert await node.children.count() == 3
+            assert await node.last_child == children[2]
+            assert await node.is_last_child(children[2])
+            assert [await node.index(c) for c in children] == [0, 1, 2]
+            assert await node.next_child(children[0]) == children[1]
+            assert await node.previous_child(children[0]) is None
+
+            child_node = AsyncPIDNodeOrdered(
+                session, pid_to_fetched_recid(children[1]), version_relation
+            )
+            assert await child_node.is_child
+            assert await child_node.parents.one() == parent
+
+            await node.remove_child(children[1], reorder=True)
+            assert await node.children.ordered("asc").all() == [
+                children[0],
+                children[2],
+            ]
+            assert await node.index(children[2]) == 1
+
+    asyncio.run(run())
+
+
+def test_async_gapped_node(app, async_session, version_relation):
+    """Test the AsyncPIDNodeGappedOrdered API."""
+
+    async def run():
+        async with async_session() as session:
+            parent = await create_pid(session, "parent")
+            children = [await create_pid(session, "v{0}".format(i)) for i in range(4)]
+            node = AsyncPIDNodeGappedOrdered(session, parent, version_relation)
+            await node.insert_child(children[0])
+            await node.insert_child(children[2])
+            await node.insert_child(children[1], index=1)
+            await node.insert_child(children[3], index=3)
+            assert await node.children.ordered("asc").all() == children
+            assert [await node.index(c) for c in children] == [0, 1, 2, 3]
+            relation = await node._get_child_relation(children[1])
+            assert relation.index == 512
+
+            await node.remove_child(children[1], reorder=True)
+            assert await node.index(children[2]) == 1
+            assert (await node._get_child_relation(children[2])).index == 1024
+
+    asyncio.run(run())
+
+
+def test_async_closure(app, async_session, version_relation):
+    """Test that the asynchronous API maintains the closure table."""
+    app.config["PIDRELATIONS_CLOSURE_RELATION_TYPES"] = ["version"]
+
+    async def run():
+        async with async_session() as session:
+            a, b, c = [await create_pid(session, value) for value in "abc"]
+            await AsyncPIDNode(session, a, version_relation).insert_child(b)
+            await AsyncPIDNode(session, b, version_relation).insert_child(c)
+            await session.commit()
+            stmt = select(
+                PIDRelationClosure.ancestor_id,
+                PIDRelationClosure.descendant_id,
+                PIDRelationClosure.depth,
+            )
+            assert set(tuple(row) for row in await session.execute(stmt)) == {
+                (a.id, b.id, 1),
+                (b.id, c.id, 1),
+                (a.id, c.id, 2),
+            }
+
+            await AsyncPIDNode(session, a, version_relation).remove_child(b)
+            await session.flush()
+            assert set(tuple(row) for row in await session.execute(stmt)) == {
+                (b.id, c.id, 1)
+            }
+
+    asyncio.run(run())
+
+
+def test_async_versioning(app, async_session, version_relation):
+    """Test the AsyncPIDNodeVersioning API."""
+
+    async def run():
+        async with async_session() as session:
+            parent = await create_pid(session, "parent")
+            v1 = await create_pid(session, "v1")
+            draft = await create_pid(session, "draft", status=PIDStatus.RESERVED)
+            node = AsyncPIDNodeVersioning(session, parent)
+
+            await node.insert_child(v1)
+            assert parent.status == PIDStatus.REDIRECTED
+            await node.insert_draft_child(draft)
+            with pytest.raises(PIDRelationConsistencyError):
+                await node.insert_draft_child(draft)
+            assert await node.draft_child == draft
+            assert await node.draft_child_deposit is None
+            assert await node.draft_state == (draft, None)
+
+            # Insert a version before the draft
+            v2 = await create_pid(session, "v2")
+            await node.insert_child(v2)
+            assert await node.index(draft) == 2
+            assert await node.children.ordered("asc").all() == [v1, v2]
+            assert await node.last_child == v2
+
+            # Publish the draft
+            app.config["PIDRELATIONS_OUTBOX_ENABLED"] = True
+            assert await node.publish_draft() == draft
+            change = (await session.scalars(select(PIDRelationChange))).one()
+            assert (change.child_id, change.op, change.new_index) == (
+                draft.id,
+                "status",
+                2,
+            )
+            assert draft.status == PIDStatus.REGISTERED
+            assert await node.index(draft) == 2
+            assert await node.last_child == draft
+            assert await node.draft_child is None
+
+            await node.remove_child(draft)
+            assert await node.children.ordered("asc").all() == [v1, v2]
+            await session.commit()
+
+    asyncio.run(run())
+
+
+def test_async_concurrent_lookups(app, async_session, version_relation):
+    """Test awaiting lookups of many nodes together."""
+
+    async def run():
+        async with async_session() as session:
+            parents = []
+            for i in range(5):
+                parent = await create_pid(session, "parent{0}".format(i))
+                node = AsyncPIDNodeVersioning(session, parent)
+                for j in range(i):
+                    await node.insert_child(
+                        await create_pid(session, "v{0}.{1}".format(i, j))
+                    )
+                parents.append(parent)
+            await session.commit()
+
+        async def count_children(pid):
+            async with async_session() as session:
+                node = AsyncPIDNodeVersioning(session, pid_to_fetched_recid(pid))
+                return await node.children.count()
+
+        counts = await asyncio.gather(*[count_children(p) for p in parents])
+        assert counts == [0, 1, 2, 3, 4]
+
+    asyncio.run(run())
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Relations cache tests."""
+
+import pytest
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from test_helpers import QueryCounter
+
+from invenio_pidrelations.cache import DictCache, relations_stamp
+from invenio_pidrelations.contrib.versioning import PIDNodeVersioning
+from invenio_pidrelations.proxies import current_pidrelations
+from invenio_pidrelations.serializers.utils import serialize_relations
+
+
+@pytest.fixture()
+def cache(app):
+    """In-process relations cache."""
+    app.config["PIDRELATIONS_CACHE"] = DictCache()
+    return current_pidrelations.cache
+
+
+def _children(relations):
+    """Get the values of the children in serialized version relations."""
+    return [c["pid_value"] for c in relations["version"][0]["children"]]
+
+
+def test_cached_serialization(app, db, cache, version_pids):
+    """Test that serialized relations are served from the cache."""
+    db.session.commit()
+    v1 = version_pids[0]["children"][0]
+
+    expected = serialize_relations(v1)
+    with QueryCounter(db.engine) as uncached:
+        assert serialize_relations(v1) == expected
+    assert cache.data
+
+    app.config["PIDRELATIONS_CACHE"] = None
+    del current_pidrelations.cache
+    with QueryCounter(db.engine) as no_cache:
+        assert serialize_relations(v1) == expected
+    assert uncached.count < no_cache.count
+
+
+def test_stamp_invalidation(app, db, cache, version_pids):
+    """Test that mutations replace the stamp once committed."""
+    db.session.commit()
+    parent = version_pids[0]["parent"]
+    v1 = version_pids[0]["children"][0]
+    stamp = relations_stamp(parent.id)
+    assert _children(serialize_relations(v1)) == [
+        "foobar.v1",
+        "foobar.v2",
+        "foobar.v3",
+    ]
+
+    v4 = PersistentIdentifier.create(
+        "recid", "foobar.v4", object_type="rec", status=PIDStatus.REGISTERED
+    )
+    PIDNodeVersioning(parent).insert_child(v4)
+    # Uncommitted changes bypass the cache
+    assert relations_stamp(parent.id) == stamp
+    assert _children(serialize_relations(v1))[-1] == "foobar.v4"
+
+    db.session.commit()
+    assert relations_stamp(parent.id) != stamp
+    assert _children(serialize_relations(v1))[-1] == "foobar.v4"
+
+    # Rolled back changes do not replace the stamp
+    stamp = relations_stamp(parent.id)
+    PIDNodeVersioning(parent).remove_child(v4)
+    db.session.rollback()
+    assert relations_stamp(parent.id) == stamp
+    assert _children(serialize_relations(v1))[-1] == "foobar.v4"
+
+
+def test_invenio_cache_backend(app, db, version_pids):
+    """Test using an invenio-cache backend."""
+    pytest.importorskip("invenio_cache")
+    from invenio_cache import InvenioCache
+
+    app.config.update(
+        CACHE_TYPE="SimpleCache",
+        PIDRELATIONS_CACHE="invenio_cache.proxies:current_cache",
+    )
+    InvenioCache(app)
+    db.session.commit()
+    v1 = version_pids[0]["children"][0]
+    expected = serialize_relations(v1)
+    with QueryCounter(db.engine) as counter:
+        assert serialize_relations(v1) == expected
+    stamp = relations_stamp(version_pids[0]["parent"].id)
+    assert (
+        current_pidrelations.cache.get(
+            "pidrelations:stamp:{0}".format(version_pids[0]["parent"].id)
+        )
+        == stamp
+    )
+    assert counter.count <= 2
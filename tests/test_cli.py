@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""CLI tests."""
+
+import io
+import json
+import os
+import uuid
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import delete, select
+
+from invenio_pidrelations.bulk import (
+    dump_relations,
+    export_relations,
+    import_relations,
+    load_relations,
+)
+from invenio_pidrelations.cli import pidrelations
+from invenio_pidrelations.models import PIDRelation
+
+
+def _relations(db):
+    """Get all the relations as comparable tuples."""
+    stmt = select(
+        PIDRelation.parent_id,
+        PIDRelation.child_id,
+        PIDRelation.relation_type,
+        PIDRelation.index,
+    )
+    return sorted(tuple(r) for r in db.session.execute(stmt))
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+def test_export_import(app, db, version_pids, instance_path, fmt):
+    """Test that exported relations can be imported back."""
+    expected = _relations(db)
+    path = os.path.join(instance_path, "relations.{0}".format(fmt))
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(pidrelations, ["export", path, "-f", fmt])
+    assert result.exit_code == 0, result.output
+
+    db.session.execute(delete(PIDRelation))
+    db.session.commit()
+    assert _relations(db) == []
+
+    result = runner.invoke(pidrelations, ["import", path, "-f", fmt])
+    assert result.exit_code == 0, result.output
+    assert "8 inserted" in result.output
+    assert _relations(db) == expected
+
+    # Importing again does not duplicate the relations
+    result = runner.invoke(pidrelations, ["import", path, "-f", fmt])
+    assert result.exit_code == 0, result.output
+    assert "8 already existing" in result.output
+    assert _relations(db) == expected
+
+
+def test_export_relation_type(app, db, version_pids):
+    """Test exporting only a given relation type."""
+    exported = list(export_relations(relation_types=["record_draft"]))
+    assert exported == [
+        {
+            "parent_pid_type": "recid",
+            "parent_pid_value": "foobar.draft",
+            "child_pid_type": "recid",
+            "child_pid_value": "foobar.deposit",
+            "relation_type": "record_draft",
+            "index": 0,
+        }
+    ]
+
+
+def test_import_checkpoint(app, db, version_pids, instance_path):
+    """Test resuming an interrupted import from its checkpoint."""
+    expected = _relations(db)
+    stream = io.StringIO()
+    dump_relations(export_relations(), stream)
+    db.session.execute(delete(PIDRelation))
+    db.session.commit()
+
+    checkpoint = os.path.join(instance_path, "checkpoint.json")
+    lines = stream.getvalue().splitlines(True)
+    # Import the first batch, then "crash"
+    stats = import_relations(
+        load_relations(lines[:3]), batch_size=3, checkpoint=checkpoint
+    )
+    assert stats["inserted"] == 3
+    with open(checkpoint) as fp:
+        assert json.load(fp) == {"offset": 3}
+
+    stats = import_relations(load_relations(lines), batch_size=3, checkpoint=checkpoint)
+    assert stats == dict(read=8, inserted=5, existing=0, missing=0)
+    assert _relations(db) == expected
+
+
+def test_import_missing_pids(app, db, version_pids):
+    """Test that relations between unknown PIDs are reported and skipped."""
+    stats = import_relations(
+        [
+            {
+                "parent_pid_type": "recid",
+                "parent_pid_value": "foobar",
+                "child_pid_type": "recid",
+                "child_pid_value": "unknown",
+                "relation_type": "version",
+                "index": 0,
+            }
+        ]
+    )
+    assert stats == dict(read=1, inserted=0, existing=0, missing=1)
+
+
+def test_reindex(app, db, version_pids):
+    """Test the reindex command."""
+    for pids in version_pids:
+        for pid in [pids["parent"]] + pids["children"]:
+            pid.object_type, pid.object_uuid = "rec", uuid.uuid4()
+    db.session.commit()
+
+    runner = app.test_cli_runner()
+    with patch("invenio_search.engine.search.helpers.bulk") as mock:
+        mock.side_effect = lambda client, actions, **kwargs: (len(list(actions)), 0)
+        result = runner.invoke(
+            pidrelations,
+            [
+                "reindex",
+                "--processes",
+                "1",
+                "--partition-size",
+                "1",
+                "--index",
+                "records",
+            ],
+        )
+    assert result.exit_code == 0, result.output
+    assert mock.call_count == 2
+    assert "Updated 9 records from 2 partitions" in result.stderr
+
+
+def test_stats(app, db, version_pids):
+    """Test the stats command."""
+    runner = app.test_cli_runner()
+    result = runner.invoke(pidrelations, ["stats", "-t", "version", "--top", "1"])
+    assert result.exit_code == 0, result.output
+    stats = json.loads(result.stdout)
+    assert list(stats) == ["version"]
+    assert stats["version"]["relations"] == 7
+    assert stats["version"]["largest_parents"] == [
+        {"pid_type": "recid", "pid_value": "foobar", "children": 6}
+    ]
+
+    result = runner.invoke(pidrelations, ["stats"])
+    assert list(json.loads(result.stdout)) == ["version", "record_draft"]
+
+
+def test_build_history(app, db, version_pids):
+    """Test the build-history command."""
+    app.config["PIDRELATIONS_HISTORY_RELATION_TYPES"] = ["version"]
+    runner = app.test_cli_runner()
+    result = runner.invoke(pidrelations, ["build-history"])
+    assert result.exit_code == 0, result.output
+    assert "Added 7 history rows for 'version'." in result.stderr
+    result = runner.invoke(pidrelations, ["build-history", "-t", "version"])
+    assert "Added 0 history rows for 'version'." in result.stderr
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Closure table tests."""
+
+import pytest
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from sqlalchemy import delete, select
+from test_helpers import pid_to_fetched_recid
+
+from invenio_pidrelations.api import PIDNode
+from invenio_pidrelations.cli import pidrelations
+from invenio_pidrelations.closure import build_closure
+from invenio_pidrelations.errors import PIDRelationConsistencyError, PIDRelationError
+from invenio_pidrelations.models import PIDRelation, PIDRelationClosure
+
+
+def _closure(db):
+    """Get the closure table as comparable tuples of PID values."""
+    ancestor = db.aliased(PersistentIdentifier)
+    descendant = db.aliased(PersistentIdentifier)
+    stmt = (
+        select(
+            ancestor.pid_value,
+            descendant.pid_value,
+            PIDRelationClosure.depth,
+            PIDRelationClosure.paths,
+        )
+        .join(ancestor, ancestor.id == PIDRelationClosure.ancestor_id)
+        .join(descendant, descendant.id == PIDRelationClosure.descendant_id)
+    )
+    return set(tuple(row) for row in db.session.execute(stmt))
+
+
+@pytest.fixture()
+def tree(app, db, version_relation):
+    """Nest PIDs in a DAG: a -> b -> c -> d and a -> e -> c."""
+    app.config["PIDRELATIONS_CLOSURE_RELATION_TYPES"] = ["version"]
+    pids = dict(
+        (
+            value,
+            PersistentIdentifier.create(
+                "recid", value, object_type="rec", status=PIDStatus.REGISTERED
+            ),
+        )
+        for value in "abcde"
+    )
+    for parent, child in ["ab", "cd", "bc", "ae", "ec"]:
+        PIDNode(pids[parent], version_relation).insert_child(pids[child])
+    return pids
+
+
+def test_closure_maintained(app, db, version_relation, tree):
+    """Test that the closure table follows the inserted and removed children."""
+    expected = {
+        ("a", "b", 1, 1),
+        ("a", "e", 1, 1),
+        ("a", "c", 2, 2),
+        ("a", "d", 3, 2),
+        ("b", "c", 1, 1),
+        ("b", "d", 2, 1),
+        ("e", "c", 1, 1),
+        ("e", "d", 2, 1),
+        ("c", "d", 1, 1),
+    }
+    assert _closure(db) == expected
+
+    # One of the two paths from a to c is removed
+    PIDNode(tree["b"], version_relation).remove_child(tree["c"])
+    assert _closure(db) == {
+        ("a", "b", 1, 1),
+        ("a", "e", 1, 1),
+        ("a", "c", 2, 1),
+        ("a", "d", 3, 1),
+        ("e", "c", 1, 1),
+        ("e", "d", 2, 1),
+        ("c", "d", 1, 1),
+    }
+    PIDNode(tree["b"], version_relation).insert_child(tree["c"])
+    db.session.commit()
+    assert _closure(db) == expected
+
+    # Cycles are rejected
+    with pytest.raises(PIDRelationConsistencyError):
+        PIDNode(tree["d"], version_relation).insert_child(tree["a"])
+    db.session.commit()
+    assert not PIDRelation.relation_exists(tree["d"], tree["a"], version_relation.id)
+    assert _closure(db) == expected
+
+
+def test_closure_queries(app, db, version_relation, tree):
+    """Test the ancestors and descendants lookups."""
+    a = PIDNode(tree["a"], version_relation)
+    c = PIDNode(pid_to_fetched_recid(tree["c"]), version_relation)
+    assert set(a.descendants.all()) == set(tree[v] for v in "bcde")
+    assert a.descendants.count() == 4
+    assert set(c.ancestors.all()) == set(tree[v] for v in "abe")
+    assert c.descendants.all() == [tree["d"]]
+    assert a.ancestors.all() == []
+    assert a.has_descendant(tree["d"])
+    assert a.has_descendant(pid_to_fetched_recid(tree["c"]))
+    assert not c.has_descendant(tree["b"])
+
+    app.config["PIDRELATIONS_CLOSURE_RELATION_TYPES"] = []
+    with pytest.raises(PIDRelationError):
+        a.descendants
+
+
+def test_build_closure(app, db, version_relation, tree):
+    """Test building the closure table from the relations."""
+    expected = _closure(db)
+    db.session.execute(delete(PIDRelationClosure))
+    assert build_closure("version") == len(expected)
+    assert _closure(db) == expected
+
+    # Relations written without the ORM are added by the command
+    db.session.execute(
+        PIDRelation.__table__.insert().values(
+            parent_id=tree["d"].id, child_id=tree["b"].id, relation_type=0
+        )
+    )
+    db.session.commit()
+    result = app.test_cli_runner().invoke(pidrelations, ["build-closure"])
+    assert result.exit_code != 0
+    assert isinstance(result.exception, PIDRelationConsistencyError)
+
+    db.session.execute(delete(PIDRelation).where(PIDRelation.parent_id == tree["d"].id))
+    db.session.execute(delete(PIDRelationClosure))
+    db.session.commit()
+    result = app.test_cli_runner().invoke(pidrelations, ["build-closure"])
+    assert result.exit_code == 0, result.output
+    assert "Built 9 closure rows for 'version'." in result.stderr
+    assert _closure(db) == expected
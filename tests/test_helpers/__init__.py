@@ -8,11 +8,14 @@
 
 """Test helpers."""
 
+import time
+
 import pytest
 from invenio_pidstore.fetchers import FetchedPID
 from invenio_pidstore.models import PersistentIdentifier, PIDStatus
 from invenio_pidstore.providers.recordid import RecordIdProvider
 from marshmallow import Schema, fields
+from sqlalchemy import event
 
 from invenio_pidrelations.serializers.utils import serialize_relations
 
@@ -93,3 +96,40 @@ class PIDRelationsMixin(object):
         """Dump the relations to a dictionary."""
         pid = self.context["pid"]
         return serialize_relations(pid)
+
+
+class QueryCounter(object):
+    """Context manager counting the SQL statements executed on an engine."""
+
+    def __init__(self, engine):
+        """Constructor."""
+        self.engine = engine
+        self.statements = []
+
+    def _on_execute(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        """Start counting."""
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        """Stop counting."""
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+    @property
+    def count(self):
+        """Number of executed statements."""
+        return len(self.statements)
+
+
+def best_time(func, number=1, repeat=3):
+    """Best time of ``repeat`` runs of ``number`` calls, per call."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return min(timings)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Relations history tests."""
+
+from datetime import datetime
+
+import pytest
+from invenio_pidstore.models import PIDStatus
+from test_helpers import QueryCounter, create_pids, pid_to_fetched_recid
+
+from invenio_pidrelations.api import PIDNodeGappedOrdered, PIDNodeOrdered
+from invenio_pidrelations.contrib.versioning import PIDNodeVersioning
+from invenio_pidrelations.errors import PIDRelationError
+from invenio_pidrelations.history import RelationsAsOf, build_history
+
+
+def test_versions_as_of(app, db, version_relation):
+    """Test querying the versions at points in time."""
+    app.config["PIDRELATIONS_HISTORY_RELATION_TYPES"] = ["version"]
+    parent = create_pids(1, prefix="parent")[0]
+    v1, v2 = create_pids(2, prefix="version")
+    draft = create_pids(1, prefix="draft", status=PIDStatus.RESERVED)[0]
+    node = PIDNodeVersioning(parent)
+
+    t0 = datetime.utcnow()
+    node.insert_child(v1)
+    node.insert_child(v2)
+    node.insert_draft_child(draft)
+    t1 = datetime.utcnow()
+    node.publish_draft()
+    t2 = datetime.utcnow()
+    node.remove_child(v1)
+    db.session.commit()
+    t3 = datetime.utcnow()
+
+    assert node.as_of(t0).children == []
+    assert node.as_of(t0).last_child is None
+    assert node.as_of(t1).children == [v1, v2]
+    assert node.as_of(t1).last_child == v2
+    assert node.as_of(t2).children == [v1, v2, draft]
+    assert node.as_of(t2).last_child == draft
+    assert node.as_of(t3).children == [v2, draft]
+    assert node.as_of(t3).last_child == draft
+
+    # The draft was a child before its publication
+    ordered = PIDNodeOrdered(parent, version_relation)
+    assert ordered.as_of(t1).children == [v1, v2, draft]
+    assert ordered.as_of(t1).index(draft) == 2
+    assert ordered.as_of(t3).index(pid_to_fetched_recid(draft)) == 1
+
+    with QueryCounter(db.engine) as counter:
+        node.as_of(t1).last_child
+    assert counter.count == 1
+
+
+def test_gapped_index_as_of(app, db, version_relation):
+    """Test the positions of the children of a gapped node in time."""
+    app.config["PIDRELATIONS_HISTORY_RELATION_TYPES"] = ["version"]
+    parent = create_pids(1, prefix="parent")[0]
+    children = create_pids(3)
+    node = PIDNodeGappedOrdered(parent, version_relation)
+    node.insert_child(children[0])
+    node.insert_child(children[2])
+    t0 = datetime.utcnow()
+    node.insert_child(children[1], index=1)
+    t1 = datetime.utcnow()
+    assert node.as_of(t0).index(children[2]) == 1
+    assert node.as_of(t1).index(children[2]) == 2
+    assert node.as_of(t1).children == children
+
+
+def test_as_of_without_history(app, db, version_pids):
+    """Test that the history must be enabled for the relation type."""
+    node = PIDNodeVersioning(version_pids[0]["parent"])
+    with pytest.raises(PIDRelationError):
+        node.as_of(datetime.utcnow()).children
+
+
+def test_history_enabled_on_existing_relations(app, db, version_relation):
+    """Test changing relations created before their history was enabled."""
+    parent = create_pids(1, prefix="parent")[0]
+    a, b, c = create_pids(3)
+    node = PIDNodeOrdered(parent, version_relation)
+    node.insert_child(a)
+    node.insert_child(b)
+    db.session.commit()
+    t0 = datetime.utcnow()
+
+    app.config["PIDRELATIONS_HISTORY_RELATION_TYPES"] = ["version"]
+    node.insert_child(c, index=0)
+    db.session.commit()
+    t1 = datetime.utcnow()
+    # The renumbered relations got their state since their creation
+    assert node.as_of(t0).children == [a, b]
+    assert node.as_of(t1).children == [c, a, b]
+
+    # So do the relations of a child whose status changed
+    other = create_pids(1, prefix="other")[0]
+    app.config["PIDRELATIONS_HISTORY_RELATION_TYPES"] = []
+    PIDNodeOrdered(other, version_relation).insert_child(b)
+    db.session.commit()
+    t2 = datetime.utcnow()
+    app.config["PIDRELATIONS_HISTORY_RELATION_TYPES"] = ["version"]
+    b.status = PIDStatus.DELETED
+    db.session.commit()
+    other_node = PIDNodeOrdered(other, version_relation)
+    registered = [PIDStatus.REGISTERED]
+    assert RelationsAsOf(other_node, t2, status=registered).children == [b]
+    t3 = datetime.utcnow()
+    assert RelationsAsOf(other_node, t3, status=registered).children == []
+    assert other_node.as_of(t3).children == [b]
+
+
+def test_build_history(app, db, version_relation):
+    """Test adding the history of the existing relations."""
+    parent = create_pids(1, prefix="parent")[0]
+    children = create_pids(2)
+    node = PIDNodeOrdered(parent, version_relation)
+    for child in children:
+        node.insert_child(child)
+    db.session.commit()
+    t0 = datetime.utcnow()
+
+    app.config["PIDRELATIONS_HISTORY_RELATION_TYPES"] = ["version"]
+    assert build_history("version") == 2
+    assert build_history(version_relation) == 0
+    db.session.commit()
+    assert node.as_of(t0).children == children
+    assert node.as_of(t0).index(children[1]) == 1
@@ -9,15 +9,29 @@
 
 """Indexer tests."""
 
+import uuid
 from unittest.mock import patch
 
-from invenio_pidstore.models import PIDStatus
+import pytest
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
 from invenio_pidstore.providers.recordid import RecordIdProvider
 from invenio_records.api import Record
 from test_helpers import compare_dictionaries
 
+from invenio_pidrelations.config import RelationType
 from invenio_pidrelations.contrib.versioning import PIDNodeVersioning
-from invenio_pidrelations.indexers import index_relations, index_siblings
+from invenio_pidrelations.indexers import (
+    changed_siblings,
+    count_relation_partitions,
+    index_relations,
+    index_siblings,
+    reindex_relations,
+    relation_partitions,
+    serializes_children,
+    sibling_relations,
+)
+from invenio_pidrelations.serializers.schemas import CompactRelationSchema
+from invenio_pidrelations.serializers.utils import serialize_relations
 
 
 def test_index_relations(app, db):
@@ -120,3 +134,164 @@ def test_index_siblings(app, db, version_pids):
         mock.assert_any_call(str(provider.pid.object_uuid))
         mock.assert_any_call(str(provider_v2.pid.object_uuid))
         mock.assert_any_call(str(provider_v3.pid.object_uuid))
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_reindex_relations(app, db, version_pids, version_relation, processes):
+    """Test queuing the records of all the relations in partitions."""
+    expected = set()
+    for pids in version_pids:
+        for pid in [pids["parent"]] + pids["children"]:
+            pid.object_type, pid.object_uuid = "rec", uuid.uuid4()
+            expected.add(str(pid.object_uuid))
+    db.session.commit()
+
+    assert list(relation_partitions(version_relation, 1)) == [
+        (version_pids[0]["parent"].id, version_pids[0]["parent"].id),
+        (version_pids[1]["parent"].id, version_pids[1]["parent"].id),
+    ]
+    assert count_relation_partitions(version_relation, 1) == 2
+    assert len(list(relation_partitions("version", 2))) == 1
+    assert count_relation_partitions("version", 2) == 1
+
+    def bulk(client, actions, **kwargs):
+        actions = list(actions)
+        for action in actions:
+            updated[action["_id"]] = action["script"]["params"]["relations"]
+        return len(actions), 0
+
+    # Uncommitted changes of the session are kept
+    pending = PersistentIdentifier.create("recid", "pending", object_type="rec")
+
+    updated = {}
+    with patch("invenio_search.engine.search.helpers.bulk", side_effect=bulk):
+        counts = reindex_relations(
+            "version", partition_size=1, processes=processes, index="records"
+        )
+        assert sorted(counts) == [2, 7]
+    db.session.commit()
+    assert PersistentIdentifier.get("recid", "pending") == pending
+    if processes == 1:
+        # The workers of the pool update the records in other processes
+        assert set(updated) == expected
+        v2 = version_pids[0]["children"][1]
+        assert updated[str(v2.object_uuid)] == serialize_relations(v2)
+
+
+def test_changed_siblings(app, db, version_pids, version_relation):
+    """Test computing the siblings whose serialized relations changed."""
+    parent = version_pids[0]["parent"]
+    v1, v2, v3 = version_pids[0]["children"][:3]
+    node = PIDNodeVersioning(pid=parent)
+    before = sibling_relations(node)
+    assert list(before) == [v1.id, v2.id, v3.id]
+
+    # Publishing a new version changes the previous last version only
+    v4 = PersistentIdentifier.create(
+        "recid", "foobar.v4", object_type="rec", status=PIDStatus.REGISTERED
+    )
+    node.insert_child(v4)
+    after = sibling_relations(node)
+    assert changed_siblings(before, after) == [v3, v4]
+    assert changed_siblings(before, after, with_children=True) == [v1, v2, v3, v4]
+    assert changed_siblings(after, after, with_children=True) == []
+
+    # Removing a version shifts the indexes of the next versions
+    node.remove_child(v2)
+    assert changed_siblings(after, sibling_relations(node)) == [v1, v3, v4, v2]
+
+
+def test_index_siblings_since(app, db, version_pids, version_relation):
+    """Test indexing only the siblings whose relations changed."""
+    parent = version_pids[0]["parent"]
+    v1, v2, v3 = version_pids[0]["children"][:3]
+    for pid in (v1, v2, v3):
+        pid.object_uuid = uuid.uuid4()
+    node = PIDNodeVersioning(pid=parent)
+    before = sibling_relations(node)
+    v4 = PersistentIdentifier.create(
+        "recid",
+        "foobar.v4",
+        object_type="rec",
+        object_uuid=uuid.uuid4(),
+        status=PIDStatus.REGISTERED,
+    )
+    node.insert_child(v4)
+
+    # All the siblings serialize the list of children
+    with patch("invenio_indexer.api.RecordIndexer.index_by_id") as mock:
+        index_siblings(
+            v4, include_pid=True, eager=True, with_deposits=False, since=before
+        )
+        assert mock.call_count == 4
+
+    app.config["PIDRELATIONS_RELATION_TYPES"] = [
+        RelationType(*version_relation[:-1], CompactRelationSchema)
+    ]
+    with patch("invenio_indexer.api.RecordIndexer.index_by_id") as mock:
+        index_siblings(
+            v4, include_pid=True, eager=True, with_deposits=False, since=before
+        )
+        assert [c.args[0] for c in mock.call_args_list] == [
+            str(v3.object_uuid),
+            str(v4.object_uuid),
+        ]
+
+    # After a removal, the parent is given by the caller
+    before = sibling_relations(node)
+    node.remove_child(v3)
+    with patch("invenio_indexer.api.RecordIndexer.index_by_id") as mock:
+        index_siblings(
+            v3,
+            children=[v1, v2, v4],
+            eager=True,
+            with_deposits=False,
+            since=before,
+            parent=parent,
+        )
+        assert [c.args[0] for c in mock.call_args_list] == [
+            str(v2.object_uuid),
+            str(v4.object_uuid),
+        ]
+    # Without the parent, all the children are indexed
+    with patch("invenio_indexer.api.RecordIndexer.index_by_id") as mock:
+        index_siblings(
+            v3, children=[v1, v2, v4], eager=True, with_deposits=False, since=before
+        )
+        assert mock.call_count == 3
+
+
+def test_compact_relation_schema(app, db, version_pids, version_relation):
+    """Test serializing the relations without the list of children."""
+    compact = RelationType(*version_relation[:-1], CompactRelationSchema)
+    assert serializes_children(version_relation)
+    assert not serializes_children(compact)
+
+    app.config["PIDRELATIONS_RELATION_TYPES"] = [compact]
+    relations = serialize_relations(version_pids[0]["children"][1])
+    assert "children" not in relations["version"][0]
+    assert relations["version"][0]["index"] == 1
+
+
+def test_index_siblings_relations_only(app, db, version_pids, version_relation):
+    """Test updating only the relations of the indexed siblings."""
+    v1, v2, v3 = version_pids[0]["children"][:3]
+    for pid in (v1, v2, v3):
+        pid.object_uuid = uuid.uuid4()
+    db.session.commit()
+
+    with patch("invenio_search.engine.search.helpers.bulk") as bulk, patch(
+        "invenio_indexer.api.RecordIndexer.index_by_id"
+    ) as index_by_id:
+        bulk.return_value = (2, 0)
+        index_siblings(
+            v2, with_deposits=False, relations_only=True, index="records-record"
+        )
+    assert not index_by_id.called
+    actions = list(bulk.call_args.args[1])
+    assert [a["_id"] for a in actions] == [str(v1.object_uuid), str(v3.object_uuid)]
+    for action, pid in zip(actions, (v1, v3)):
+        assert action["_op_type"] == "update"
+        assert action["_index"] == "records-record"
+        assert action["script"]["params"] == {"relations": serialize_relations(pid)}
+        assert "doc" not in action and "_source" not in action
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Query plan tests for the relation indexes."""
+
+import pytest
+from sqlalchemy import create_mock_engine, text
+from sqlalchemy.schema import CreateIndex
+
+from invenio_pidrelations.api import PIDNodeOrdered
+from invenio_pidrelations.config import RelationType
+from invenio_pidrelations.contrib.draft import PIDNodeDraft
+from invenio_pidrelations.contrib.versioning import PIDNodeVersioning
+from invenio_pidrelations.models import (
+    PIDRelation,
+    create_relation_type_indexes,
+    relation_type_indexes,
+)
+
+
+def explain(db, stmt):
+    """Get the query plan of a statement as text."""
+    sql = str(stmt.compile(db.engine, compile_kwargs={"literal_binds": True}))
+    if db.engine.name == "sqlite":
+        rows = db.session.execute(text("EXPLAIN QUERY PLAN " + sql))
+        return "\n".join(row[-1] for row in rows)
+    elif db.engine.name == "postgresql":
+        # The test tables are too small for the planner to pick an index
+        db.session.execute(text("SET LOCAL enable_seqscan = off"))
+        rows = db.session.execute(text("EXPLAIN " + sql))
+        return "\n".join(row[0] for row in rows)
+    pytest.skip("No partial indexes on {0}.".format(db.engine.name))
+
+
+@pytest.fixture()
+def partial_indexes(db):
+    """Create the optional partial indexes of the relation types."""
+    create_relation_type_indexes(db.session.connection())
+
+
+def test_version_parents_index(db, version_pids, partial_indexes):
+    """Test that the parent of a version is found with the version index."""
+    node = PIDNodeVersioning(version_pids[0]["children"][0])
+    plan = explain(db, node.parents._statement)
+    assert "idx_pidrelations_version_child" in plan
+
+
+def test_draft_parents_index(db, version_pids, partial_indexes):
+    """Test that the draft relation of a child uses the partial draft index."""
+    node = PIDNodeDraft(version_pids[0]["deposit"])
+    plan = explain(db, node.parents._statement)
+    assert "idx_pidrelations_draft_child" in plan
+
+
+def test_relation_type_indexes(app, db, version_relation, draft_relation):
+    """Test building the partial indexes from the configured relation types."""
+    app.config["PIDRELATIONS_RELATION_TYPES"] = [
+        RelationType(3, *version_relation[1:]),
+        RelationType(7, *draft_relation[1:]),
+    ]
+    sqlite_engine = create_mock_engine("sqlite://", None)
+    assert [
+        str(CreateIndex(index).compile(sqlite_engine))
+        for index in relation_type_indexes()
+    ] == [
+        "CREATE INDEX idx_pidrelations_version_child "
+        "ON pidrelations_pidrelation (child_id) WHERE relation_type = 3",
+        "CREATE INDEX idx_pidrelations_draft_child "
+        "ON pidrelations_pidrelation (child_id) WHERE relation_type = 7",
+    ]
+    # Not part of the model
+    assert not set(index.name for index in PIDRelation.__table__.indexes) & set(
+        index.name for index in relation_type_indexes()
+    )
+    # Nor created on databases without partial indexes
+    statements = []
+    mysql_engine = create_mock_engine(
+        "mysql://", lambda sql, *args, **kwargs: statements.append(sql)
+    )
+    assert create_relation_type_indexes(mysql_engine) == []
+    assert statements == []
+
+
+@pytest.mark.parametrize(
+    "build_node",
+    [
+        lambda pid, version, draft: PIDNodeOrdered(pid, version),
+        lambda pid, version, draft: PIDNodeOrdered(pid, draft),
+        lambda pid, version, draft: PIDNodeVersioning(pid),
+    ],
+)
+def test_ordered_children_scans(
+    db, version_pids, version_relation, draft_relation, build_node
+):
+    """Test that ordered children scans read the index without sorting."""
+    node = build_node(version_pids[0]["parent"], version_relation, draft_relation)
+    children = node.children.indexed()
+    for query in (
+        # children.ordered() and last_child
+        children.ordered("asc"),
+        children.ordered("desc"),
+        # next_child and previous_child
+        children.filter(PIDRelation.index > 1).ordered("asc"),
+        children.filter(PIDRelation.index < 1).ordered("desc"),
+    ):
+        plan = explain(db, query._statement.limit(1))
+        assert "idx_pidrelations_parent_type_index" in plan
+        if db.engine.name == "sqlite":
+            assert "TEMP B-TREE" not in plan
+        else:
+            assert "Sort" not in plan
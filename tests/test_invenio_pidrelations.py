@@ -10,6 +10,9 @@
 
 from __future__ import absolute_import, print_function
 
+import subprocess
+import sys
+
 import pytest
 from flask import Flask
 
@@ -53,3 +56,67 @@ def test_alembic(app, db):
     ext.alembic.upgrade()
 
     assert not ext.alembic.compare_metadata()
+
+
+HEAVY_MODULES = {
+    "celery",
+    "invenio_indexer",
+    "invenio_records",
+    "invenio_search",
+    "marshmallow",
+}
+
+
+def imported_modules(code):
+    """Run code in a new interpreter and return the imported modules.
+
+    The modules are collected from ``python -X importtime`` which also reports
+    the cumulative import time of each module, in microseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "invenio_pidrelations",
+        "invenio_pidrelations.api",
+        "invenio_pidrelations.contrib.versioning",
+        "invenio_pidrelations.indexers",
+    ],
+)
+def test_import_time(module):
+    """Test that importing the APIs does not load the heavy dependencies."""
+    modules = imported_modules("import {0}".format(module))
+    assert module in modules
+    assert not HEAVY_MODULES & set(m.split(".")[0] for m in modules)
+
+
+def test_lazy_relation_type_config():
+    """Test that using the node APIs does not import the serializers."""
+    modules = imported_modules(
+        "from flask import Flask\n"
+        "from invenio_pidstore.fetchers import FetchedPID\n"
+        "from invenio_pidrelations import InvenioPIDRelations\n"
+        "from invenio_pidrelations.contrib.versioning import PIDNodeVersioning\n"
+        "app = Flask('testapp')\n"
+        "InvenioPIDRelations(app)\n"
+        "with app.app_context():\n"
+        "    node = PIDNodeVersioning(FetchedPID(None, 'recid', '1'))\n"
+        "    assert node.relation_type.name == 'version'\n"
+    )
+    assert "invenio_pidrelations.serializers.schemas" not in modules
+    assert "marshmallow" not in modules
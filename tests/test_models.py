@@ -10,6 +10,7 @@
 """Model tests."""
 
 from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from sqlalchemy.dialects import mysql
 
 from invenio_pidrelations.models import PIDRelation
 
@@ -27,3 +28,34 @@ def test_repr(db, version_relation):
         repr(pid_relation)
         == "<PIDRelation: (recid:barfoo) -> (recid:barfoo.v1) (Type: 0, Idx: 0)>"
     )
+
+
+def test_relation_exists(db, version_relation, draft_relation, version_pids):
+    """Test checking if relations exist."""
+    parent = version_pids[0]["parent"]
+    v1, v2 = version_pids[0]["children"][:2]
+    assert PIDRelation.relation_exists(parent, v1, version_relation.id)
+    assert not PIDRelation.relation_exists(parent, v1, draft_relation.id)
+    assert not PIDRelation.relation_exists(v1, parent, version_relation.id)
+
+
+def test_relations_exist(db, version_relation, draft_relation, version_pids):
+    """Test checking if many relations exist at once."""
+    parent = version_pids[0]["parent"]
+    children = version_pids[0]["children"]
+    other = version_pids[1]["parent"]
+    triples = [(parent, c, version_relation.id) for c in children]
+    triples += [(other.id, c.id, version_relation.id) for c in children]
+    triples += [(parent, children[0], draft_relation.id)]
+
+    expected = set((parent.id, c.id, version_relation.id) for c in children)
+    assert PIDRelation.relations_exist(triples) == expected
+    assert PIDRelation.relations_exist(triples, chunk_size=4) == expected
+    assert PIDRelation.relations_exist([]) == set()
+
+    # Tuple IN filter, as used on MySQL
+    ids = [(parent.id, c.id, version_relation.id) for c in children]
+    ids += [(other.id, children[0].id, version_relation.id)]
+    stmt = PIDRelation._existing_statement(ids, use_values=False)
+    assert set(tuple(row) for row in db.session.execute(stmt)) == expected
+    assert "VALUES" not in str(stmt.compile(dialect=mysql.dialect()))
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Relation changes outbox tests."""
+
+from datetime import timedelta
+
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from sqlalchemy import select
+
+from invenio_pidrelations.api import PIDNode
+from invenio_pidrelations.contrib.versioning import PIDNodeVersioning
+from invenio_pidrelations.models import PIDRelationChange
+from invenio_pidrelations.outbox import (
+    acknowledge_changes,
+    fetch_changes,
+    get_cursor,
+    purge_changes,
+)
+
+
+def _changes(db):
+    """Get all the changes as comparable tuples."""
+    stmt = select(PIDRelationChange).order_by(PIDRelationChange.id)
+    return [
+        (c.op, c.parent_id, c.child_id, c.old_index, c.new_index)
+        for c in db.session.scalars(stmt)
+    ]
+
+
+def _create_version(value):
+    """Create a published version PID."""
+    return PersistentIdentifier.create(
+        "recid", value, object_type="rec", status=PIDStatus.REGISTERED
+    )
+
+
+def test_outbox_disabled(app, db, version_pids):
+    """Test that no changes are recorded by default."""
+    PIDNodeVersioning(version_pids[0]["parent"]).insert_child(
+        _create_version("foobar.v4")
+    )
+    assert _changes(db) == []
+
+
+def test_outbox_changes(app, db, version_pids, version_relation):
+    """Test recording the changes of the relations."""
+    app.config["PIDRELATIONS_OUTBOX_ENABLED"] = True
+    parent = version_pids[0]["parent"]
+    v1, v2, v3, del1, del2, draft = version_pids[0]["children"]
+    node = PIDNodeVersioning(parent)
+
+    # The new version is inserted before the draft
+    v4 = _create_version("foobar.v4")
+    node.insert_child(v4)
+    assert _changes(db) == [
+        ("insert", parent.id, v4.id, None, 5),
+        ("move", parent.id, draft.id, 5, 6),
+    ]
+
+    node.remove_child(v2)
+    assert _changes(db)[2:] == [
+        ("remove", parent.id, v2.id, 1, None),
+        ("move", parent.id, v3.id, 2, 1),
+        ("move", parent.id, del1.id, 3, 2),
+        ("move", parent.id, del2.id, 4, 3),
+        ("move", parent.id, v4.id, 5, 4),
+        ("move", parent.id, draft.id, 6, 5),
+    ]
+
+    # Unordered relations
+    other = _create_version("other")
+    PIDNode(other, version_relation).insert_child(v2)
+    assert _changes(db)[-1] == ("insert", other.id, v2.id, None, None)
+    assert all(c.relation_type == version_relation.id for c in fetch_changes("a"))
+
+
+def test_outbox_consumers(app, db, version_pids):
+    """Test reading and acknowledging the changes by cursor."""
+    app.config["PIDRELATIONS_OUTBOX_ENABLED"] = True
+    node = PIDNodeVersioning(version_pids[0]["parent"])
+    for i in range(4, 7):
+        node.insert_child(_create_version("foobar.v{0}".format(i)))
+    changes = fetch_changes("indexer")
+    assert len(changes) == 6
+    assert fetch_changes("indexer", max_age=timedelta(hours=1)) == []
+
+    batch = fetch_changes("indexer", limit=4)
+    assert batch == changes[:4]
+    acknowledge_changes("indexer", batch[-1].id)
+    db.session.commit()
+    assert get_cursor("indexer") == changes[3].id
+    assert fetch_changes("indexer") == changes[4:]
+    assert fetch_changes("cache") == changes
+
+    # Acknowledging an older cursor does not go back
+    acknowledge_changes("indexer", changes[1].id)
+    assert get_cursor("indexer") == changes[3].id
+
+    # Changes are purged once acknowledged by all the consumers
+    acknowledge_changes("cache", changes[1].id)
+    assert purge_changes(older_than=timedelta(hours=1)) == 0
+    assert purge_changes() == 2
+    assert fetch_changes("cache") == changes[2:]
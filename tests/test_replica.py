@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Read replica routing tests."""
+
+import os
+import shutil
+
+import pytest
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from sqlalchemy import create_engine
+
+from invenio_pidrelations.cache import DictCache
+from invenio_pidrelations.contrib.versioning import PIDNodeVersioning
+from invenio_pidrelations.replica import has_pending_writes, read_bind_arguments
+from invenio_pidrelations.serializers.utils import serialize_relations
+
+
+@pytest.fixture()
+def replica(app, db, version_pids, instance_path):
+    """SQLite copy of the database, standing in for a lagging read replica."""
+    db.session.commit()
+    path = os.path.join(instance_path, "replica.db")
+    shutil.copyfile(db.engine.url.database, path)
+    engine = create_engine("sqlite:///" + path)
+    db.engines["replica"] = engine
+    app.config["PIDRELATIONS_READ_REPLICA_BIND"] = "replica"
+    yield engine
+    del db.engines["replica"]
+    engine.dispose()
+
+
+def create_version(pid_value):
+    """Create a registered version PID."""
+    return PersistentIdentifier.create(
+        "recid", pid_value, object_type="rec", status=PIDStatus.REGISTERED
+    )
+
+
+def test_read_replica(app, db, version_pids, replica):
+    """Test routing the relation reads to the replica."""
+    parent = version_pids[0]["parent"]
+    v1, v2, v3 = version_pids[0]["children"][:3]
+    node = PIDNodeVersioning(pid=parent)
+    assert read_bind_arguments() == {"bind": replica}
+
+    # Uncommitted relations are read from the primary database
+    v4 = create_version("foobar.v4")
+    assert has_pending_writes(db.session())
+    node.insert_child(v4)
+    assert read_bind_arguments() is None
+    assert node.last_child == v4
+    db.session.commit()
+    assert not has_pending_writes(db.session())
+
+    # The replica lags behind the primary database
+    assert read_bind_arguments() == {"bind": replica}
+    assert node.children.ordered("asc").all() == [v1, v2, v3]
+    assert node.last_child == v3
+    assert node.index(v3) == 2
+    relations = serialize_relations(v3)["version"][0]
+    assert relations["is_last"]
+    assert [c["pid_value"] for c in relations["children"]] == [
+        "foobar.v1",
+        "foobar.v2",
+        "foobar.v3",
+    ]
+
+    # Without replica, all the reads use the primary database
+    app.config["PIDRELATIONS_READ_REPLICA_BIND"] = None
+    assert node.last_child == v4
+
+
+def test_read_replica_in_writes(app, db, version_pids, replica):
+    """Test that the methods changing the relations read the primary database."""
+    parent = version_pids[0]["parent"]
+    node = PIDNodeVersioning(pid=parent)
+    draft = version_pids[0]["children"][-1]
+    node.remove_draft_child()
+    db.session.commit()
+    assert node.draft_child is not None
+
+    # The draft removed in the primary database is not found
+    new_draft = PersistentIdentifier.create(
+        "recid", "foobar.draft2", object_type="rec", status=PIDStatus.RESERVED
+    )
+    db.session.commit()
+    node.insert_draft_child(new_draft)
+    assert node.draft_child == new_draft
+    db.session.commit()
+    assert node.draft_child == draft
+
+
+def test_read_replica_cache(app, db, version_pids, replica):
+    """Test that the values read from the replica are not cached."""
+    app.config["PIDRELATIONS_CACHE"] = DictCache()
+    parent = version_pids[0]["parent"]
+    v3 = version_pids[0]["children"][2]
+    PIDNodeVersioning(pid=parent).insert_child(create_version("foobar.v4"))
+    db.session.commit()
+
+    assert serialize_relations(v3)["version"][0]["is_last"]
+    assert serialize_relations(v3)["version"][0]["is_last"]
+
+    # The replica caught up
+    app.config["PIDRELATIONS_READ_REPLICA_BIND"] = None
+    assert not serialize_relations(v3)["version"][0]["is_last"]
+
+    # The values cached from the primary database are used
+    app.config["PIDRELATIONS_READ_REPLICA_BIND"] = "replica"
+    assert not serialize_relations(v3)["version"][0]["is_last"]
@@ -9,8 +9,21 @@
 
 """Schema tests."""
 
+import json
+
+import pytest
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
 from marshmallow import Schema
-from test_helpers import PIDRelationsMixin
+from test_helpers import PIDRelationsMixin, QueryCounter, best_time
+
+from invenio_pidrelations.api import clear_preloaded_relations, preload_relations
+from invenio_pidrelations.config import RelationType
+from invenio_pidrelations.contrib.versioning import PIDNodeVersioning
+from invenio_pidrelations.models import PIDRelation
+from invenio_pidrelations.serializers.plain import serialize_relation
+from invenio_pidrelations.serializers.schemas import RelationSchema
+from invenio_pidrelations.serializers.utils import serialize_relations
+from invenio_pidrelations.utils import resolve_relation_type_config
 
 
 class SampleRecordSchema(Schema, PIDRelationsMixin):
@@ -77,3 +90,100 @@ def test_custom_schema(app, nested_pids_and_relations, custom_relation_schema):
         }
     }
     assert expected == data
+
+
+@pytest.fixture()
+def plain_relation_types(app):
+    """Relation types serialized with the plain serializer."""
+    orig = app.config["PIDRELATIONS_RELATION_TYPES"]
+    app.config["PIDRELATIONS_RELATION_TYPES"] = [
+        RelationType(
+            *rt[:-1], "invenio_pidrelations.serializers.plain:serialize_relation"
+        )
+        for rt in orig
+    ]
+    yield app.config["PIDRELATIONS_RELATION_TYPES"]
+    app.config["PIDRELATIONS_RELATION_TYPES"] = orig
+
+
+def _all_pids(version_pids):
+    """Get all the PIDs of the versioning fixture."""
+    pids = []
+    for concept in version_pids:
+        pids += [concept["parent"]] + concept["children"]
+        pids += [concept["deposit"]] if "deposit" in concept else []
+    return pids
+
+
+def test_plain_serializer_parity(app, db, version_pids, nested_pids_and_relations):
+    """Test that the plain serializer dumps the same JSON as the schema."""
+    pids = _all_pids(version_pids) + list(nested_pids_and_relations[0].values())
+    expected = [json.dumps(serialize_relations(pid)) for pid in pids]
+    assert any('"previous": {' in e for e in expected)
+
+    orig = app.config["PIDRELATIONS_RELATION_TYPES"]
+    app.config["PIDRELATIONS_RELATION_TYPES"] = [
+        RelationType(*rt[:-1], serialize_relation) for rt in orig
+    ]
+    assert [json.dumps(serialize_relations(pid)) for pid in pids] == expected
+
+    # From a snapshot preloaded by the caller
+    preload_relations(pids)
+    with QueryCounter(db.engine) as counter:
+        assert [json.dumps(serialize_relations(pid)) for pid in pids] == expected
+    clear_preloaded_relations(*pids)
+    assert counter.count == 2 * len(pids)
+
+
+def test_plain_serializer_config(app, db, version_pids, plain_relation_types):
+    """Test selecting the plain serializer in the relation types."""
+    v1 = version_pids[0]["children"][0]
+    assert resolve_relation_type_config("version").schema is serialize_relation
+    assert serialize_relations(v1)["version"][0]["next"] == {
+        "pid_type": "recid",
+        "pid_value": "foobar.v2",
+    }
+
+
+def _versioned_children(number):
+    """Create a parent with ``number`` versions, with preloaded relations."""
+    version = resolve_relation_type_config("version")
+    parent = PersistentIdentifier.create(
+        "recid", "parent", object_type="rec", status=PIDStatus.REGISTERED
+    )
+    children = []
+    for i in range(number):
+        child = PersistentIdentifier.create(
+            "recid", str(i), object_type="rec", status=PIDStatus.REGISTERED
+        )
+        PIDRelation.create(parent, child, version.id, i)
+        children.append(child)
+    preload_relations(children)
+    return PIDNodeVersioning(parent), children
+
+
+def _dump_with_schema(node, child):
+    schema = RelationSchema()
+    schema.context["pid"] = child
+    return schema.dump(node)
+
+
+def test_plain_serializer_parity(app, db):
+    """Test that the plain serializer matches the schema."""
+    node, children = _versioned_children(50)
+    expected = [_dump_with_schema(node, child) for child in children]
+    results = [serialize_relation(node, child) for child in children]
+    assert results == expected
+
+
+@pytest.mark.benchmark
+def test_plain_serializer_throughput(app, db):
+    """Test that the plain serializer is faster than the schema."""
+    node, children = _versioned_children(50)
+    schema_time = best_time(
+        lambda: [_dump_with_schema(node, child) for child in children]
+    )
+    plain_time = best_time(
+        lambda: [serialize_relation(node, child) for child in children]
+    )
+    assert plain_time < schema_time
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Relation statistics tests."""
+
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+
+from invenio_pidrelations.api import PIDNode
+from invenio_pidrelations.closure import build_closure
+from invenio_pidrelations.stats import distribution, relation_stats
+
+
+def test_distribution():
+    """Test the summary of a distribution given by its frequencies."""
+    assert distribution([(1, 5), (2, 3), (3, 1), (9, 1)]) == {
+        "count": 10,
+        "min": 1,
+        "max": 9,
+        "mean": 2.3,
+        "p50": 1,
+        "p90": 3,
+        "p99": 9,
+        "histogram": {"1": 5, "2-3": 4, "8-15": 1},
+    }
+    assert distribution([]) == {
+        "count": 0,
+        "min": None,
+        "max": None,
+        "mean": None,
+        "p50": None,
+        "p90": None,
+        "p99": None,
+        "histogram": {},
+    }
+
+
+def test_relation_stats(app, db, version_pids, version_relation):
+    """Test the statistics of the relations."""
+    stats = relation_stats("version", top=1)
+    assert stats["relations"] == 7
+    assert stats["parents"] == 2
+    assert stats["children"] == 7
+    assert stats["children_per_parent"]["histogram"] == {"1": 1, "4-7": 1}
+    assert stats["children_per_parent"]["max"] == 6
+    assert stats["parents_per_child"]["max"] == 1
+    assert stats["reserved_children_per_parent"]["histogram"] == {"0": 1, "1": 1}
+    assert stats["children_status"] == {"D": 2, "N": 1, "K": 1, "R": 3}
+    assert stats["max_depth"] == 1
+    assert stats["largest_parents"] == [
+        {"pid_type": "recid", "pid_value": "foobar", "children": 6}
+    ]
+
+    # Nest the parents, with and without closure table
+    root = PersistentIdentifier.create(
+        "recid", "root", object_type="rec", status=PIDStatus.REGISTERED
+    )
+    PIDNode(root, version_relation).insert_child(version_pids[0]["parent"])
+    assert relation_stats("version")["max_depth"] == 2
+    assert relation_stats("version", depth_limit=1)["max_depth"] == 1
+    app.config["PIDRELATIONS_CLOSURE_RELATION_TYPES"] = ["version"]
+    build_closure("version")
+    assert relation_stats("version")["max_depth"] == 2
+
+    assert relation_stats("record_draft")["max_depth"] == 1
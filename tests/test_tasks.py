@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Celery tasks tests."""
+
+import uuid
+from unittest.mock import patch
+
+import pytest
+from flask_celeryext import FlaskCeleryExt
+from invenio_pidstore.models import PIDStatus
+
+from invenio_pidrelations.tasks import process_siblings_queue, request_siblings_reindex
+
+
+@pytest.fixture()
+def celery_app(app):
+    """Celery application on an in-memory broker, without workers."""
+    app.config.update(
+        CELERY_BROKER_URL="memory://",
+        CELERY_TASK_ALWAYS_EAGER=False,
+        CELERY_RESULT_BACKEND="cache",
+        CELERY_CACHE_BACKEND="memory",
+    )
+    ext = FlaskCeleryExt(app)
+    return ext.celery
+
+
+def test_siblings_reindex_coalesced(app, db, celery_app, version_pids):
+    """Test that sibling reindexing requests are coalesced per parent."""
+    for pids in version_pids:
+        for pid in [pids["parent"]] + pids["children"]:
+            pid.object_type, pid.object_uuid = "rec", uuid.uuid4()
+    v1, v2, v3 = version_pids[0]["children"][:3]
+    spam_v1 = version_pids[1]["children"][0]
+    spam_v1.status = PIDStatus.REGISTERED
+    db.session.commit()
+
+    with patch.object(process_siblings_queue, "apply_async") as schedule:
+        for pid in (v1, v2, v3, v3):
+            request_siblings_reindex(pid, with_deposits=False)
+        request_siblings_reindex(spam_v1, include_pid=True, with_deposits=False)
+    assert schedule.call_count == 5
+    assert schedule.call_args.kwargs == {"countdown": 5}
+
+    with patch("invenio_indexer.api.RecordIndexer.bulk_index") as bulk_index:
+        # The runs scheduled by the first requests process all of them
+        assert process_siblings_queue() == 4
+        assert process_siblings_queue() == 0
+    # v3 was excluded by some requests only, spam.v1 was included
+    assert bulk_index.call_count == 1
+    assert bulk_index.call_args.args[0] == sorted(
+        str(p.object_uuid) for p in (v1, v2, v3, spam_v1)
+    )
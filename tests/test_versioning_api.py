@@ -12,10 +12,17 @@ from __future__ import absolute_import, print_function
 
 import pytest
 from invenio_pidstore.models import PersistentIdentifier, PIDStatus
-from test_helpers import create_pids, filter_pids, with_pid_and_fetched_pid
+from sqlalchemy import select
+from test_helpers import (
+    QueryCounter,
+    create_pids,
+    filter_pids,
+    with_pid_and_fetched_pid,
+)
 
 from invenio_pidrelations.contrib.versioning import PIDNodeVersioning
 from invenio_pidrelations.errors import PIDRelationConsistencyError
+from invenio_pidrelations.models import PIDRelationChange
 
 
 @with_pid_and_fetched_pid
@@ -121,6 +128,25 @@ def test_versioning_draft_child_deposit(db, version_pids, build_pid):
     assert h1.draft_child_deposit == version_pids[0]["deposit"]
 
 
+@with_pid_and_fetched_pid
+def test_versioning_draft_state(db, version_pids, build_pid):
+    """Test the draft_state property of PIDNodeVersioning."""
+    h1 = PIDNodeVersioning(build_pid(version_pids[0]["parent"]))
+    with QueryCounter(db.engine) as counter:
+        state = h1.draft_state
+    assert counter.count == 1
+    assert state == (version_pids[0]["children"][-1], version_pids[0]["deposit"])
+    assert state.draft == h1.draft_child
+
+    # Draft without deposit
+    h2 = PIDNodeVersioning(build_pid(version_pids[1]["parent"]))
+    draft = create_pids(1, prefix="draft", status=PIDStatus.RESERVED)[0]
+    assert h2.draft_state == (None, None)
+    h2.insert_draft_child(draft)
+    assert h2.draft_state == (draft, None)
+    assert h2.draft_child_deposit is None
+
+
 @with_pid_and_fetched_pid
 def test_update_redirect(db, version_pids, build_pid):
     """Test PIDNodeVersioning.update_redirect()."""
@@ -169,3 +195,70 @@ def test_update_redirect(db, version_pids, build_pid):
     version_pids[0]["children"][0].status = PIDStatus.NEW
     with pytest.raises(PIDRelationConsistencyError):
         h1.update_redirect()
+
+
+def test_update_redirect_queries(db, version_pids):
+    """Test that update_redirect does not depend on the number of children."""
+    h1 = PIDNodeVersioning(version_pids[0]["parent"])
+    with QueryCounter(db.engine) as counter:
+        h1.update_redirect()
+    for pid in create_pids(20):
+        h1.insert_child(pid)
+    with QueryCounter(db.engine) as many_counter:
+        h1.update_redirect()
+    assert many_counter.count == counter.count
+    assert version_pids[0]["parent"].get_redirect() == pid
+
+    # Without any REGISTERED child, the statuses are checked with the same
+    # query (the only child of h2 is NEW)
+    h2 = PIDNodeVersioning(version_pids[1]["parent"])
+    with pytest.raises(PIDRelationConsistencyError):
+        h2.update_redirect()
+
+
+@with_pid_and_fetched_pid
+def test_publish_draft(app, db, version_pids, build_pid):
+    """Test PIDNodeVersioning.publish_draft()."""
+    app.config["PIDRELATIONS_OUTBOX_ENABLED"] = True
+    parent = version_pids[0]["parent"]
+    draft = version_pids[0]["children"][-1]
+    h1 = PIDNodeVersioning(build_pid(parent))
+    draft_index = h1.index(draft)
+    with QueryCounter(db.engine) as counter:
+        assert h1.publish_draft() == draft
+        db.session.flush()
+    changes = db.session.scalars(select(PIDRelationChange)).all()
+    assert [(c.parent_id, c.child_id, c.op) for c in changes] == [
+        (parent.id, draft.id, "status")
+    ]
+    assert changes[0].old_index == changes[0].new_index == draft_index
+    assert draft.status == PIDStatus.REGISTERED
+    assert h1.index(draft) == draft_index
+    assert h1.last_child == draft
+    assert parent.get_redirect() == draft
+    assert h1.draft_child is None
+    with pytest.raises(PIDRelationConsistencyError):
+        h1.publish_draft()
+
+    # Publishing another draft takes as many statements
+    other_draft = create_pids(1, prefix="draft", status=PIDStatus.RESERVED)[0]
+    for pid in create_pids(10):
+        h1.insert_child(pid)
+    h1.insert_draft_child(other_draft)
+    with QueryCounter(db.engine) as other_counter:
+        h1.publish_draft()
+        db.session.flush()
+    assert other_counter.count == counter.count
+    assert parent.get_redirect() == other_draft
+
+
+def test_publish_first_draft(db):
+    """Test publishing the draft of a parent without any version."""
+    parent = create_pids(1, prefix="parent", status=PIDStatus.RESERVED)[0]
+    draft = create_pids(1, prefix="draft", status=PIDStatus.RESERVED)[0]
+    h1 = PIDNodeVersioning(parent)
+    h1.insert_draft_child(draft)
+    h1.publish_draft()
+    assert parent.status == PIDStatus.REDIRECTED
+    assert parent.get_redirect() == draft
+    assert h1.children.all() == [draft]
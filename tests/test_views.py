@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Views helpers tests."""
+
+from unittest.mock import patch
+
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from test_helpers import QueryCounter
+
+from invenio_pidrelations.api import relations_version
+from invenio_pidrelations.contrib.versioning import PIDNodeVersioning
+from invenio_pidrelations.views import relations_response
+
+
+def test_relations_version(app, db, version_pids):
+    """Test that the relations version changes with the relations."""
+    parent = version_pids[0]["parent"]
+    v1, v2, v3, _, _, draft = version_pids[0]["children"]
+    node = PIDNodeVersioning(parent)
+    db.session.commit()
+
+    tokens = [node.relations_version]
+    assert relations_version(v1) == relations_version(v2)
+    assert relations_version(v1) != relations_version(version_pids[1]["parent"])
+
+    def changed():
+        db.session.commit()
+        tokens.append(node.relations_version)
+        return len(set(tokens)) == len(tokens)
+
+    v4 = PersistentIdentifier.create(
+        "recid", "foobar.v4", object_type="rec", status=PIDStatus.REGISTERED
+    )
+    node.insert_child(v4)
+    assert changed()
+    assert relations_version(v1) != tokens[0]
+    node.remove_child(v2)
+    assert changed()
+    draft.status = PIDStatus.REGISTERED
+    node.update_redirect()
+    assert changed()
+    # Unrelated changes keep the token
+    version_pids[1]["children"][0].status = PIDStatus.REGISTERED
+    db.session.commit()
+    assert node.relations_version == tokens[-1]
+
+
+def test_relations_response(app, db, version_pids):
+    """Test answering conditional requests on the relations."""
+    v1 = version_pids[0]["children"][0]
+    db.session.commit()
+    with app.test_request_context():
+        response = relations_response(v1)
+    assert response.status_code == 200
+    assert response.json["version"][0]["index"] == 0
+    etag = response.get_etag()[0]
+
+    with app.test_request_context(headers={"If-None-Match": '"{0}"'.format(etag)}):
+        with patch("invenio_pidrelations.views.serialize_relations") as serialize:
+            with QueryCounter(db.engine) as counter:
+                response = relations_response(v1)
+    assert response.status_code == 304
+    assert response.get_etag()[0] == etag
+    assert not serialize.called
+    assert counter.count == 1
+
+    # Weak ETags, as rewritten by compressing proxies, match too
+    with app.test_request_context(headers={"If-None-Match": 'W/"{0}"'.format(etag)}):
+        response = relations_response(v1)
+    assert response.status_code == 304
+
+    PIDNodeVersioning(version_pids[0]["parent"]).remove_child(v1)
+    db.session.commit()
+    with app.test_request_context(headers={"If-None-Match": '"{0}"'.format(etag)}):
+        response = relations_response(version_pids[0]["children"][1])
+    assert response.status_code == 200
+    assert response.get_etag()[0] != etag